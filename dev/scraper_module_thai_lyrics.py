@@ -1,146 +1,210 @@
 # -*- coding: utf-8 -*-
-import requests
-from bs4 import BeautifulSoup
-import pandas as pd
+import asyncio
+import re
+import sys
 import uuid
 from datetime import datetime
-import time
-import os
-import re
-from tqdm.notebook import tqdm
+from urllib.parse import quote
+
+from bs4 import BeautifulSoup
+
+from scraper.crawler import AsyncCrawler, Frontier, FrontierItem, HostRateLimiter
+from scraper.dataclass import ThaiMusicRecord
+from scraper.incremental import CrawlStateStore, content_hash
+from scraper.metrics import METRICS
+from scraper.sink import RecordSink, load_seen_urls
+
 
-def scrape_song_metadata(song_title, artist_name, base_url="https://duckduckgo.com/html/?q=", extra_keyword="ปี"):
+def parse_year_candidates(html):
+    soup = BeautifulSoup(html, "html.parser")
+    text = soup.get_text(" ", strip=True)
+    year_candidates = re.findall(r"(19[5-9]\d|20[0-2]\d)", text)
+    years = [int(y) for y in year_candidates if 1950 <= int(y) <= datetime.now().year]
+    return min(years) if years else None
+
+
+async def scrape_song_metadata(crawler, song_title, artist_name, base_url="https://duckduckgo.com/html/?q=", extra_keyword="ปี"):
     query = f"{artist_name} {song_title} {extra_keyword}"
-    url = f"{base_url}{requests.utils.quote(query)}"
+    url = f"{base_url}{quote(query)}"
     try:
-        res = requests.get(url, timeout=10, headers={"User-Agent": "Mozilla/5.0"})
-        res.raise_for_status()
-        soup = BeautifulSoup(res.text, "html.parser")
-        text = soup.get_text(" ", strip=True)
-        year_candidates = re.findall(r"(19[5-9]\d|20[0-2]\d)", text)
-        if year_candidates:
-            years = [int(y) for y in year_candidates if 1950 <= int(y) <= datetime.now().year]
-            if years:
-                return min(years)
-        return None
+        res = await crawler.fetch(url)
+        with METRICS.timer("extraction"):
+            return parse_year_candidates(res.text)
     except Exception as e:
         print(f"❌ Error searching year for {song_title}: {e}")
         return None
 
 # === ตั้งค่าพื้นฐาน ===
 BASE_URL = "https://xn--72c9bva0i.meemodel.com"
-OUTPUT_FILE = "thai_songs_progress_5.csv"
+SEGMENT_DIR = "thai_songs_progress_5"   # append-only segments (resume source)
 FINAL_FILE = "thai_songs_all_years_final5.csv"
+FRONTIER_FILE = "thai_songs_frontier_5.sqlite3"
+STATE_FILE = "thai_songs_crawl_state_5.sqlite3"   # ETag / Last-Modified / hash per song URL
 PLATFORM = "meemodel"
 PLATFORM_TYPE = "lyrics-site"
 CONTENT_TYPE = "lyrics"
 LANGUAGE_VARIANT = "Central Thai text"
 SCRAPER_MODULE = "meemodel_scraper.py"
 
+# === ตั้งค่าการ crawl (politeness ต่อ host) ===
+CONCURRENCY = 8
+SITE_RATE_PER_SEC = 3.0     # meemodel
+SEARCH_RATE_PER_SEC = 1.0   # duckduckgo (year lookup)
+SAVE_EVERY = 200            # songs per fsync checkpoint
+
+# `--refresh`: re-walk every letter/artist page and conditionally re-check known
+# songs; only new or modified songs are parsed, year-searched and written.
+REFRESH = "--refresh" in sys.argv
+# `--metrics-port N`: serve live JSON metrics on http://127.0.0.1:N/metrics
+METRICS_PORT = int(sys.argv[sys.argv.index("--metrics-port") + 1]) if "--metrics-port" in sys.argv else None
+METRICS_FILE = "thai_songs_metrics_5.json"   # periodic snapshot (latency / retries / songs per minute)
+
 thai_letters = list("กขฃคฅฆงจฉชซฌญฎฏฐฑฒณดตถทธนบปผฝพฟภมยรฤลฦวศษสหฬอฮ")
 scrape_date = datetime.now().strftime("%Y-%m-%d")
 
-# === โหลดข้อมูลที่ค้างไว้ ===
-if os.path.exists(OUTPUT_FILE):
-    df_existing = pd.read_csv(OUTPUT_FILE)
-    all_songs = df_existing.to_dict("records")
-    seen_urls = set(df_existing["url"].tolist())
-    print(f"🔁 Resume from previous run ({len(all_songs)} songs loaded)")
+# === โหลดข้อมูลที่ค้างไว้ (อ่านเฉพาะคอลัมน์ url) ===
+seen_urls = load_seen_urls(SEGMENT_DIR)
+if seen_urls:
+    print(f"🔁 Resume from previous run ({len(seen_urls)} songs already saved)")
 else:
-    all_songs = []
-    seen_urls = set()
     print("🚀 Starting new scrape")
 
-try:
-    for letter in tqdm(thai_letters, desc="Scraping by Thai letter"):
-        try:
-            res = requests.get(f"{BASE_URL}/หาศิลปิน/{letter}")
-            res.raise_for_status()
-        except Exception as e:
-            print(f"Error fetching {letter}: {e}")
+# durable_key: checkpoints report which song urls reached disk, and only those are marked done in the frontier
+sink = RecordSink(SEGMENT_DIR, "csv", batch_size=50, durable_key="url")
+state = CrawlStateStore(STATE_FILE)
+songs_since_checkpoint = 0  # counted per song; sink.rows_written only moves per flushed batch
+
+
+def absolute(url):
+    return url if url.startswith("http") else BASE_URL + url
+
+
+def lyric_fingerprint(item, res):
+    # Hash only the lyric block so ads / view counters elsewhere on the page don't count as changes.
+    lyrics_div = BeautifulSoup(res.text, "html.parser").find("div", id="lyric-lyric")
+    if lyrics_div is None:
+        return content_hash(res.content)
+    return content_hash(str(lyrics_div))
+
+
+def save_progress(crawler=None):
+    global songs_since_checkpoint
+    songs_since_checkpoint = 0
+    durable = sink.checkpoint()
+    if crawler is not None:
+        crawler.commit(durable)
+    print(f"✅ Saved progress: {sink.rows_written} new songs this run.")
+
+
+# === handlers: letter → artist → song ===
+async def handle_letter(crawler: AsyncCrawler, item: FrontierItem, res):
+    soup = BeautifulSoup(res.text, "html.parser")
+    for a in soup.select("a[href^='/ศิลปิน/']"):
+        crawler.enqueue(absolute(a["href"]), "artist", priority=1, artist_name=a.text.strip())
+
+
+async def handle_artist(crawler: AsyncCrawler, item: FrontierItem, res):
+    soup_artist = BeautifulSoup(res.text, "html.parser")
+    for s in soup_artist.select("a[title^='เนื้อเพลง']"):
+        song_title = s.text.strip()
+        if song_title == "เนื้อเพลง":
             continue
+        song_url = absolute(s["href"])
+        if song_url in seen_urls and not REFRESH:
+            continue
+        # songs outrank artists so records start flowing early
+        crawler.enqueue(song_url, "song", priority=2, song_title=song_title, artist_name=item.payload["artist_name"])
+
+
+async def handle_song(crawler: AsyncCrawler, item: FrontierItem, res):
+    global songs_since_checkpoint
+    song_title = item.payload["song_title"]
+    artist_name = item.payload["artist_name"]
+
+    soup_song = BeautifulSoup(res.text, "html.parser")
+    lyrics_div = soup_song.find("div", id="lyric-lyric")
+    raw_text = str(lyrics_div) if lyrics_div else ""
+    full_text = lyrics_div.get_text(separator="\n", strip=True) if lyrics_div else ""
+    lyric_text = full_text.replace(song_title, "").strip()
+
+    genre = None
+    genre_tag = soup_song.find("strong", string=lambda x: x and "หมวดเพลง" in x)
+    if genre_tag:
+        text = genre_tag.get_text(strip=True)
+        if "หมวดเพลง" in text:
+            genre = text.split(":")[-1].strip()
+
+    # 🔎 หา release_year (แต่ไม่ข้ามถ้าไม่มี) — reuse the year found by an earlier crawl if any
+    rel_year = state.known_year(item.url)
+    if rel_year is None:
+        rel_year = await scrape_song_metadata(crawler, song_title, artist_name)
+        state.remember_year(item.url, rel_year)
+
+    sink.write(ThaiMusicRecord(
+        id=str(uuid.uuid4()),
+        platform=PLATFORM,
+        platform_type=PLATFORM_TYPE,
+        url=item.url,
+        content_type=CONTENT_TYPE,
+        scraper_module=SCRAPER_MODULE,
+        song_title=song_title,
+        artist=artist_name,
+        release_year=rel_year,
+        genre=genre,
+        language_variant=LANGUAGE_VARIANT,
+        text=lyric_text,
+        raw_text=raw_text,
+        scrape_date=scrape_date,
+    ))
+    seen_urls.add(item.url)
+    METRICS.song_done()
+
+    songs_since_checkpoint += 1
+    if songs_since_checkpoint >= SAVE_EVERY:
+        save_progress(crawler)
+
+
+async def main():
+    METRICS.start_snapshots(METRICS_FILE)
+    if METRICS_PORT:
+        METRICS.serve(METRICS_PORT)
+    frontier = Frontier(FRONTIER_FILE)
+    if REFRESH:
+        print(f"🔄 Refresh run: {frontier.reset(('letter', 'artist', 'song'))} URLs queued for re-check")
+    for letter in thai_letters:
+        frontier.add(f"{BASE_URL}/หาศิลปิน/{letter}", "letter")
+
+    limiter = HostRateLimiter(
+        overrides={
+            "xn--72c9bva0i.meemodel.com": (SITE_RATE_PER_SEC, CONCURRENCY),
+            "duckduckgo.com": (SEARCH_RATE_PER_SEC, 2),
+        },
+    )
+    crawler = AsyncCrawler(
+        frontier,
+        {"letter": handle_letter, "artist": handle_artist, "song": handle_song},
+        concurrency=CONCURRENCY,
+        limiter=limiter,
+        state=state,
+        fingerprint=lyric_fingerprint,
+        deferred_kinds=("song",),   # done only once the song's record is checkpointed
+    )
+    try:
+        await crawler.run()
+    finally:
+        save_progress(crawler)
+        print(f"📊 Frontier: {frontier.counts()} | songs: {crawler.changes}")
+        frontier.close()
+        state.close()
+        METRICS.stop()
 
-        soup = BeautifulSoup(res.text, "html.parser")
-        artist_links = soup.select("a[href^='/ศิลปิน/']")
-
-        for a in tqdm(artist_links, desc=f"Artists for {letter}", leave=False):
-            artist_name = a.text.strip()
-            artist_url = a["href"]
-            if not artist_url.startswith("http"):
-                artist_url = BASE_URL + artist_url
-
-            try:
-                res_artist = requests.get(artist_url)
-                res_artist.raise_for_status()
-            except Exception as e:
-                print(f"Error fetching artist {artist_url}: {e}")
-                continue
-
-            soup_artist = BeautifulSoup(res_artist.text, "html.parser")
-            song_links = soup_artist.select("a[title^='เนื้อเพลง']")
-
-            for s in tqdm(song_links, desc=f"{artist_name}", leave=False):
-                song_title = s.text.strip()
-                if song_title == "เนื้อเพลง":
-                    continue
-                song_url = s["href"]
-                if not song_url.startswith("http"):
-                    song_url = BASE_URL + song_url
-
-                if song_url in seen_urls:
-                    continue
-
-                try:
-                    res_song = requests.get(song_url)
-                    res_song.raise_for_status()
-                except Exception as e:
-                    print(f"Failed to fetch {song_url}: {e}")
-                    continue
-
-                soup_song = BeautifulSoup(res_song.text, "html.parser")
-                lyrics_div = soup_song.find("div", id="lyric-lyric")
-                raw_text = str(lyrics_div) if lyrics_div else ""
-                full_text = lyrics_div.get_text(separator="\n", strip=True) if lyrics_div else ""
-                lyric_text = full_text.replace(song_title, "").strip()
-
-                # 🔎 หา release_year (แต่ไม่ข้ามถ้าไม่มี)
-                rel_year = scrape_song_metadata(song_title, artist_name)
-
-                genre = None
-                genre_tag = soup_song.find("strong", string=lambda x: x and "หมวดเพลง" in x)
-                if genre_tag:
-                    text = genre_tag.get_text(strip=True)
-                    if "หมวดเพลง" in text:
-                        genre = text.split(":")[-1].strip()
-
-                all_songs.append({
-                    "id": str(uuid.uuid4()),
-                    "platform": PLATFORM,
-                    "platform_type": PLATFORM_TYPE,
-                    "url": song_url,
-                    "content_type": CONTENT_TYPE,
-                    "scraper_module": SCRAPER_MODULE,
-                    "song_title": song_title,
-                    "artist": artist_name,
-                    "release_year": rel_year,
-                    "genre": genre,
-                    "language_variant": LANGUAGE_VARIANT,
-                    "lyric_text": lyric_text,
-                    "raw_text": raw_text,
-                    "scrape_date": scrape_date
-                })
-
-                seen_urls.add(song_url)
-                time.sleep(0.3)
-
-        pd.DataFrame(all_songs).to_csv(OUTPUT_FILE, index=False, encoding="utf-8-sig")
-        print(f"✅ Saved progress: {len(all_songs)} songs so far.")
 
+try:
+    asyncio.run(main())
 except KeyboardInterrupt:
     print("🟡 Interrupted! Saving current progress...")
-    pd.DataFrame(all_songs).to_csv(OUTPUT_FILE, index=False, encoding="utf-8-sig")
+    save_progress()
 
-# === บันทึกสุดท้าย ===
-df = pd.DataFrame(all_songs)
-df.to_csv(FINAL_FILE, index=False, encoding="utf-8-sig")
-print(f"🎉 Done! Saved {len(df)} songs (all years) to {FINAL_FILE}")
\ No newline at end of file
+# === บันทึกสุดท้าย (รวม segments เป็นไฟล์เดียว) ===
+total = sink.compact(FINAL_FILE, encoding="utf-8-sig", dedupe_key="url")
+print(f"🎉 Done! Saved {total} songs (all years) to {FINAL_FILE}")
@@ -6,6 +6,7 @@ from pathlib import Path
 from typing import Optional
 from scraper.dataclass import ThaiMusicRecord
 from scraper.extractor import scrape_song_metadata
+from scraper.metrics import METRICS
 
 # ---------------------------------------------------------------------
 # Main process
@@ -52,6 +53,7 @@ def update_csv_with_scraped_years(input_csv: str, output_csv: str):
 
             else:
                 print(f"❌ No year found for: {song_title} - {artist}")
+            METRICS.song_done()
 
     print(f"\n✅ Finished processing. All found-year records saved to → {output_csv}")
 
@@ -60,7 +62,11 @@ def update_csv_with_scraped_years(input_csv: str, output_csv: str):
 # Example run
 # ---------------------------------------------------------------------
 if __name__ == "__main__":
-    update_csv_with_scraped_years(
-        input_csv="thai_songs_partial.csv",
-        output_csv="thai_songs_partial_.csv",
-    )
\ No newline at end of file
+    METRICS.start_snapshots("thai_songs_partial_metrics.json")
+    try:
+        update_csv_with_scraped_years(
+            input_csv="thai_songs_partial.csv",
+            output_csv="thai_songs_partial_.csv",
+        )
+    finally:
+        METRICS.stop()
\ No newline at end of file
@@ -0,0 +1,224 @@
+# bench_pipeline.py
+# Microbenchmarks for the data-pipeline stages, imported from the scripts that
+# run them (real_clean.py, mapping_era.py, undersampling_data.py, test.py), on
+# synthetic lyrics corpora of growing size.
+#
+#   python bench_pipeline.py                          # default sizes
+#   python bench_pipeline.py --sizes 10000 100000 1000000 3000000 --stages clean dedup
+#
+# Every (stage, size) runs in a fresh subprocess so peak RSS belongs to that
+# stage alone. Results go to bench_results/pipeline_<timestamp>.{csv,json}.
+import argparse
+import csv
+import json
+import math
+import os
+import resource
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from mapping_era import map_era
+from real_clean import clean_lyrics, dedup_lyrics
+from test import fit_tfidf
+from undersampling_data import undersample
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+RESULTS_DIR = Path("bench_results")
+CORPUS_DIR = RESULTS_DIR / "corpora"
+TOP_TOKENS_CSV = Path(__file__).resolve().parent / "era_top_tokens.csv"
+DEFAULT_SIZES = [10_000, 100_000, 1_000_000]
+STAGES = ["clean", "dedup", "map_era", "undersample", "tfidf_fit"]
+WORDS_PER_SONG = 220     # ~median lyric length after cleaning
+DUPLICATE_RATE = 0.08    # re-uploads / covers with identical lyrics
+FILLER_VOCAB = 20_000    # long tail beyond the real top tokens
+STAGE_TIMEOUT_SEC = 3600
+SEED = 42
+
+
+# -----------------------------
+# SYNTHETIC CORPUS
+# -----------------------------
+def build_vocab(rng):
+    tokens = pd.read_csv(TOP_TOKENS_CSV)["token"].astype(str).unique().tolist()
+    letters = np.array(list("abcdefghijklmnopqrstuvwxyz"))
+    filler = ["".join(rng.choice(letters, size=rng.integers(3, 9))) for _ in range(FILLER_VOCAB)]
+    return np.array(tokens + filler, dtype=object)
+
+
+def make_corpus(n_rows, seed=SEED, chunk=20_000):
+    """
+    Raw-looking lyrics with the noise clean_text removes (newlines, section
+    tags, punctuation, digits), a Zipf word distribution, years 1965–2025
+    skewed towards recent eras, and a share of exact duplicate lyrics.
+    """
+    rng = np.random.default_rng(seed)
+    vocab = build_vocab(rng)
+    n_unique = max(1, int(n_rows * (1 - DUPLICATE_RATE)))
+    noise = np.array(["[Chorus]\n", "[Verse 1]\n", "oh,", "yeah!", "(x2)", "2x", "\n", "again?"], dtype=object)
+
+    lyrics = []
+    for start in range(0, n_unique, chunk):
+        size = min(chunk, n_unique - start)
+        ids = np.minimum(rng.zipf(1.3, size=(size, WORDS_PER_SONG)) - 1, len(vocab) - 1)
+        words = vocab[ids]
+        mask = rng.random(words.shape) < 0.03
+        words[mask] = rng.choice(noise, size=int(mask.sum()))
+        lyrics.extend(" ".join(row) for row in words)
+
+    dup_idx = rng.integers(0, n_unique, size=n_rows - n_unique)
+    lyrics.extend(lyrics[i] for i in dup_idx)
+
+    era_weights = np.array([0.03, 0.05, 0.08, 0.14, 0.35, 0.35])
+    era = rng.choice(6, size=n_rows, p=era_weights)
+    year = np.where(rng.random(n_rows) < 0.02, rng.integers(1960, 1970, n_rows), 1970 + era * 10 + rng.integers(0, 10, n_rows))
+    year = np.minimum(year, 2025)
+    return pd.DataFrame({
+        "title": [f"song {i}" for i in range(n_rows)],
+        "lyrics": lyrics,
+        "year": year.astype(float),
+        "views": rng.integers(0, 1_000_000, n_rows),
+    })
+
+
+def corpus_path(n_rows):
+    """Each size is generated (and pre-staged) once and reused across stages and runs."""
+    path = CORPUS_DIR / f"lyrics_{n_rows}_{SEED}.pkl"
+    if not path.exists():
+        CORPUS_DIR.mkdir(parents=True, exist_ok=True)
+        print(f"🧪 Generating synthetic corpus: {n_rows:,} rows")
+        df = make_corpus(n_rows)
+        df = clean_lyrics(df)  # inputs for the downstream stages
+        df = map_era(df)
+        df.to_pickle(path)
+    return path
+
+
+# -----------------------------
+# ONE STAGE (runs in a subprocess)
+# -----------------------------
+def peak_rss_mb():
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / 1024 / 1024 if sys.platform == "darwin" else rss / 1024  # bytes on macOS, KiB on Linux
+
+
+def run_stage(stage, path):
+    df = pd.read_pickle(path)
+    if stage == "clean":
+        df = df[["title", "lyrics", "year", "views"]]
+    rss_before = peak_rss_mb()
+    rows_in = len(df)
+
+    start = time.perf_counter()
+    if stage == "clean":
+        out = clean_lyrics(df)
+    elif stage == "dedup":
+        out = dedup_lyrics(df)
+    elif stage == "map_era":
+        out = map_era(df.drop(columns=["song_era"]))
+    elif stage == "undersample":
+        out = undersample(df)
+    elif stage == "tfidf_fit":
+        _, out = fit_tfidf(df["clean_lyrics"])
+    else:
+        raise ValueError(f"Unknown stage: {stage}")
+    wall = time.perf_counter() - start
+
+    return {
+        "stage": stage,
+        "rows": rows_in,
+        "rows_out": out.shape[0],
+        "wall_sec": round(wall, 4),
+        "rows_per_sec": round(rows_in / wall, 1) if wall else None,
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+        "input_rss_mb": round(rss_before, 1),
+    }
+
+
+# -----------------------------
+# HARNESS
+# -----------------------------
+def scaling_exponent(points):
+    """Slope of log(time) vs log(rows): 1.0 is linear, >1 means the stage stops scaling."""
+    points = [(r, t) for r, t in points if t and t > 0]
+    if len(points) < 2:
+        return None
+    x = np.log([r for r, _ in points])
+    y = np.log([t for _, t in points])
+    return float(np.polyfit(x, y, 1)[0])
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--sizes", nargs="+", type=int, default=DEFAULT_SIZES)
+    parser.add_argument("--stages", nargs="+", choices=STAGES, default=STAGES)
+    parser.add_argument("--timeout", type=int, default=STAGE_TIMEOUT_SEC)
+    parser.add_argument("--worker", nargs=2, metavar=("STAGE", "CORPUS"), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        print(json.dumps(run_stage(args.worker[0], args.worker[1])))
+        return
+
+    RESULTS_DIR.mkdir(exist_ok=True)
+    results = []
+    for n_rows in sorted(args.sizes):
+        path = corpus_path(n_rows)
+        for stage in args.stages:
+            cmd = [sys.executable, __file__, "--worker", stage, str(path)]
+            try:
+                proc = subprocess.run(cmd, capture_output=True, text=True, timeout=args.timeout)
+            except subprocess.TimeoutExpired:
+                row = {"stage": stage, "rows": n_rows, "status": "timeout"}
+            else:
+                if proc.returncode != 0:
+                    row = {"stage": stage, "rows": n_rows, "status": "error", "error": proc.stderr.strip()[-500:]}
+                else:
+                    row = {**json.loads(proc.stdout.strip().splitlines()[-1]), "status": "ok"}
+            row["corpus_rows"] = n_rows
+            results.append(row)
+            print(
+                f"⏱️ {stage:<12} {n_rows:>10,} rows  "
+                + (f"{row['wall_sec']:>9.2f}s  {row['rows_per_sec']:>12,.0f} rows/s  {row['peak_rss_mb']:>8.0f} MB"
+                   if row["status"] == "ok" else row["status"])
+            )
+
+    # ---- which stage stops scaling first
+    summary = {}
+    for stage in args.stages:
+        ok = [r for r in results if r["stage"] == stage and r["status"] == "ok"]
+        summary[stage] = {
+            "time_exponent": scaling_exponent([(r["rows"], r["wall_sec"]) for r in ok]),
+            "rss_exponent": scaling_exponent([(r["rows"], r["peak_rss_mb"] - r["input_rss_mb"]) for r in ok]),
+            "largest_ok_rows": max((r["rows"] for r in ok), default=None),
+            "failed_at": min((r["corpus_rows"] for r in results if r["stage"] == stage and r["status"] != "ok"),
+                             default=None),
+        }
+
+    print("\n📈 Scaling (log-log slope of wall time vs rows; 1.0 = linear)")
+    ranked = sorted(summary.items(), key=lambda kv: (kv[1]["failed_at"] or math.inf, -(kv[1]["time_exponent"] or 0)))
+    for stage, s in ranked:
+        exp = "n/a" if s["time_exponent"] is None else f"{s['time_exponent']:.2f}"
+        failed = f"  ❌ failed at {s['failed_at']:,} rows" if s["failed_at"] else ""
+        print(f"  {stage:<12} slope {exp}{failed}")
+    print(f"👉 First to stop scaling: {ranked[0][0]}")
+
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    fields = ["stage", "rows", "rows_out", "wall_sec", "rows_per_sec", "peak_rss_mb", "input_rss_mb", "status"]
+    with open(RESULTS_DIR / f"pipeline_{stamp}.csv", "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=fields, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(results)
+    with open(RESULTS_DIR / f"pipeline_{stamp}.json", "w") as f:
+        json.dump({"cpus": os.cpu_count(), "results": results, "scaling": summary}, f, indent=2)
+    print(f"✅ Saved {RESULTS_DIR}/pipeline_{stamp}.csv and .json")
+
+
+if __name__ == "__main__":
+    main()
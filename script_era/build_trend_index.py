@@ -0,0 +1,201 @@
+# build_trend_index.py
+# Precomputed n-gram counts per year for the backend's /trends endpoint.
+#
+#   python build_trend_index.py build  --data datasets/song_lyrics_map_era.csv
+#   python build_trend_index.py append --data datasets/songs_2026.csv
+#
+# Streams the CSV in chunks through a HashingVectorizer (no stop words, so
+# "the" has a trend too) and sums counts per (year, n-gram) key with
+# np.unique + bincount over the CSR non-zeros, merging chunk partials in
+# batches. Nothing is sized by the hash space. The index is stored term-major over the hashed n-grams that
+# occur (compressed sparse columns) as plain .npy files the backend memory-maps:
+#   columns.npy  (n_used) uint32          sorted hashed n-gram ids present in the corpus
+#   indptr.npy   (n_used + 1) uint32/int64 slice of each n-gram in year_idx/counts
+#   year_idx.npy (nnz) uint8/uint16       row into years
+#   counts.npy   (nnz) uint32             occurrences in that year
+#   totals.npy   (3, n_years) int64       songs, unigrams, bigrams per year
+#   meta.json                             years, analyzer settings
+# Size follows the number of (n-gram, year) pairs, not the hash space, so the
+# 2**30 buckets make collisions between n-grams rare.
+# Eras are aggregated from years at query time, so they always agree.
+import argparse
+import json
+import re
+import shutil
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.feature_extraction.text import HashingVectorizer
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+TEXT_COL = "clean_lyrics"
+YEAR_COL = "year"
+N_FEATURES = 2 ** 30
+NGRAM_RANGE = (1, 2)
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"  # TfidfVectorizer default, as in the era models
+YEAR_MIN, YEAR_MAX = 1900, 2100
+CHUNK_SIZE = 20_000
+MERGE_EVERY = 8          # chunk partials held before they are summed
+INDEX_DIR = "../services/backend/app/models/trend_index"
+FORMAT_VERSION = 1
+
+
+def make_vectorizer(n_features):
+    return HashingVectorizer(
+        n_features=n_features,
+        ngram_range=NGRAM_RANGE,
+        token_pattern=TOKEN_PATTERN,
+        lowercase=True,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float64,
+    )
+
+
+def read_chunks(path, text_col, year_col):
+    for chunk in pd.read_csv(path, usecols=[text_col, year_col], chunksize=CHUNK_SIZE):
+        years = pd.to_numeric(chunk[year_col], errors="coerce")
+        keep = years.between(YEAR_MIN, YEAR_MAX) & chunk[text_col].notna()
+        yield chunk.loc[keep, text_col].astype(str).to_numpy(), years[keep].astype(np.int64).to_numpy()
+
+
+# -----------------------------
+# ACCUMULATE
+# -----------------------------
+def merge(parts):
+    """Sum (keys, values) partials into one pair with sorted unique keys."""
+    keys = np.concatenate([k for k, _ in parts])
+    values = np.concatenate([v for _, v in parts])
+    uniq, inverse = np.unique(keys, return_inverse=True)
+    return uniq, np.bincount(inverse, weights=values).astype(np.int64)
+
+
+def count_years(path, args, counts, totals, n_features):
+    """
+    counts: (keys, values) with key = year * n_features + hashed n-gram;
+    totals: (3, YEAR_MAX - YEAR_MIN + 1) songs / unigrams / bigrams.
+    """
+    vectorizer = make_vectorizer(n_features)
+    token_re = re.compile(TOKEN_PATTERN)
+    n_rows = YEAR_MAX - YEAR_MIN + 1
+    parts = [counts]
+    n_docs = 0
+    for texts, years in read_chunks(path, args.text_col, args.year_col):
+        X = vectorizer.transform(texts)
+        keys = np.repeat(years, np.diff(X.indptr)) * n_features + X.indices
+        parts.append(merge([(keys, X.data)]))
+        if len(parts) >= MERGE_EVERY:
+            parts = [merge(parts)]
+
+        rows = years - YEAR_MIN
+        n_tokens = np.fromiter((len(token_re.findall(t.lower())) for t in texts), dtype=np.int64, count=len(texts))
+        totals[0] += np.bincount(rows, minlength=n_rows)
+        totals[1] += np.bincount(rows, weights=n_tokens, minlength=n_rows).astype(np.int64)
+        totals[2] += np.bincount(rows, weights=np.maximum(n_tokens - 1, 0), minlength=n_rows).astype(np.int64)
+        n_docs += len(texts)
+    print(f"  {path}: {n_docs:,} songs")
+    return merge(parts)
+
+
+# -----------------------------
+# STORAGE
+# -----------------------------
+def save_index(out_dir, counts, totals, meta):
+    """Write to a sibling temp dir and swap it in, so readers never see a half-written index."""
+    n_features = meta["n_features"]
+    used = np.flatnonzero(totals[0])
+    years = (used + YEAR_MIN).tolist()
+    keys, data = counts
+    key_years, cols = np.divmod(keys, n_features)
+    order = np.lexsort((key_years, cols))  # term-major, years ascending within a term
+    cols, data = cols[order], data[order]
+    rows = np.searchsorted(years, key_years[order])
+    columns, starts = np.unique(cols, return_index=True)
+    indptr = np.append(starts, len(cols))
+    if data.size and data.max() > np.iinfo(np.uint32).max:
+        raise ValueError("count exceeds uint32")
+
+    tmp = out_dir.with_name(out_dir.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    np.save(tmp / "columns.npy", columns.astype(np.uint32))
+    np.save(tmp / "indptr.npy", indptr.astype(np.uint32 if len(data) < 2 ** 32 else np.int64))
+    np.save(tmp / "year_idx.npy", rows.astype(np.uint8 if len(years) <= 256 else np.uint16))
+    np.save(tmp / "counts.npy", data.astype(np.uint32))
+    np.save(tmp / "totals.npy", totals[:, used])
+    meta = {**meta, "format_version": FORMAT_VERSION, "years": years}
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    shutil.rmtree(out_dir, ignore_errors=True)
+    tmp.replace(out_dir)
+    size = sum(p.stat().st_size for p in out_dir.iterdir())
+    print(f"Saved {out_dir}: {len(years)} years ({years[0]}–{years[-1]}), {len(columns):,} n-grams, "
+          f"{len(data):,} non-zeros, {size / 1e6:.1f} MB")
+
+
+def load_index(index_dir):
+    meta = json.loads((index_dir / "meta.json").read_text(encoding="utf-8"))
+    if meta["format_version"] != FORMAT_VERSION:
+        raise SystemExit(f"{index_dir}: unsupported format version {meta['format_version']}")
+    columns = np.load(index_dir / "columns.npy").astype(np.int64)
+    indptr = np.load(index_dir / "indptr.npy").astype(np.int64)
+    years = np.asarray(meta["years"], dtype=np.int64)
+    key_years = years[np.load(index_dir / "year_idx.npy").astype(np.int64)]
+    keys = key_years * meta["n_features"] + np.repeat(columns, np.diff(indptr))
+    counts = merge([(keys, np.load(index_dir / "counts.npy").astype(np.int64))])
+    totals = np.zeros((3, YEAR_MAX - YEAR_MIN + 1), dtype=np.int64)
+    totals[:, years - YEAR_MIN] = np.load(index_dir / "totals.npy")
+    return counts, totals, meta
+
+
+# -----------------------------
+# COMMANDS
+# -----------------------------
+def build(args):
+    start = time.perf_counter()
+    empty = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64))
+    totals = np.zeros((3, YEAR_MAX - YEAR_MIN + 1), dtype=np.int64)
+    counts = count_years(args.data, args, empty, totals, args.n_features)
+    meta = {
+        "n_features": args.n_features,
+        "ngram_range": list(NGRAM_RANGE),
+        "token_pattern": TOKEN_PATTERN,
+        "lowercase": True,
+        "sources": [str(args.data)],
+    }
+    save_index(args.out, counts, totals, meta)
+    print(f"Built in {time.perf_counter() - start:.1f}s")
+
+
+def append(args):
+    start = time.perf_counter()
+    counts, totals, meta = load_index(args.out)
+    counts = count_years(args.data, args, counts, totals, meta["n_features"])
+    meta["sources"].append(str(args.data))
+    save_index(args.out, counts, totals, meta)
+    print(f"Appended in {time.perf_counter() - start:.1f}s")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-year n-gram count index for /trends.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("build", "append"):
+        p = sub.add_parser(name)
+        p.add_argument("--data", type=Path, required=True)
+        p.add_argument("--out", type=Path, default=Path(__file__).resolve().parent / INDEX_DIR)
+        p.add_argument("--text-col", default=TEXT_COL)
+        p.add_argument("--year-col", default=YEAR_COL)
+    sub.choices["build"].add_argument("--n-features", type=int, default=N_FEATURES)
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args)
+    else:
+        append(args)
+
+
+if __name__ == "__main__":
+    main()
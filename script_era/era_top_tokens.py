@@ -0,0 +1,336 @@
+# era_top_tokens.py
+# Per-era top tokens (mean TF-IDF and raw frequency) over the full corpus,
+# streaming the CSV in chunks with a fixed-size hashed vocabulary.
+#
+#   python era_top_tokens.py build  --data datasets/song_lyrics_map_era.csv
+#   python era_top_tokens.py update --data datasets/new_songs.csv
+#
+# build  pass 1: document frequency + per-era raw counts
+#        pass 2: per-era sums of l2-normalized TF-IDF rows, idf frozen from pass 1
+#        names : hashed columns of the top tokens are mapped back to n-grams
+# update adds new songs to the saved state with the frozen idf (old rows are
+#        not re-weighted, new n-grams are only counted; the printed idf drift
+#        says when to rebuild). Raw counts stay exact.
+#
+# Hashing keeps memory fixed but merges colliding n-grams into one column;
+# top tokens are frequent enough for this to be noise. Raise --n-features
+# for exact numbers on small corpora.
+#
+# Per-era sums are a sparse group-by: (eras × chunk) indicator matrix @ CSR
+# chunk. Memory is the accumulators (2 × eras × N_FEATURES float64, ~100 MB
+# for 2**20 features) plus one chunk, independent of corpus size.
+# Writes era_top_tokens.csv (era, rank, token, tfidf_score) like the notebook,
+# plus era_top_tokens_freq.csv (era, rank, token, count).
+import argparse
+import json
+import time
+from collections import Counter
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import scipy.sparse as sp
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.preprocessing import normalize
+from sklearn.utils import murmurhash3_32
+
+from mapping_era import ERA_LABELS
+
+# -----------------------------
+# CONFIG
+# -----------------------------
+TEXT_COL = "clean_lyrics"
+ERA_COL = "song_era"
+N_FEATURES = 2 ** 20
+NGRAM_RANGE = (1, 2)
+MIN_DF = 3
+TOP_K = 100
+NAME_POOL = 5            # keep names for NAME_POOL × TOP_K columns per ranking, for later updates
+CHUNK_SIZE = 20_000
+STATE_FILE = "era_top_tokens_state.npz"
+TFIDF_CSV = "era_top_tokens.csv"
+FREQ_CSV = "era_top_tokens_freq.csv"
+
+
+def make_vectorizer(config):
+    return HashingVectorizer(
+        n_features=config["n_features"],
+        stop_words="english",
+        ngram_range=tuple(config["ngram_range"]),
+        lowercase=True,
+        alternate_sign=False,
+        norm=None,
+        dtype=np.float64,
+    )
+
+
+def hash_column(term, n_features):
+    # Same bucket as HashingVectorizer (sklearn's _hashing_fast).
+    h = murmurhash3_32(term, seed=0)
+    if h == -2 ** 31:
+        return (2 ** 31 - 1 - (n_features - 1)) % n_features
+    return abs(h) % n_features
+
+
+def read_chunks(path, config):
+    """(texts, era ids) per chunk; rows without text or with an unknown era are dropped."""
+    era_index = {era: i for i, era in enumerate(config["eras"])}
+    usecols = [config["text_col"], config["era_col"]]
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=config["chunk_size"]):
+        chunk = chunk.dropna()
+        era_ids = chunk[config["era_col"]].astype(str).map(era_index)
+        keep = era_ids.notna().to_numpy()
+        yield chunk[config["text_col"]].astype(str).to_numpy()[keep], era_ids.to_numpy()[keep].astype(np.int64)
+
+
+def era_indicator(era_ids, n_eras):
+    n = len(era_ids)
+    return sp.csr_matrix((np.ones(n), (era_ids, np.arange(n))), shape=(n_eras, n))
+
+
+def add_grouped(acc, indicator, X):
+    """acc[era, col] += sum of X rows in that era, without densifying the product."""
+    grouped = (indicator @ X).tocoo()
+    acc[grouped.row, grouped.col] += grouped.data
+
+
+# -----------------------------
+# STATE
+# -----------------------------
+def new_state(config):
+    n_eras, n_features = len(config["eras"]), config["n_features"]
+    return {
+        "config": config,
+        "n_docs": 0,
+        "df": np.zeros(n_features, dtype=np.int64),
+        "era_docs": np.zeros(n_eras, dtype=np.int64),
+        "era_freq": np.zeros((n_eras, n_features)),
+        "era_tfidf": np.zeros((n_eras, n_features)),
+        "idf": None,
+        "names": {},
+    }
+
+
+def save_state(state, path):
+    names = state["names"]
+    np.savez_compressed(
+        path,
+        config=np.array(json.dumps(state["config"])),
+        n_docs=np.array(state["n_docs"]),
+        df=state["df"],
+        era_docs=state["era_docs"],
+        era_freq=state["era_freq"],
+        era_tfidf=state["era_tfidf"],
+        idf=state["idf"],
+        name_cols=np.fromiter(names.keys(), dtype=np.int64, count=len(names)),
+        name_terms=np.frombuffer("\n".join(names.values()).encode("utf-8"), dtype=np.uint8),
+    )
+
+
+def load_state(path):
+    with np.load(path, allow_pickle=False) as data:
+        terms = data["name_terms"].tobytes().decode("utf-8").split("\n") if data["name_terms"].size else []
+        return {
+            "config": json.loads(str(data["config"])),
+            "n_docs": int(data["n_docs"]),
+            "df": data["df"],
+            "era_docs": data["era_docs"],
+            "era_freq": data["era_freq"],
+            "era_tfidf": data["era_tfidf"],
+            "idf": data["idf"],
+            "names": dict(zip(data["name_cols"].tolist(), terms)),
+        }
+
+
+# -----------------------------
+# PASSES
+# -----------------------------
+def count_pass(state, path, vectorizer):
+    """df, document totals and per-era raw n-gram counts."""
+    n_eras = len(state["config"]["eras"])
+    for texts, era_ids in read_chunks(path, state["config"]):
+        X = vectorizer.transform(texts)
+        state["df"] += np.bincount(X.indices, minlength=len(state["df"]))
+        state["n_docs"] += len(texts)
+        state["era_docs"] += np.bincount(era_ids, minlength=n_eras)
+        add_grouped(state["era_freq"], era_indicator(era_ids, n_eras), X)
+
+
+def frozen_idf(state):
+    """
+    Smooth idf as in TfidfVectorizer. Columns the vectorizer would drop
+    (df < min_df, outside max_features) get 0 so they also leave the l2 norm.
+    """
+    config = state["config"]
+    idf = np.log((1 + state["n_docs"]) / (1 + state["df"])) + 1.0
+    keep = state["df"] >= config["min_df"]
+    if config["max_features"] and keep.sum() > config["max_features"]:
+        totals = np.where(keep, state["era_freq"].sum(axis=0), -1.0)
+        top = np.argpartition(-totals, config["max_features"])[:config["max_features"]]
+        keep = np.zeros_like(keep)
+        keep[top] = True
+    return np.where(keep, idf, 0.0)
+
+
+def tfidf_pass(state, path, vectorizer):
+    n_eras = len(state["config"]["eras"])
+    idf = state["idf"]
+    for texts, era_ids in read_chunks(path, state["config"]):
+        X = vectorizer.transform(texts)
+        X.data *= idf[X.indices]
+        X = normalize(X, norm="l2", copy=False)
+        add_grouped(state["era_tfidf"], era_indicator(era_ids, n_eras), X)
+
+
+def name_columns(state, columns, paths, vectorizer):
+    """Map hashed columns back to their most frequent n-gram, scanning chunks until all are named."""
+    n_features = state["config"]["n_features"]
+    missing = set(columns) - set(state["names"])
+    analyze = vectorizer.build_analyzer()
+    for path in paths:
+        if not missing:
+            break
+        for texts, _ in read_chunks(path, state["config"]):
+            counts = Counter(token for text in texts for token in analyze(text))
+            best = {}
+            for term, count in counts.items():
+                col = hash_column(term, n_features)
+                if col in missing and count > best.get(col, ("", 0))[1]:
+                    best[col] = (term, count)
+            for col, (term, _) in best.items():
+                state["names"][col] = term
+            missing -= set(best)
+            if not missing:
+                break
+    for col in missing:
+        state["names"][col] = f"<hash:{col}>"
+
+
+# -----------------------------
+# RANKING
+# -----------------------------
+def top_columns(scores, valid, k):
+    scores = np.where(valid, scores, -np.inf)
+    k = min(k, int(valid.sum()))
+    if k == 0:
+        return np.empty(0, dtype=np.int64)
+    top = np.argpartition(-scores, k - 1)[:k]
+    return top[np.argsort(-scores[top], kind="stable")]
+
+
+def rankings(state, k):
+    config = state["config"]
+    counted = state["df"] >= config["min_df"]  # exact, follows updates
+    weighted = state["idf"] > 0  # frozen at build; new n-grams join at the next build
+    means = state["era_tfidf"] / np.maximum(state["era_docs"], 1)[:, None]
+    by_tfidf = {era: top_columns(means[i], weighted, k) for i, era in enumerate(config["eras"])}
+    by_freq = {era: top_columns(state["era_freq"][i], counted, k) for i, era in enumerate(config["eras"])}
+    return means, by_tfidf, by_freq
+
+
+def write_rankings(state, by_tfidf, by_freq, means, top_k, tfidf_csv, freq_csv):
+    names = state["names"]
+    eras = state["config"]["eras"]
+    tfidf_rows = [
+        [era, rank, names[col], means[i, col]]
+        for i, era in enumerate(eras) for rank, col in enumerate(by_tfidf[era][:top_k], start=1)
+    ]
+    freq_rows = [
+        [era, rank, names[col], int(state["era_freq"][i, col])]
+        for i, era in enumerate(eras) for rank, col in enumerate(by_freq[era][:top_k], start=1)
+    ]
+    pd.DataFrame(tfidf_rows, columns=["era", "rank", "token", "tfidf_score"]).to_csv(tfidf_csv, index=False)
+    pd.DataFrame(freq_rows, columns=["era", "rank", "token", "count"]).to_csv(freq_csv, index=False)
+    print(f"Saved: {tfidf_csv}, {freq_csv}")
+
+
+def finish(state, paths, vectorizer, args):
+    pool = args.top_k * NAME_POOL
+    means, by_tfidf, by_freq = rankings(state, pool)
+    wanted = {int(c) for cols in (*by_tfidf.values(), *by_freq.values()) for c in cols}
+    # names of columns that fell out of the pool are dropped so the state stays bounded
+    state["names"] = {c: t for c, t in state["names"].items() if c in wanted}
+    name_columns(state, wanted, paths, vectorizer)
+    write_rankings(state, by_tfidf, by_freq, means, args.top_k, args.tfidf_csv, args.freq_csv)
+    save_state(state, args.state)
+    print(f"State: {args.state} ({state['n_docs']:,} docs)")
+
+
+# -----------------------------
+# COMMANDS
+# -----------------------------
+def build(args):
+    config = {
+        "eras": ERA_LABELS,
+        "text_col": args.text_col,
+        "era_col": args.era_col,
+        "n_features": args.n_features,
+        "ngram_range": list(NGRAM_RANGE),
+        "min_df": args.min_df,
+        "max_features": args.max_features,
+        "chunk_size": args.chunk_size,
+        "sources": [str(args.data)],
+    }
+    state = new_state(config)
+    vectorizer = make_vectorizer(config)
+    acc_mb = (state["era_freq"].nbytes + state["era_tfidf"].nbytes + state["df"].nbytes) / 1e6
+    print(f"Accumulators: {acc_mb:.0f} MB for {args.n_features:,} hashed features")
+
+    start = time.perf_counter()
+    count_pass(state, args.data, vectorizer)
+    print(f"Pass 1: {state['n_docs']:,} docs in {time.perf_counter() - start:.1f}s")
+    state["idf"] = frozen_idf(state)
+
+    start = time.perf_counter()
+    tfidf_pass(state, args.data, vectorizer)
+    print(f"Pass 2: {time.perf_counter() - start:.1f}s")
+    finish(state, [args.data], vectorizer, args)
+
+
+def update(args):
+    state = load_state(args.state)
+    config = state["config"]
+    vectorizer = make_vectorizer(config)
+    before = state["n_docs"]
+
+    count_pass(state, args.data, vectorizer)
+    tfidf_pass(state, args.data, vectorizer)  # frozen idf from the last build
+    print(f"Added {state['n_docs'] - before:,} docs ({state['n_docs']:,} total)")
+
+    _, by_tfidf, _ = rankings(state, args.top_k)
+    ranked = np.unique(np.concatenate(list(by_tfidf.values())))
+    current = np.log((1 + state["n_docs"]) / (1 + state["df"][ranked])) + 1.0
+    drift = np.abs(current / state["idf"][ranked] - 1).max() if len(ranked) else 0.0
+    print(f"Max idf drift of ranked tokens since build: {drift:.2%} (rebuild when this matters)")
+
+    config["sources"].append(str(args.data))
+    finish(state, [args.data] + [Path(p) for p in config["sources"][:-1]], vectorizer, args)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-era top tokens by mean TF-IDF and frequency.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    for name in ("build", "update"):
+        p = sub.add_parser(name)
+        p.add_argument("--data", type=Path, required=True)
+        p.add_argument("--state", type=Path, default=Path(STATE_FILE))
+        p.add_argument("--top-k", type=int, default=TOP_K)
+        p.add_argument("--tfidf-csv", type=Path, default=Path(TFIDF_CSV))
+        p.add_argument("--freq-csv", type=Path, default=Path(FREQ_CSV))
+    b = sub.choices["build"]
+    b.add_argument("--text-col", default=TEXT_COL)
+    b.add_argument("--era-col", default=ERA_COL)
+    b.add_argument("--n-features", type=int, default=N_FEATURES)
+    b.add_argument("--min-df", type=int, default=MIN_DF)
+    b.add_argument("--max-features", type=int, default=None,
+                   help="Keep only the most frequent n-grams (the notebook used 80000).")
+    b.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    args = parser.parse_args()
+    if args.command == "build":
+        build(args)
+    else:
+        update(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,19 +1,26 @@
 import pandas as pd
 
-# 1) Ensure year is numeric
-df = pd.read_csv("datasets/song_lyrics_cleaned.csv")
-df["year"] = pd.to_numeric(df["year"], errors="coerce")
-df = df.dropna(subset=["year"])
+ERA_BINS = [1970, 1980, 1990, 2000, 2010, 2020, 2026]
+ERA_LABELS = ["1970s", "1980s", "1990s", "2000s", "2010s", "2020s"]
 
-# 2) Filter valid range
-df = df[(df["year"] >= 1970) & (df["year"] <= 2025)]
 
-# 3) Map to eras (vectorized)
-bins = [1970, 1980, 1990, 2000, 2010, 2020, 2026]
-labels = ["1970s", "1980s", "1990s", "2000s", "2010s", "2020s"]
+def map_era(df):
+    # 2) Filter valid range
+    df = df[(df["year"] >= 1970) & (df["year"] <= 2025)].copy()
 
-df["song_era"] = pd.cut(df["year"], bins=bins, labels=labels, right=False)
+    # 3) Map to eras (vectorized)
+    df["song_era"] = pd.cut(df["year"], bins=ERA_BINS, labels=ERA_LABELS, right=False)
+    return df
 
-print("Counts per era:")
-print(df["song_era"].value_counts())
-df.to_csv("datasets/song_lyrics_map_era.csv")
\ No newline at end of file
+
+if __name__ == "__main__":
+    # 1) Ensure year is numeric
+    df = pd.read_csv("datasets/song_lyrics_cleaned.csv")
+    df["year"] = pd.to_numeric(df["year"], errors="coerce")
+    df = df.dropna(subset=["year"])
+
+    df = map_era(df)
+
+    print("Counts per era:")
+    print(df["song_era"].value_counts())
+    df.to_csv("datasets/song_lyrics_map_era.csv")
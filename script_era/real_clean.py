@@ -2,30 +2,7 @@ import pandas as pd
 import re
 
 RAW_PATH = "datasets/song_lyrics.csv"
-print("Loading:", RAW_PATH)
-df = pd.read_csv(RAW_PATH)
-print("Before:", len(df), "rows")
 
-# ---------------------------------------------------------
-# 1. BASIC FILTERING (keep only what survives later)
-# ---------------------------------------------------------
-df = df[df["language"] == "en"]
-df = df[df["lyrics"].notna()]
-
-noise_keywords = [
-    "google translate", "translate", "google", "edition",
-    "how to translate", "cover", "karaoke", "instrumental"
-]
-pattern = "|".join(noise_keywords)
-
-df["title"] = df["title"].fillna("")
-df = df[~df["title"].str.lower().str.contains(pattern)]
-
-# ---------------------------------------------------------
-# 2. YEAR CLEANING + DROP BAD ROWS
-# ---------------------------------------------------------
-df["year"] = pd.to_numeric(df["year"], errors="coerce")
-df = df.dropna(subset=["year"])
 
 # ---------------------------------------------------------
 # 3. CLEAN LYRICS + REMOVE SHORT ENTRIES
@@ -38,28 +15,65 @@ def clean_text(text):
     text = re.sub(r"[()]", " ", text)
     return text.lower().strip()
 
-df["clean_lyrics"] = df["lyrics"].apply(clean_text)
-df = df[df["clean_lyrics"].str.len() > 20]
+
+def clean_lyrics(df):
+    df = df.copy()
+    df["clean_lyrics"] = df["lyrics"].apply(clean_text)
+    return df[df["clean_lyrics"].str.len() > 20]
+
 
 # ---------------------------------------------------------
 # 4. REMOVE DUPLICATE CLEAN LYRICS
 #    Keep rule: oldest year → highest views
 # ---------------------------------------------------------
-if "views" in df.columns:
-    df["views"] = pd.to_numeric(df["views"], errors="coerce").fillna(0)
-    df = df.sort_values(by=["clean_lyrics", "year", "views"],
-                        ascending=[True, True, False])
-else:
-    df = df.sort_values(by=["clean_lyrics", "year"],
-                        ascending=[True, True])
+def dedup_lyrics(df):
+    if "views" in df.columns:
+        df = df.assign(views=pd.to_numeric(df["views"], errors="coerce").fillna(0))
+        df = df.sort_values(by=["clean_lyrics", "year", "views"],
+                            ascending=[True, True, False])
+    else:
+        df = df.sort_values(by=["clean_lyrics", "year"],
+                            ascending=[True, True])
+    return df.drop_duplicates(subset=["clean_lyrics"], keep="first")
 
-df = df.drop_duplicates(subset=["clean_lyrics"], keep="first")
-print("After cleaning:", len(df), "rows")
 
-# Save full cleaned file (optional)
-df.to_csv("datasets/song_lyrics_cleaned.csv", index=False)
+def load_raw(path=RAW_PATH):
+    print("Loading:", path)
+    df = pd.read_csv(path)
+    print("Before:", len(df), "rows")
 
-# ---------------------------------------------------------
-# 5. FILTER BY YEAR RANGE
-# ---------------------------------------------------------
-df = df[(df["year"] >= 1970) & (df["year"] <= 2025)]
\ No newline at end of file
+    # ---------------------------------------------------------
+    # 1. BASIC FILTERING (keep only what survives later)
+    # ---------------------------------------------------------
+    df = df[df["language"] == "en"]
+    df = df[df["lyrics"].notna()]
+
+    noise_keywords = [
+        "google translate", "translate", "google", "edition",
+        "how to translate", "cover", "karaoke", "instrumental"
+    ]
+    pattern = "|".join(noise_keywords)
+
+    df["title"] = df["title"].fillna("")
+    df = df[~df["title"].str.lower().str.contains(pattern)]
+
+    # ---------------------------------------------------------
+    # 2. YEAR CLEANING + DROP BAD ROWS
+    # ---------------------------------------------------------
+    df["year"] = pd.to_numeric(df["year"], errors="coerce")
+    return df.dropna(subset=["year"])
+
+
+if __name__ == "__main__":
+    df = load_raw()
+    df = clean_lyrics(df)
+    df = dedup_lyrics(df)
+    print("After cleaning:", len(df), "rows")
+
+    # Save full cleaned file (optional)
+    df.to_csv("datasets/song_lyrics_cleaned.csv", index=False)
+
+    # ---------------------------------------------------------
+    # 5. FILTER BY YEAR RANGE
+    # ---------------------------------------------------------
+    df = df[(df["year"] >= 1970) & (df["year"] <= 2025)]
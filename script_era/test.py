@@ -17,129 +17,141 @@ TEXT_COL = "clean_lyrics"
 ERA_COL  = "song_era"
 MODEL_DIR = "tfidf_models"
 
-os.makedirs(MODEL_DIR, exist_ok=True)
-
 
 # -----------------------------
-# LOAD DATA
+# TF-IDF VECTORIZE (fit)
 # -----------------------------
-train_df = pd.read_csv("datasets/train_split.csv")
-val_df   = pd.read_csv("datasets/val_split.csv")
-test_df  = pd.read_csv("datasets/test_split.csv")
+def fit_tfidf(texts, max_features=50000):
+    vectorizer = TfidfVectorizer(
+        stop_words="english",
+        max_features=max_features,
+        ngram_range=(1, 2),
+        min_df=3
+    )
+    X = vectorizer.fit_transform(texts)
+    return vectorizer, X
 
-print("Loaded datasets:")
-print(len(train_df), "train")
-print(len(val_df), "val")
-print(len(test_df), "test")
 
+def main():
+    os.makedirs(MODEL_DIR, exist_ok=True)
 
-# -----------------------------
-# LABEL ENCODING
-# -----------------------------
-label_encoder = LabelEncoder()
-train_df["label_id"] = label_encoder.fit_transform(train_df[ERA_COL])
-val_df["label_id"]   = label_encoder.transform(val_df[ERA_COL])
-test_df["label_id"]  = label_encoder.transform(test_df[ERA_COL])
+    # -----------------------------
+    # LOAD DATA
+    # -----------------------------
+    train_df = pd.read_csv("datasets/train_split.csv")
+    val_df   = pd.read_csv("datasets/val_split.csv")
+    test_df  = pd.read_csv("datasets/test_split.csv")
 
-y_train = train_df["label_id"].values
-y_val   = val_df["label_id"].values
-y_test  = test_df["label_id"].values
+    print("Loaded datasets:")
+    print(len(train_df), "train")
+    print(len(val_df), "val")
+    print(len(test_df), "test")
 
-num_classes = len(label_encoder.classes_)
-print("Num classes =", num_classes)
 
+    # -----------------------------
+    # LABEL ENCODING
+    # -----------------------------
+    label_encoder = LabelEncoder()
+    train_df["label_id"] = label_encoder.fit_transform(train_df[ERA_COL])
+    val_df["label_id"]   = label_encoder.transform(val_df[ERA_COL])
+    test_df["label_id"]  = label_encoder.transform(test_df[ERA_COL])
 
-# -----------------------------
-# TF-IDF VECTORIZE
-# -----------------------------
-vectorizer = TfidfVectorizer(
-    stop_words="english",
-    max_features=50000,
-    ngram_range=(1, 2),
-    min_df=3
-)
+    y_train = train_df["label_id"].values
+    y_val   = val_df["label_id"].values
+    y_test  = test_df["label_id"].values
 
-print("Fitting TF-IDF...")
-X_train = vectorizer.fit_transform(train_df[TEXT_COL])
-X_val   = vectorizer.transform(val_df[TEXT_COL])
-X_test  = vectorizer.transform(test_df[TEXT_COL])
+    num_classes = len(label_encoder.classes_)
+    print("Num classes =", num_classes)
 
-print("TF-IDF complete.")
-print("Train shape:", X_train.shape)
 
+    # -----------------------------
+    # TF-IDF VECTORIZE
+    # -----------------------------
+    print("Fitting TF-IDF...")
+    vectorizer, X_train = fit_tfidf(train_df[TEXT_COL])
+    X_val   = vectorizer.transform(val_df[TEXT_COL])
+    X_test  = vectorizer.transform(test_df[TEXT_COL])
 
-# -----------------------------
-# TRAIN ONE-VS-REST (manual)
-# -----------------------------
-models = []
-probas_train = []
-probas_val = []
+    print("TF-IDF complete.")
+    print("Train shape:", X_train.shape)
 
-print("\nTraining Logistic Regression (OvR)...\n")
 
-for c in range(num_classes):
-    print(f"Training classifier for class {c}/{num_classes-1}...")
-    y_train_binary = (y_train == c).astype(int)
-    y_val_binary   = (y_val == c).astype(int)
+    # -----------------------------
+    # TRAIN ONE-VS-REST (manual)
+    # -----------------------------
+    models = []
+    probas_train = []
+    probas_val = []
 
-    clf = LogisticRegression(
-        max_iter=500,
-        class_weight="balanced",
-        solver="liblinear"
-    )
+    print("\nTraining Logistic Regression (OvR)...\n")
 
-    clf.fit(X_train, y_train_binary)
-    models.append(clf)
+    for c in range(num_classes):
+        print(f"Training classifier for class {c}/{num_classes-1}...")
+        y_train_binary = (y_train == c).astype(int)
+        y_val_binary   = (y_val == c).astype(int)
 
-    probas_train.append(clf.predict_proba(X_train)[:, 1])
-    probas_val.append(clf.predict_proba(X_val)[:, 1])
+        clf = LogisticRegression(
+            max_iter=500,
+            class_weight="balanced",
+            solver="liblinear"
+        )
 
-print("\nAll classifiers trained.")
+        clf.fit(X_train, y_train_binary)
+        models.append(clf)
 
+        probas_train.append(clf.predict_proba(X_train)[:, 1])
+        probas_val.append(clf.predict_proba(X_val)[:, 1])
 
-# -----------------------------
-# COMBINE PROBABILITIES
-# -----------------------------
-probas_train = np.vstack(probas_train).T
-probas_val   = np.vstack(probas_val).T
+    print("\nAll classifiers trained.")
 
-y_pred_train = probas_train.argmax(axis=1)
-y_pred_val   = probas_val.argmax(axis=1)
 
-print("\n===== EVALUATION =====")
-print("Train Accuracy:", accuracy_score(y_train, y_pred_train))
-print("Val Accuracy:", accuracy_score(y_val, y_pred_val))
-print("\nValidation Classification Report:")
-print(classification_report(y_val, y_pred_val, target_names=label_encoder.classes_))
+    # -----------------------------
+    # COMBINE PROBABILITIES
+    # -----------------------------
+    probas_train = np.vstack(probas_train).T
+    probas_val   = np.vstack(probas_val).T
 
+    y_pred_train = probas_train.argmax(axis=1)
+    y_pred_val   = probas_val.argmax(axis=1)
 
-# -----------------------------
-# TEST SET PREDICTION
-# -----------------------------
-probas_test = []
-for clf in models:
-    probas_test.append(clf.predict_proba(X_test)[:, 1])
+    print("\n===== EVALUATION =====")
+    print("Train Accuracy:", accuracy_score(y_train, y_pred_train))
+    print("Val Accuracy:", accuracy_score(y_val, y_pred_val))
+    print("\nValidation Classification Report:")
+    print(classification_report(y_val, y_pred_val, target_names=label_encoder.classes_))
 
-probas_test = np.vstack(probas_test).T
-y_pred_test = probas_test.argmax(axis=1)
 
-print("Test Accuracy:", accuracy_score(y_test, y_pred_test))
-print("\nTest Classification Report:")
-print(classification_report(y_test, y_pred_test, target_names=label_encoder.classes_))
+    # -----------------------------
+    # TEST SET PREDICTION
+    # -----------------------------
+    probas_test = []
+    for clf in models:
+        probas_test.append(clf.predict_proba(X_test)[:, 1])
 
+    probas_test = np.vstack(probas_test).T
+    y_pred_test = probas_test.argmax(axis=1)
 
-# -----------------------------
-# SAVE MODELS + TF-IDF + ENCODER
-# -----------------------------
-print("\nSaving models...")
+    print("Test Accuracy:", accuracy_score(y_test, y_pred_test))
+    print("\nTest Classification Report:")
+    print(classification_report(y_test, y_pred_test, target_names=label_encoder.classes_))
+
+
+    # -----------------------------
+    # SAVE MODELS + TF-IDF + ENCODER
+    # -----------------------------
+    print("\nSaving models...")
+
+    # Save all binary logistic models
+    for c, clf in enumerate(models):
+        joblib.dump(clf, f"{MODEL_DIR}/logreg_class_{c}.joblib")
+
+    # Save vectorizer + encoder
+    joblib.dump(vectorizer, f"{MODEL_DIR}/tfidf_vectorizer.joblib")
+    joblib.dump(label_encoder, f"{MODEL_DIR}/label_encoder.joblib")
 
-# Save all binary logistic models
-for c, clf in enumerate(models):
-    joblib.dump(clf, f"{MODEL_DIR}/logreg_class_{c}.joblib")
+    print("All models saved to:", MODEL_DIR)
+    print("Done!")
 
-# Save vectorizer + encoder
-joblib.dump(vectorizer, f"{MODEL_DIR}/tfidf_vectorizer.joblib")
-joblib.dump(label_encoder, f"{MODEL_DIR}/label_encoder.joblib")
 
-print("All models saved to:", MODEL_DIR)
-print("Done!")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,62 @@
+"""
+Cost-aware cascade over the era models, cheapest first.
+
+Each stage returns one-vs-rest P(era); the request stops at the first stage
+whose top-two margin (on scores normalized to sum to 1) reaches the
+threshold, otherwise it escalates to the next, heavier model. The same rule
+drives /predict/era/ensemble and the offline replay in tools/replay_cascade.py.
+"""
+
+from dataclasses import asdict, dataclass
+from typing import Sequence
+
+import numpy as np
+
+CASCADE_ORDER = ("tfidf", "w2v", "roberta")
+
+
+def era_margin(scores: dict[str, float]) -> float:
+    """Top-1 minus top-2 of the normalized era scores; 1.0 when only one era is scored."""
+    values = sorted(scores.values(), reverse=True)
+    total = sum(values)
+    if len(values) < 2 or total <= 0:
+        return 1.0
+    return (values[0] - values[1]) / total
+
+
+@dataclass(slots=True)
+class CascadeStep:
+    model: str
+    margin: float
+    ms: float
+
+    def as_dict(self) -> dict:
+        return asdict(self)
+
+
+def replay(scores: dict[str, Sequence[dict[str, float]]], seconds: dict[str, np.ndarray], labels: Sequence[str],
+           threshold: float) -> dict:
+    """
+    Simulate the cascade for one threshold from precomputed per-model scores
+    and latencies (models in cascade order, one entry per document).
+    """
+    models = list(scores)
+    n = len(labels)
+    correct = 0
+    cost = np.zeros(n)
+    exits = dict.fromkeys(models, 0)
+    for i in range(n):
+        for model in models:
+            probs = scores[model][i]
+            cost[i] += seconds[model][i]
+            if model == models[-1] or era_margin(probs) >= threshold:
+                break
+        exits[model] += 1
+        correct += max(probs, key=probs.get) == labels[i]
+    return {
+        "threshold": threshold,
+        "accuracy": correct / n if n else 0.0,
+        "mean_ms": float(cost.mean() * 1000) if n else 0.0,
+        "p95_ms": float(np.percentile(cost, 95) * 1000) if n else 0.0,
+        "exit_rate": {model: count / n if n else 0.0 for model, count in exits.items()},
+    }
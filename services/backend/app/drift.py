@@ -0,0 +1,292 @@
+"""
+Input drift monitoring with constant-memory streaming sketches.
+
+Requests only enqueue their cleaned text (dropped when the queue is full); a
+worker thread folds it into
+    - a count-min sketch of token frequencies,
+    - a Misra-Gries heavy-hitter summary (batched, mergeable variant),
+    - the out-of-vocabulary rate against the era models' vocabulary,
+    - a histogram of token counts per text,
+and `report()` compares them with the reference profile from
+tools/build_drift_reference.py (built on train_split.csv).
+
+The summaries live in two generations that rotate every `window` texts, and
+reports merge both, so they cover the last `window` to `2 * window` texts
+rather than everything since startup.
+
+Tokens are the era TF-IDF unigrams (lowercase, `(?u)\\b\\w\\w+\\b`); English
+stop words count as in-vocabulary since the vectorizers drop them on purpose.
+"""
+
+import json
+import logging
+import queue
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+TOKEN_PATTERN = r"(?u)\b\w\w+\b"
+LENGTH_EDGES = (0, 25, 50, 100, 150, 200, 300, 400, 600, 800, 1200)  # tokens; last bin is open-ended
+
+# A component at its threshold contributes 1.0 to the drift score.
+LENGTH_PSI_THRESHOLD = 0.25  # population stability index, the usual "significant shift" cut-off
+TOKEN_JS_THRESHOLD = 0.1  # Jensen-Shannon divergence (base 2) over reference top tokens + "other"
+OOV_DELTA_THRESHOLD = 0.1  # absolute increase of the OOV rate
+
+
+def tokenize(clean_text: str) -> list[str]:
+    return re.findall(TOKEN_PATTERN, clean_text.lower())
+
+
+def length_bin(n_tokens: int) -> int:
+    return int(np.searchsorted(LENGTH_EDGES, n_tokens, side="right")) - 1
+
+
+class CountMinSketch:
+    """Over-estimating frequency counts in depth × width int64 cells (in-process hash, not persisted)."""
+
+    def __init__(self, width: int = 2 ** 14, depth: int = 4) -> None:
+        self.width = width
+        self.depth = depth
+        self.table = np.zeros((depth, width), dtype=np.int64)
+        self._rows = np.arange(depth)[:, None]
+        self._steps = np.arange(depth, dtype=np.uint64)[:, None]
+
+    def _cells(self, tokens: Iterable[str]) -> np.ndarray:
+        # Kirsch–Mitzenmacher: depth indexes from the two halves of one 64-bit hash.
+        h = np.fromiter((hash(t) & 0xFFFFFFFFFFFFFFFF for t in tokens), dtype=np.uint64)
+        h1, h2 = h & np.uint64(0xFFFFFFFF), (h >> np.uint64(32)) | np.uint64(1)
+        return ((h1 + self._steps * h2) % np.uint64(self.width)).astype(np.int64)
+
+    def add(self, counts: Counter) -> None:
+        if counts:
+            cells = self._cells(counts.keys())
+            values = np.fromiter(counts.values(), dtype=np.int64, count=len(counts))
+            np.add.at(self.table, (np.broadcast_to(self._rows, cells.shape), cells), values)
+
+    def merged(self, other: "CountMinSketch") -> "CountMinSketch":
+        out = CountMinSketch(self.width, self.depth)
+        out.table = self.table + other.table
+        return out
+
+    def query(self, tokens: list[str]) -> np.ndarray:
+        if not tokens:
+            return np.zeros(0, dtype=np.int64)
+        return self.table[self._rows, self._cells(tokens)].min(axis=0)
+
+
+class MisraGries:
+    """Top-k heavy hitters; counts under-estimate by at most total / (capacity + 1)."""
+
+    def __init__(self, capacity: int = 256) -> None:
+        self.capacity = capacity
+        self.counts: dict[str, int] = {}
+
+    def add(self, counts: Counter) -> None:
+        merged = self.counts
+        for token, count in counts.items():
+            merged[token] = merged.get(token, 0) + count
+        if len(merged) > self.capacity:
+            values = np.fromiter(merged.values(), dtype=np.int64, count=len(merged))
+            cut = int(np.partition(values, len(values) - self.capacity - 1)[len(values) - self.capacity - 1])
+            self.counts = {t: c - cut for t, c in merged.items() if c > cut}
+
+    def top(self, k: int) -> list[tuple[str, int]]:
+        return sorted(self.counts.items(), key=lambda kv: -kv[1])[:k]
+
+    def merged(self, other: "MisraGries") -> "MisraGries":
+        out = MisraGries(self.capacity)
+        out.counts = dict(self.counts)
+        out.add(Counter(other.counts))
+        return out
+
+
+def _psi(live: np.ndarray, ref: np.ndarray, eps: float = 1e-4) -> float:
+    p = np.maximum(live / max(live.sum(), 1), eps)
+    q = np.maximum(ref / max(ref.sum(), 1), eps)
+    return float(np.sum((p - q) * np.log(p / q)))
+
+
+def _js(p: np.ndarray, q: np.ndarray) -> float:
+    p = p / p.sum() if p.sum() > 0 else p
+    q = q / q.sum() if q.sum() > 0 else q
+    m = (p + q) / 2
+
+    def kl(a: np.ndarray) -> float:
+        nz = a > 0
+        return float(np.sum(a[nz] * np.log2(a[nz] / m[nz])))
+
+    return (kl(p) + kl(q)) / 2
+
+
+class LiveProfile:
+    """Streaming summaries of one generation of request texts."""
+
+    def __init__(self) -> None:
+        self.cms = CountMinSketch()
+        self.heavy = MisraGries()
+        self.lengths = np.zeros(len(LENGTH_EDGES), dtype=np.int64)
+        self.n_texts = 0
+        self.n_tokens = 0
+        self.n_oov = 0
+
+    def add(self, counts: Counter, n_tokens: int, n_oov: int) -> None:
+        self.cms.add(counts)
+        self.heavy.add(counts)
+        self.lengths[length_bin(n_tokens)] += 1
+        self.n_texts += 1
+        self.n_tokens += n_tokens
+        self.n_oov += n_oov
+
+    def merged(self, other: "LiveProfile") -> "LiveProfile":
+        out = LiveProfile()
+        out.cms = self.cms.merged(other.cms)
+        out.heavy = self.heavy.merged(other.heavy)
+        out.lengths = self.lengths + other.lengths
+        out.n_texts = self.n_texts + other.n_texts
+        out.n_tokens = self.n_tokens + other.n_tokens
+        out.n_oov = self.n_oov + other.n_oov
+        return out
+
+
+class DriftMonitor:
+    def __init__(self, reference: dict, vocabulary: Iterable[str], queue_size: int = 1024,
+                 window: int = 10_000) -> None:
+        self.reference = reference
+        self.vocabulary = frozenset(vocabulary)
+        self.ref_tokens: list[str] = [t for t, _ in reference["top_tokens"]]
+        self.ref_token_freq = np.array([c for _, c in reference["top_tokens"]], dtype=np.float64)
+        self.window = window  # texts per generation; 0 keeps everything since startup
+        self.current = LiveProfile()
+        self.previous = LiveProfile()
+        self.n_seen = 0
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[str | None] = queue.Queue(maxsize=queue_size)
+        self._thread: threading.Thread | None = None
+        if reference.get("vocabulary_size") not in (None, len(self.vocabulary)):
+            logging.warning("Drift reference was built against %s vocabulary terms, backend has %s",
+                            reference["vocabulary_size"], len(self.vocabulary))
+
+    @classmethod
+    def load(cls, path: str | Path, vocabulary: Iterable[str], window: int = 10_000) -> "DriftMonitor":
+        return cls(json.loads(Path(path).read_text(encoding="utf-8")), vocabulary, window=window)
+
+    # ---- request path ----
+    def observe(self, clean_text: str) -> None:
+        try:
+            self._queue.put_nowait(clean_text)
+        except queue.Full:
+            self.dropped += 1
+
+    # ---- worker ----
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="drift-monitor", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._queue.put(None)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def _run(self) -> None:
+        while True:
+            text = self._queue.get()
+            if text is None:
+                return
+            try:
+                self.update(text)
+            except Exception:  # never let one odd input stop monitoring
+                logging.exception("Drift monitor update failed")
+
+    def update(self, clean_text: str) -> None:
+        tokens = tokenize(clean_text)
+        counts = Counter(tokens)
+        oov = sum(c for t, c in counts.items() if t not in self.vocabulary)
+        with self._lock:
+            if self.window and self.current.n_texts >= self.window:
+                self.previous, self.current = self.current, LiveProfile()
+            self.current.add(counts, len(tokens), oov)
+            self.n_seen += 1
+
+    # ---- comparison ----
+    def report(self, top: int = 20) -> dict:
+        with self._lock:
+            live = self.current.merged(self.previous)
+            n_seen = self.n_seen
+        n_texts, n_tokens, n_oov, lengths = live.n_texts, live.n_tokens, live.n_oov, live.lengths
+        live_ref = live.cms.query(self.ref_tokens).astype(np.float64)
+        heavy = live.heavy.top(top)
+
+        ref = self.reference
+        if n_texts == 0:
+            return {"texts": 0, "texts_seen": n_seen, "window": self.window, "drift_score": None,
+                    "status": "no data", "dropped": self.dropped}
+
+        # Reference top-token distribution (+ everything else) vs. live estimates of the same tokens.
+        live_other = max(n_tokens - live_ref.sum(), 0.0)
+        ref_other = max(ref["n_tokens"] - self.ref_token_freq.sum(), 0.0)
+        token_js = _js(np.append(live_ref, live_other), np.append(self.ref_token_freq, ref_other))
+        length_psi = _psi(lengths.astype(np.float64), np.asarray(ref["length_histogram"], dtype=np.float64))
+        oov_rate = n_oov / n_tokens if n_tokens else 0.0
+        oov_delta = oov_rate - ref["oov_rate"]
+
+        score = max(length_psi / LENGTH_PSI_THRESHOLD, token_js / TOKEN_JS_THRESHOLD,
+                    max(oov_delta, 0.0) / OOV_DELTA_THRESHOLD)
+        known = set(self.ref_tokens)
+        return {
+            "texts": n_texts,
+            "texts_seen": n_seen,
+            "window": self.window,
+            "tokens": n_tokens,
+            "dropped": self.dropped,
+            "drift_score": round(score, 4),
+            "status": "drift" if score >= 1 else "warn" if score >= 0.5 else "ok",
+            "token_js": round(token_js, 4),
+            "length_psi": round(length_psi, 4),
+            "oov_rate": round(oov_rate, 4),
+            "reference_oov_rate": round(ref["oov_rate"], 4),
+            "length_histogram": {"edges": list(LENGTH_EDGES), "live": lengths.tolist(),
+                                 "reference": ref["length_histogram"]},
+            "heavy_hitters": [{"token": t, "count_lower_bound": c, "in_reference_top": t in known}
+                              for t, c in heavy],
+        }
+
+
+def build_reference(texts: Iterable[str], vocabulary: Iterable[str], top_n: int = 1000) -> dict:
+    """Exact reference profile of cleaned training texts, in the shape DriftMonitor.report expects."""
+    vocabulary = frozenset(vocabulary)
+    freq: Counter = Counter()
+    lengths = np.zeros(len(LENGTH_EDGES), dtype=np.int64)
+    n_texts = n_tokens = n_oov = 0
+    for text in texts:
+        tokens = tokenize(text)
+        freq.update(tokens)
+        lengths[length_bin(len(tokens))] += 1
+        n_texts += 1
+        n_tokens += len(tokens)
+        n_oov += sum(1 for t in tokens if t not in vocabulary)
+    return {
+        "n_texts": n_texts,
+        "n_tokens": n_tokens,
+        "oov_rate": n_oov / n_tokens if n_tokens else 0.0,
+        "vocabulary_size": len(vocabulary),
+        "length_histogram": lengths.tolist(),
+        "top_tokens": freq.most_common(top_n),
+        "token_pattern": TOKEN_PATTERN,
+    }
+
+
+def model_vocabulary(featurizers: Iterable) -> set[str]:
+    """Unigrams of the given TfidfFeaturizers plus their stop words (hashing featurizers add stop words only)."""
+    vocab: set[str] = set()
+    for featurizer in featurizers:
+        vocab.update(t for t in featurizer.vocabulary if " " not in t)
+        vocab.update(featurizer.stop_words)
+    return vocab
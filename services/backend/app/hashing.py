@@ -0,0 +1,60 @@
+"""
+Pure-Python MurmurHash3 (x86, 32-bit) matching sklearn.utils.murmurhash3_32,
+so indexes built with sklearn's HashingVectorizer can be queried without
+importing scikit-learn.
+"""
+
+_C1 = 0xCC9E2D51
+_C2 = 0x1B873593
+_MASK = 0xFFFFFFFF
+
+
+def _rotl32(x: int, r: int) -> int:
+    return ((x << r) | (x >> (32 - r))) & _MASK
+
+
+def murmurhash3_32(key: str | bytes, seed: int = 0, positive: bool = False) -> int:
+    data = key.encode("utf-8") if isinstance(key, str) else key
+    h = seed & _MASK
+    n_blocks = len(data) // 4
+
+    for i in range(n_blocks):
+        k = int.from_bytes(data[4 * i:4 * i + 4], "little")
+        k = (k * _C1) & _MASK
+        k = _rotl32(k, 15)
+        k = (k * _C2) & _MASK
+        h ^= k
+        h = _rotl32(h, 13)
+        h = (h * 5 + 0xE6546B64) & _MASK
+
+    tail = data[4 * n_blocks:]
+    k = 0
+    if len(tail) >= 3:
+        k ^= tail[2] << 16
+    if len(tail) >= 2:
+        k ^= tail[1] << 8
+    if tail:
+        k ^= tail[0]
+        k = (k * _C1) & _MASK
+        k = _rotl32(k, 15)
+        k = (k * _C2) & _MASK
+        h ^= k
+
+    h ^= len(data)
+    h ^= h >> 16
+    h = (h * 0x85EBCA6B) & _MASK
+    h ^= h >> 13
+    h = (h * 0xC2B2AE35) & _MASK
+    h ^= h >> 16
+
+    if positive:
+        return h
+    return h - (1 << 32) if h & 0x80000000 else h
+
+
+def hashed_index(term: str, n_features: int) -> int:
+    """Column HashingVectorizer(alternate_sign=False) assigns to `term`."""
+    h = murmurhash3_32(term)
+    if h == -(2 ** 31):
+        return (2 ** 31 - 1 - (n_features - 1)) % n_features
+    return abs(h) % n_features
@@ -0,0 +1,205 @@
+"""
+In-process metrics for the inference backend, rendered in Prometheus text format.
+
+Kept dependency-free (no prometheus_client) so the service has nothing new to
+install. Everything is process-local: with several uvicorn workers, scrape each
+worker or run a single worker per container.
+"""
+
+import bisect
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Hashable, Iterator
+
+# Seconds. Request buckets reach into scrape territory; stage buckets are finer.
+REQUEST_BUCKETS: tuple[float, ...] = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+STAGE_BUCKETS: tuple[float, ...] = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0, 10.0)
+
+TIMING_HEADER = "X-Debug-Timing"  # opt-in request header for Server-Timing
+
+
+class _Histogram:
+    __slots__ = ("buckets", "counts", "count", "total")
+
+    def __init__(self, buckets: tuple[float, ...]) -> None:
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # last slot is the +Inf overflow
+        self.count = 0
+        self.total = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+
+
+def _labels(names: tuple[str, ...], values: tuple[str, ...], extra: str = "") -> str:
+    parts = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _escape(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+class MetricsRegistry:
+    """Counters, gauges and histograms keyed by (metric name, label values)."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._meta: dict[str, tuple[str, str, tuple[str, ...], tuple[float, ...] | None]] = {}
+        self._values: dict[str, dict[tuple[str, ...], Any]] = defaultdict(dict)
+
+    def register(
+        self,
+        name: str,
+        kind: str,
+        help_text: str,
+        labels: tuple[str, ...] = (),
+        buckets: tuple[float, ...] | None = None,
+    ) -> None:
+        self._meta[name] = (kind, help_text, labels, buckets)
+
+    def inc(self, name: str, labels: tuple[str, ...] = (), amount: float = 1.0) -> None:
+        with self._lock:
+            series = self._values[name]
+            series[labels] = series.get(labels, 0.0) + amount
+
+    def set(self, name: str, labels: tuple[str, ...], value: float) -> None:
+        with self._lock:
+            self._values[name][labels] = value
+
+    def observe(self, name: str, labels: tuple[str, ...], value: float) -> None:
+        buckets = self._meta[name][3]
+        with self._lock:
+            series = self._values[name]
+            hist = series.get(labels)
+            if hist is None:
+                hist = series[labels] = _Histogram(buckets)
+            hist.observe(value)
+
+    def render(self) -> str:
+        lines: list[str] = []
+        with self._lock:
+            for name, (kind, help_text, label_names, _) in self._meta.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {kind}")
+                for labels, value in sorted(self._values.get(name, {}).items()):
+                    if kind != "histogram":
+                        lines.append(f"{name}{_labels(label_names, labels)} {value:g}")
+                        continue
+                    cumulative = 0
+                    bounds = [f"{b:g}" for b in value.buckets] + ["+Inf"]
+                    for bound, n in zip(bounds, value.counts):
+                        cumulative += n
+                        le = 'le="' + bound + '"'
+                        lines.append(f"{name}_bucket{_labels(label_names, labels, le)} {cumulative}")
+                    lines.append(f"{name}_sum{_labels(label_names, labels)} {value.total:.6f}")
+                    lines.append(f"{name}_count{_labels(label_names, labels)} {value.count}")
+        return "\n".join(lines) + "\n"
+
+
+METRICS = MetricsRegistry()
+METRICS.register(
+    "backend_request_duration_seconds", "histogram", "End-to-end request latency.", ("endpoint",), REQUEST_BUCKETS
+)
+METRICS.register("backend_requests_total", "counter", "Requests by endpoint and status code.", ("endpoint", "status"))
+METRICS.register(
+    "backend_stage_duration_seconds", "histogram", "Latency of one pipeline stage within a request.", ("stage",),
+    STAGE_BUCKETS,
+)
+METRICS.register("backend_cache_requests_total", "counter", "Cache lookups by result (hit/miss).", ("cache", "result"))
+METRICS.register("backend_cascade_exits_total", "counter", "Ensemble requests by the model that answered.", ("model",))
+METRICS.register("backend_model_load_seconds", "gauge", "Wall time spent loading a model at startup.", ("model",))
+
+# Per-request stage timings; only set when the caller opted in via TIMING_HEADER.
+_request_timings: ContextVar[list[tuple[str, float]] | None] = ContextVar("request_timings", default=None)
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time one stage (clean, vectorize, score, scrape, ...) of the current request."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - start
+        METRICS.observe("backend_stage_duration_seconds", (name,), elapsed)
+        timings = _request_timings.get()
+        if timings is not None:
+            timings.append((name, elapsed))
+
+
+def start_request_timing() -> list[tuple[str, float]]:
+    """Begin collecting stage timings for the current request context."""
+    timings: list[tuple[str, float]] = []
+    _request_timings.set(timings)
+    return timings
+
+
+def server_timing_header(timings: list[tuple[str, float]], total: float) -> str:
+    """Format timings as a Server-Timing value (ms); repeated stages are summed."""
+    merged: dict[str, float] = {}
+    for name, seconds in timings:
+        merged[name] = merged.get(name, 0.0) + seconds
+    parts = [f"{name};dur={seconds * 1000:.2f}" for name, seconds in merged.items()]
+    parts.append(f"total;dur={total * 1000:.2f}")
+    return ", ".join(parts)
+
+
+def record_request(endpoint: str, status: int, seconds: float) -> None:
+    METRICS.observe("backend_request_duration_seconds", (endpoint,), seconds)
+    METRICS.inc("backend_requests_total", (endpoint, str(status)))
+
+
+@contextmanager
+def timed_model_load(model: str) -> Iterator[None]:
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        METRICS.set("backend_model_load_seconds", (model,), time.perf_counter() - start)
+
+
+class LRUCache:
+    """Small thread-safe LRU with TTL whose hits/misses are exported as metrics."""
+
+    def __init__(self, name: str, maxsize: int = 256, ttl: float | None = None) -> None:
+        self.name = name
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._data: OrderedDict[Hashable, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Hashable) -> Any | None:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is not None and (self.ttl is None or time.monotonic() - entry[0] < self.ttl):
+                self._data.move_to_end(key)
+                METRICS.inc("backend_cache_requests_total", (self.name, "hit"))
+                return entry[1]
+            if entry is not None:
+                del self._data[key]
+        METRICS.inc("backend_cache_requests_total", (self.name, "miss"))
+        return None
+
+    def put(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any]) -> Any:
+        """Cached value, or compute() stored only when it is not None (misses are retried)."""
+        value = self.get(key)
+        if value is None:
+            value = compute()
+            if value is not None:
+                self.put(key, value)
+        return value
@@ -1 +1,32 @@
 # Re-export model helpers from this module when they are added.
+# (app.models.roberta is imported on demand so torch stays optional.)
+from app.models.align import FeatureAligner, pair_aligner
+from app.models.linear import (
+    HashingFeaturizer,
+    LinearModel,
+    LinearScorer,
+    SparseRow,
+    TfidfFeaturizer,
+    load_linear_model,
+    save_linear_model,
+    transform_shared,
+)
+from app.models.w2v import Word2VecEraScorer, save_w2v_scorer
+from app.models.year import YearRegressor, residual_table
+
+__all__ = [
+    "FeatureAligner",
+    "pair_aligner",
+    "HashingFeaturizer",
+    "LinearModel",
+    "LinearScorer",
+    "SparseRow",
+    "TfidfFeaturizer",
+    "load_linear_model",
+    "save_linear_model",
+    "transform_shared",
+    "Word2VecEraScorer",
+    "save_w2v_scorer",
+    "YearRegressor",
+    "residual_table",
+]
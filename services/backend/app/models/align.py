@@ -0,0 +1,98 @@
+"""
+Sparse column remapping between a vectorizer's feature space and the one a
+model was trained on, for pairs whose vocabularies drifted apart (the
+dev/classification_report.ipynb case, which zero-padded a dense copy).
+
+The map is an int32 array `col_map[source_column] -> target_column` (-1 when
+the model has no such feature), built once per (vectorizer, model) pair.
+Remapping touches only the stored non-zeros: a SparseRow or CSR matrix keeps
+its sparsity, and `align_coef` folds the map into exported weights instead.
+"""
+
+import logging
+from typing import Sequence
+
+import numpy as np
+
+from app.models.linear import SparseRow
+
+
+class FeatureAligner:
+    def __init__(self, col_map: np.ndarray, n_target: int) -> None:
+        self.col_map = np.asarray(col_map, dtype=np.int32)
+        self.n_target = n_target
+
+    @classmethod
+    def by_terms(cls, source_terms: Sequence[str], target_terms: Sequence[str]) -> "FeatureAligner":
+        target_index = {term: i for i, term in enumerate(target_terms)}
+        col_map = np.fromiter((target_index.get(t, -1) for t in source_terms), dtype=np.int32, count=len(source_terms))
+        return cls(col_map, len(target_terms))
+
+    @classmethod
+    def by_position(cls, n_source: int, n_target: int) -> "FeatureAligner":
+        """Column i -> column i; columns past the model's width are dropped, missing ones stay zero."""
+        col_map = np.arange(n_source, dtype=np.int32)
+        col_map[n_target:] = -1
+        return cls(col_map, n_target)
+
+    @property
+    def is_identity(self) -> bool:
+        return len(self.col_map) == self.n_target and bool(np.all(self.col_map == np.arange(self.n_target)))
+
+    @property
+    def n_mapped(self) -> int:
+        return int(np.count_nonzero(self.col_map >= 0))
+
+    def transform_row(self, row: SparseRow) -> SparseRow:
+        mapped = self.col_map[row.indices]
+        keep = mapped >= 0
+        indices, values = mapped[keep], row.values[keep]
+        order = np.argsort(indices, kind="stable")
+        return SparseRow(indices[order], values[order])
+
+    def transform_csr(self, X):
+        """CSR matrix in the model's column space (same sparse class, no dense copy)."""
+        X = X.tocsr()
+        mapped = self.col_map[X.indices]
+        keep = mapped >= 0
+        rows = np.repeat(np.arange(X.shape[0]), np.diff(X.indptr))[keep]
+        indptr = np.zeros(X.shape[0] + 1, dtype=X.indptr.dtype)
+        np.cumsum(np.bincount(rows, minlength=X.shape[0]), out=indptr[1:])
+        out = X.__class__((X.data[keep], mapped[keep], indptr), shape=(X.shape[0], self.n_target))
+        out.sort_indices()
+        return out
+
+    def align_coef(self, coef: np.ndarray) -> np.ndarray:
+        """Model weights re-indexed to the source space (zero for unknown columns), for exporting."""
+        coef = np.atleast_2d(coef)
+        out = np.zeros((coef.shape[0], len(self.col_map)), dtype=coef.dtype)
+        known = self.col_map >= 0
+        out[:, known] = coef[:, self.col_map[known]]
+        return out
+
+
+def pair_aligner(vectorizer, clf) -> FeatureAligner | None:
+    """
+    Aligner from a fitted vectorizer to `clf`'s input space, or None when they
+    already agree. Maps by feature name when the model recorded names,
+    otherwise by position (the notebook's zero-padding semantics). Hashing
+    pipelines have no vocabulary and are matched by width.
+    """
+    vocabulary = getattr(vectorizer, "vocabulary_", None)
+    n_source = len(vocabulary) if vocabulary is not None else vectorizer.transform([""]).shape[1]
+    names = getattr(clf, "feature_names_in_", None)
+    if names is not None and vocabulary is not None:
+        terms = np.empty(n_source, dtype=object)
+        for term, index in vocabulary.items():
+            terms[index] = term
+        aligner = FeatureAligner.by_terms(terms.tolist(), [str(n) for n in names])
+    else:
+        n_target = int(clf.n_features_in_)
+        if n_source == n_target:
+            return None
+        aligner = FeatureAligner.by_position(n_source, n_target)
+    if aligner.is_identity:
+        return None
+    logging.warning("Vectorizer has %s features, model expects %s; %s columns aligned",
+                    n_source, aligner.n_target, aligner.n_mapped)
+    return aligner
@@ -0,0 +1,402 @@
+"""
+sklearn-free scoring for exported TfidfVectorizer + LogisticRegression (or
+Ridge, `multi_class="regression"`) pairs.
+
+`tools/export_linear.py` writes one `.npz` per model with the vocabulary,
+idf, analyzer config, coefficients and intercept. Loading one needs only
+NumPy, so the backend can serve without importing scikit-learn/scipy and is
+not tied to the sklearn version that trained the model.
+
+Coefficients and idf can be stored as float32/float16, or as 8-bit integers
+with one float32 scale per block of QUANT_BLOCK consecutive columns (int8 for
+coefficients, uint8 for the non-negative idf); per-block scales keep a few
+large weights from coarsening a whole row. Scoring gathers the stored values
+and scales of a document's non-zeros only, so quantized models are never
+expanded in memory.
+
+Models trained on HashingVectorizer + TfidfTransformer pipelines store no
+vocabulary: HashingFeaturizer maps tokens to murmurhash3 buckets and keeps
+only the idf array indexed by bucket, so loading is an array read and memory
+is set by `n_features`, not by the number of n-grams seen in training.
+"""
+
+import hashlib
+import json
+import math
+import re
+import unicodedata
+from collections import Counter
+from dataclasses import dataclass
+from functools import cached_property, lru_cache
+from pathlib import Path
+from typing import Iterable, Sequence
+
+import numpy as np
+
+from app.hashing import hashed_index
+
+FORMAT_VERSION = 1
+STORAGE_DTYPES = ("float64", "float32", "float16", "int8")
+QUANT_BLOCK = 64
+_BLOCK_SHIFT = QUANT_BLOCK.bit_length() - 1
+
+# Analyzer settings that must match between featurizers for tokens to be shared.
+ANALYZER_KEYS = ("lowercase", "strip_accents", "token_pattern", "stop_words", "ngram_range")
+HASH_CACHE_SIZE = 2 ** 16  # (token, n_features) -> bucket, shared by all hashing featurizers
+
+_bucket = lru_cache(maxsize=HASH_CACHE_SIZE)(hashed_index)
+
+
+def _strip_accents_unicode(s: str) -> str:
+    try:
+        s.encode("ASCII", errors="strict")
+        return s
+    except UnicodeEncodeError:
+        return "".join(c for c in unicodedata.normalize("NFKD", s) if not unicodedata.combining(c))
+
+
+def _strip_accents_ascii(s: str) -> str:
+    return unicodedata.normalize("NFKD", s).encode("ASCII", "ignore").decode("ASCII")
+
+
+_ACCENT_FUNCTIONS = {None: None, "unicode": _strip_accents_unicode, "ascii": _strip_accents_ascii}
+
+
+@dataclass(slots=True)
+class SparseRow:
+    """One document as sorted feature indices and their weights."""
+
+    indices: np.ndarray
+    values: np.ndarray
+
+
+class TfidfFeaturizer:
+    """Re-implementation of TfidfVectorizer.transform for the `analyzer="word"` case."""
+
+    def __init__(self, config: dict, terms: Sequence[str], idf: np.ndarray | None,
+                 idf_scale: np.ndarray | None = None) -> None:
+        self.config = config
+        self.lowercase: bool = config["lowercase"]
+        self.ngram_range: tuple[int, int] = tuple(config["ngram_range"])
+        self.norm: str | None = config["norm"]
+        self.binary: bool = config["binary"]
+        self.sublinear_tf: bool = config["sublinear_tf"]
+        self.stop_words: frozenset[str] = frozenset(config["stop_words"] or ())
+        self._accents = _ACCENT_FUNCTIONS[config["strip_accents"]]
+        self._token_re = re.compile(config["token_pattern"])
+        self.terms: list[str] = list(terms)
+        self.vocabulary: dict[str, int] = {term: i for i, term in enumerate(self.terms)}
+        self.idf = idf
+        self.idf_scale = idf_scale  # per-block scales when idf is stored as integers
+        self.analyzer_key = json.dumps({k: config[k] for k in ANALYZER_KEYS}, sort_keys=True)
+
+    @property
+    def n_features(self) -> int:
+        return len(self.vocabulary)
+
+    @cached_property
+    def row_key(self) -> str:
+        """Fingerprint of everything `transform` depends on; equal keys produce identical rows."""
+        digest = hashlib.sha1(json.dumps(self.config, sort_keys=True).encode("utf-8"))
+        digest.update("\n".join(self.terms).encode("utf-8"))
+        if self.idf is not None:
+            digest.update(np.ascontiguousarray(self.idf_weights).tobytes())
+        return digest.hexdigest()
+
+    @property
+    def idf_weights(self) -> np.ndarray | None:
+        """idf as float64, dequantized."""
+        if self.idf is None:
+            return None
+        return dequantize(self.idf, self.idf_scale)
+
+    # ---- analyzer (same steps as sklearn's build_analyzer) ----
+    def analyze(self, doc: str) -> list[str]:
+        if self.lowercase:
+            doc = doc.lower()
+        if self._accents is not None:
+            doc = self._accents(doc)
+        tokens = self._token_re.findall(doc)
+        if self.stop_words:
+            tokens = [w for w in tokens if w not in self.stop_words]
+
+        min_n, max_n = self.ngram_range
+        if max_n == 1:
+            return tokens
+        original = tokens
+        n_original = len(original)
+        tokens = list(original) if min_n == 1 else []
+        for n in range(max(min_n, 2), min(max_n, n_original) + 1):
+            tokens.extend(" ".join(original[i:i + n]) for i in range(n_original - n + 1))
+        return tokens
+
+    def _counts(self, tokens: Iterable[str]) -> dict[int, int]:
+        vocab = self.vocabulary
+        return {vocab[t]: c for t, c in Counter(tokens).items() if t in vocab}
+
+    def transform_tokens(self, tokens: Iterable[str]) -> SparseRow:
+        counts = self._counts(tokens)
+        if not counts:
+            return SparseRow(np.empty(0, dtype=np.int32), np.empty(0, dtype=np.float64))
+
+        indices = np.fromiter(counts.keys(), dtype=np.int32, count=len(counts))
+        values = np.fromiter(counts.values(), dtype=np.float64, count=len(counts))
+        order = np.argsort(indices)
+        indices, values = indices[order], values[order]
+
+        if self.binary:
+            values[:] = 1.0
+        elif self.sublinear_tf:
+            values = np.log(values) + 1.0
+        if self.idf is not None:
+            values = values * self.idf[indices]
+            if self.idf_scale is not None:
+                values = values * self.idf_scale[indices >> _BLOCK_SHIFT]
+            kept = values != 0  # zero idf (pruned hash buckets) removes the feature
+            indices, values = indices[kept], values[kept]
+        if self.norm == "l2":
+            norm = math.sqrt(float(values @ values))
+        elif self.norm == "l1":
+            norm = float(np.abs(values).sum())
+        else:
+            norm = 0.0
+        if norm > 0:
+            values = values / norm
+        return SparseRow(indices, values)
+
+    def transform(self, doc: str) -> SparseRow:
+        return self.transform_tokens(self.analyze(doc))
+
+    def feature_names(self, indices: Sequence[int], doc: str) -> list[str]:
+        """Names of feature columns (`doc` is only needed by HashingFeaturizer)."""
+        return [self.terms[i] for i in indices]
+
+
+class HashingFeaturizer(TfidfFeaturizer):
+    """
+    HashingVectorizer(alternate_sign=False, norm=None) + TfidfTransformer: the
+    same analyzer and weighting, with murmurhash3 buckets instead of a
+    vocabulary (counts of colliding tokens add up, as in sklearn).
+    """
+
+    def __init__(self, config: dict, idf: np.ndarray | None, idf_scale: np.ndarray | None = None) -> None:
+        super().__init__(config, (), idf, idf_scale)
+        self._n_features = int(config["n_features"])
+
+    @property
+    def n_features(self) -> int:
+        return self._n_features
+
+    def _counts(self, tokens: Iterable[str]) -> dict[int, int]:
+        n_features = self._n_features
+        counts: dict[int, int] = {}
+        for token, c in Counter(tokens).items():
+            index = _bucket(token, n_features)
+            counts[index] = counts.get(index, 0) + c
+        return counts
+
+    def feature_names(self, indices: Sequence[int], doc: str) -> list[str]:
+        """The tokens of `doc` in each bucket, " | "-joined when several collide."""
+        tokens_by_bucket: dict[int, list[str]] = {}
+        for token in dict.fromkeys(self.analyze(doc)):
+            tokens_by_bucket.setdefault(_bucket(token, self._n_features), []).append(token)
+        return [" | ".join(tokens_by_bucket.get(i, ())) or f"#{i}" for i in indices]
+
+
+class LinearScorer:
+    """LogisticRegression decision function + predict_proba (or Ridge predict) over SparseRow inputs."""
+
+    def __init__(self, coef: np.ndarray, intercept: np.ndarray, classes: np.ndarray, multi_class: str,
+                 coef_scale: np.ndarray | None = None) -> None:
+        self.coef = np.atleast_2d(coef)
+        self.coef_scale = coef_scale  # (n_rows, n_blocks) scales when coef is stored as int8
+        self.intercept = np.atleast_1d(intercept)
+        self.classes = classes
+        self.multi_class = multi_class  # "binary" | "ovr" | "multinomial" | "regression"
+
+    @property
+    def storage_dtype(self) -> str:
+        return "int8" if self.coef_scale is not None else str(self.coef.dtype)
+
+    @property
+    def weights(self) -> np.ndarray:
+        """coef as float64, dequantized."""
+        return dequantize(self.coef, self.coef_scale)
+
+    def _gather(self, rows: slice | int, indices: np.ndarray) -> np.ndarray:
+        """Dequantized coefficients of `indices` only."""
+        coef = self.coef[rows, indices]
+        if self.coef_scale is not None:
+            coef = coef * self.coef_scale[rows, indices >> _BLOCK_SHIFT]
+        return coef
+
+    def decision_function(self, row: SparseRow) -> np.ndarray:
+        return self._gather(slice(None), row.indices) @ row.values + self.intercept
+
+    def decision_function_batch(self, rows: Sequence[SparseRow]) -> np.ndarray:
+        """(n_rows, n_outputs) decision values: one gather over all non-zeros, summed per row."""
+        out = np.tile(self.intercept, (len(rows), 1))
+        lengths = np.fromiter((len(r.indices) for r in rows), dtype=np.int64, count=len(rows))
+        if not lengths.sum():
+            return out
+        indices = np.concatenate([r.indices for r in rows])
+        values = np.concatenate([r.values for r in rows])
+        owner = np.repeat(np.arange(len(rows)), lengths)
+        for k in range(self.coef.shape[0]):
+            out[:, k] += np.bincount(owner, weights=self._gather(k, indices) * values, minlength=len(rows))
+        return out
+
+    def predict(self, row: SparseRow) -> float:
+        """Regression output of a single-target model (Ridge.predict)."""
+        return float(self.decision_function(row)[0])
+
+    def predict_proba(self, row: SparseRow) -> np.ndarray:
+        scores = self.decision_function(row)
+        if self.multi_class == "binary":
+            p = _sigmoid(scores[0])
+            return np.array([1.0 - p, p])
+        if self.multi_class == "ovr":
+            p = np.array([_sigmoid(s) for s in scores])
+            return p / p.sum()
+        exp = np.exp(scores - scores.max())
+        return exp / exp.sum()
+
+    def positive_proba(self, row: SparseRow) -> float:
+        """Probability of classes[1] for a binary model (the era/genre one-vs-rest case)."""
+        return float(self.predict_proba(row)[1])
+
+    def top_contributions(self, row: SparseRow, k: int, class_index: int = 0) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Feature indices and coef * weight of the k largest positive contributions
+        to one decision-function row, from the document's non-zeros only.
+        """
+        contrib = self._gather(class_index, row.indices) * row.values
+        if k < len(contrib):
+            top = np.argpartition(-contrib, k)[:k]
+        else:
+            top = np.arange(len(contrib))
+        top = top[np.argsort(-contrib[top], kind="stable")]
+        top = top[contrib[top] > 0]
+        return row.indices[top], contrib[top]
+
+
+def _sigmoid(x: float) -> float:
+    # Split by sign so neither branch overflows.
+    if x >= 0:
+        return 1.0 / (1.0 + math.exp(-x))
+    z = math.exp(x)
+    return z / (1.0 + z)
+
+
+@dataclass(slots=True)
+class LinearModel:
+    """An exported vectorizer/classifier pair."""
+
+    name: str
+    featurizer: TfidfFeaturizer
+    scorer: LinearScorer
+
+    def predict_proba(self, doc: str) -> np.ndarray:
+        return self.scorer.predict_proba(self.featurizer.transform(doc))
+
+    def explain(self, row: SparseRow, k: int, doc: str = "") -> list[tuple[str, float]]:
+        """Top-k terms pushing a binary model towards its positive class (`doc` names hashed features)."""
+        indices, contrib = self.scorer.top_contributions(row, k)
+        return list(zip(self.featurizer.feature_names(indices.tolist(), doc), contrib.tolist()))
+
+
+def quantize(values: np.ndarray, dtype: str) -> tuple[np.ndarray, np.ndarray | None]:
+    """
+    Storage array for `dtype` and, for int8, the float32 scale of every block
+    of QUANT_BLOCK columns (last axis). Non-negative arrays use uint8 for
+    twice the resolution.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    if dtype not in STORAGE_DTYPES:
+        raise ValueError(f"Unsupported storage dtype {dtype!r}; expected one of {STORAGE_DTYPES}")
+    if dtype != "int8":
+        return values.astype(dtype), None
+    unsigned = values.size > 0 and values.min() >= 0
+    n = values.shape[-1]
+    n_blocks = -(-n // QUANT_BLOCK)
+    padded = np.zeros(values.shape[:-1] + (n_blocks * QUANT_BLOCK,))
+    padded[..., :n] = values
+    peak = np.abs(padded.reshape(values.shape[:-1] + (n_blocks, QUANT_BLOCK))).max(axis=-1)
+    scale = (np.where(peak > 0, peak, 1.0) / (255 if unsigned else 127)).astype(np.float32)
+    quantized = np.rint(values / np.repeat(scale, QUANT_BLOCK, axis=-1)[..., :n])
+    return quantized.astype(np.uint8 if unsigned else np.int8), scale
+
+
+def dequantize(stored: np.ndarray, scale: np.ndarray | None) -> np.ndarray:
+    values = stored.astype(np.float64)
+    if scale is None:
+        return values
+    return values * np.repeat(scale.astype(np.float64), QUANT_BLOCK, axis=-1)[..., :stored.shape[-1]]
+
+
+def save_linear_model(path: str | Path, *, name: str, config: dict, terms: Sequence[str], idf, coef, intercept,
+                      classes, multi_class: str, dtype: str = "float64", idf_scale=None, coef_scale=None) -> None:
+    """
+    `dtype` sets how coef and idf are stored. Arrays that are already quantized
+    (as loaded, e.g. when rewriting a model) are passed with their scales and
+    stored unchanged. A config with `n_features` is a hashing model (`terms` empty).
+    """
+    meta = {"format_version": FORMAT_VERSION, "name": name, "multi_class": multi_class, "config": config}
+    if idf is None:
+        idf, idf_scale = np.empty(0), None
+    elif idf_scale is None:
+        idf, idf_scale = quantize(idf, dtype)
+    if coef_scale is None:
+        coef, coef_scale = quantize(coef, dtype)
+    scales = {}
+    if idf_scale is not None:
+        scales["idf_scale"] = np.asarray(idf_scale, dtype=np.float32)
+    if coef_scale is not None:
+        scales["coef_scale"] = np.asarray(np.atleast_2d(coef_scale), dtype=np.float32)
+    np.savez(
+        path,
+        meta=np.array(json.dumps(meta, ensure_ascii=False)),
+        # newline-joined UTF-8 (tokens never contain "\n"); far smaller than a fixed-width str array
+        terms=np.frombuffer("\n".join(terms).encode("utf-8"), dtype=np.uint8),
+        idf=np.asarray(idf),
+        coef=np.asarray(coef),
+        intercept=np.asarray(intercept, dtype=np.float64),
+        classes=np.asarray(classes, dtype=str if np.asarray(classes).dtype == object else None),
+        **scales,
+    )
+
+
+def load_linear_model(path: str | Path) -> LinearModel:
+    with np.load(path, allow_pickle=False) as data:
+        meta = json.loads(str(data["meta"]))
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"{path}: unsupported format version {meta['format_version']}")
+        idf = data["idf"]
+        idf_scale = data["idf_scale"] if "idf_scale" in data.files else None
+        coef_scale = data["coef_scale"] if "coef_scale" in data.files else None
+        terms = data["terms"].tobytes().decode("utf-8").split("\n") if data["terms"].size else []
+        if "n_features" in meta["config"]:
+            featurizer = HashingFeaturizer(meta["config"], idf if idf.size else None, idf_scale)
+        else:
+            featurizer = TfidfFeaturizer(meta["config"], terms, idf if idf.size else None, idf_scale)
+        scorer = LinearScorer(data["coef"], data["intercept"], data["classes"], meta["multi_class"], coef_scale)
+    return LinearModel(name=meta["name"], featurizer=featurizer, scorer=scorer)
+
+
+def transform_shared(featurizers: Iterable[TfidfFeaturizer], doc: str) -> list[SparseRow]:
+    """
+    Transform `doc` with several featurizers, analyzing it once per distinct
+    analyzer config and vectorizing it once per distinct vocabulary/idf.
+    """
+    tokens_by_key: dict[str, list[str]] = {}
+    row_by_key: dict[str, SparseRow] = {}
+    rows = []
+    for featurizer in featurizers:
+        row = row_by_key.get(featurizer.row_key)
+        if row is None:
+            tokens = tokens_by_key.get(featurizer.analyzer_key)
+            if tokens is None:
+                tokens = tokens_by_key[featurizer.analyzer_key] = featurizer.analyze(doc)
+            row = row_by_key[featurizer.row_key] = featurizer.transform_tokens(tokens)
+        rows.append(row)
+    return rows
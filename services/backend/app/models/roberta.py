@@ -0,0 +1,224 @@
+"""
+CPU serving path for the RoBERTa era checkpoints.
+
+Supports the multi-class checkpoint from script_era/era_train.py (one head
+over the sorted eras) and the per-era binary checkpoints from
+script_era/bert_bin_training.py (one model per era directory). Linear layers
+are dynamically quantized to int8, requests are micro-batched by a single
+worker thread with padding to the longest sequence in the batch, and the
+request queue is bounded so overload turns into fast 503s instead of
+unbounded latency.
+
+torch/transformers are imported here only, so the rest of the backend does
+not pay for them unless a checkpoint is configured.
+"""
+
+import asyncio
+import logging
+import queue
+import re
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+import torch
+from transformers import AutoModelForSequenceClassification, AutoTokenizer
+
+from app.metrics import METRICS
+
+# Label order used by era_tokenizer.py (sorted era names).
+ERA_LABELS = ["1970s", "1980s", "1990s", "2000s", "2010s", "2020s"]
+BASE_TOKENIZER = "roberta-base"  # only for checkpoints saved without their tokenizer files
+
+
+@dataclass(slots=True, kw_only=True)
+class RobertaConfig:
+    max_length: int = 512
+    max_batch_size: int = 16
+    max_wait_ms: float = 5.0  # how long the worker waits to fill a batch
+    queue_size: int = 64
+    num_threads: int | None = None  # torch intra-op threads; None keeps torch's default
+    quantize: bool = True
+
+
+class QueueFullError(RuntimeError):
+    """Raised when the bounded inference queue cannot take another request."""
+
+
+@dataclass(slots=True)
+class _Job:
+    text: str
+    future: asyncio.Future
+    loop: asyncio.AbstractEventLoop
+    enqueued: float
+
+
+def _prepare(model: torch.nn.Module, quantize: bool) -> torch.nn.Module:
+    model.eval()
+    if quantize:
+        model = torch.ao.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8)
+    return model
+
+
+def _labels_for(model) -> list[str]:
+    id2label = model.config.id2label
+    labels = [id2label[i] for i in range(model.config.num_labels)]
+    # Trainer checkpoints keep the generic LABEL_i names; ids follow the sorted eras.
+    if all(re.fullmatch(r"LABEL_\d+", label) for label in labels) and len(labels) == len(ERA_LABELS):
+        return list(ERA_LABELS)
+    return labels
+
+
+def _load_tokenizer(model_dir: Path, fallback: str):
+    if (model_dir / "tokenizer_config.json").exists():
+        return AutoTokenizer.from_pretrained(model_dir)
+    return AutoTokenizer.from_pretrained(fallback)
+
+
+class RobertaEraEngine:
+    """
+    Either one multi-class model (`heads={"*": model}`) or one binary model per
+    era (`heads={era: model}`); both return a score per era.
+    """
+
+    def __init__(self, heads: dict[str, torch.nn.Module], labels: list[str], tokenizer, config: RobertaConfig) -> None:
+        self.heads = heads
+        self.labels = labels
+        self.tokenizer = tokenizer
+        self.config = config
+        self.multiclass = list(heads) == ["*"]
+        self._queue: queue.Queue[_Job | None] = queue.Queue(maxsize=config.queue_size)
+        self._stopping = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    # ---- loading ----
+    @classmethod
+    def load(cls, model_dir: str | Path, config: RobertaConfig | None = None,
+             tokenizer_name: str = BASE_TOKENIZER) -> "RobertaEraEngine":
+        """
+        `model_dir` is either a checkpoint (has config.json) or a directory of
+        per-era binary checkpoints (<era>/config.json).
+        """
+        config = config or RobertaConfig()
+        model_dir = Path(model_dir)
+        if config.num_threads:
+            torch.set_num_threads(config.num_threads)
+
+        if (model_dir / "config.json").exists():
+            model = AutoModelForSequenceClassification.from_pretrained(model_dir)
+            labels = _labels_for(model)
+            heads = {"*": _prepare(model, config.quantize)}
+            tokenizer = _load_tokenizer(model_dir, tokenizer_name)
+        else:
+            era_dirs = sorted(p for p in model_dir.iterdir() if (p / "config.json").exists())
+            if not era_dirs:
+                raise FileNotFoundError(f"No RoBERTa checkpoints under {model_dir}")
+            heads = {
+                p.name: _prepare(AutoModelForSequenceClassification.from_pretrained(p), config.quantize)
+                for p in era_dirs
+            }
+            labels = list(heads)
+            tokenizer = _load_tokenizer(era_dirs[0], tokenizer_name)
+
+        logging.info("Loaded RoBERTa era engine (%s, quantized=%s): %s",
+                     "multi-class" if "*" in heads else "binary", config.quantize, labels)
+        return cls(heads, labels, tokenizer, config)
+
+    # ---- inference ----
+    @torch.inference_mode()
+    def predict_batch(self, texts: list[str]) -> list[dict[str, float]]:
+        """Score a batch synchronously; pads only to the longest text in the batch."""
+        encoded = self.tokenizer(
+            texts, padding="longest", truncation=True, max_length=self.config.max_length, return_tensors="pt"
+        )
+        if self.multiclass:
+            probs = torch.softmax(self.heads["*"](**encoded).logits, dim=-1)
+        else:
+            probs = torch.stack(
+                [torch.softmax(self.heads[era](**encoded).logits, dim=-1)[:, 1] for era in self.labels], dim=1
+            )
+        return [dict(zip(self.labels, row)) for row in probs.tolist()]
+
+    # ---- batching worker ----
+    def start(self) -> None:
+        if self._thread is None:
+            self._stopping.clear()
+            self._thread = threading.Thread(target=self._run, name="roberta-batcher", daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        if self._thread is not None:
+            self._stopping.set()
+            try:
+                self._queue.put_nowait(None)  # wakes an idle worker; a busy one sees the event after its batch
+            except queue.Full:
+                pass
+            self._thread.join(timeout=10)
+            self._thread = None
+        self._fail_pending()
+
+    def _fail_pending(self) -> None:
+        """Fail requests still queued after the worker exited instead of leaving them hanging."""
+        while True:
+            try:
+                job = self._queue.get_nowait()
+            except queue.Empty:
+                return
+            if job is not None and not job.loop.is_closed():
+                job.loop.call_soon_threadsafe(_set_exception, job.future, RuntimeError("RoBERTa engine stopped"))
+
+    async def predict(self, text: str) -> dict[str, float]:
+        loop = asyncio.get_running_loop()
+        job = _Job(text, loop.create_future(), loop, time.perf_counter())
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            raise QueueFullError("RoBERTa inference queue is full") from None
+        return await job.future
+
+    def _collect(self, first: _Job) -> list[_Job]:
+        batch = [first]
+        deadline = time.perf_counter() + self.config.max_wait_ms / 1000
+        while len(batch) < self.config.max_batch_size:
+            remaining = deadline - time.perf_counter()
+            try:
+                job = self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is None:  # stop() wake-up; finish this batch, _run then sees the event
+                break
+            batch.append(job)
+        return batch
+
+    def _run(self) -> None:
+        while not self._stopping.is_set():
+            first = self._queue.get()
+            if first is None:
+                continue
+            batch = [job for job in self._collect(first) if not job.future.cancelled()]
+            if not batch:
+                continue
+            start = time.perf_counter()
+            for job in batch:
+                METRICS.observe("backend_stage_duration_seconds", ("roberta_queue",), start - job.enqueued)
+            try:
+                results = self.predict_batch([job.text for job in batch])
+            except Exception as exc:  # fail the whole batch, keep the worker alive
+                logging.exception("RoBERTa batch failed")
+                for job in batch:
+                    job.loop.call_soon_threadsafe(_set_exception, job.future, exc)
+                continue
+            METRICS.observe("backend_stage_duration_seconds", ("roberta_batch",), time.perf_counter() - start)
+            for job, result in zip(batch, results):
+                job.loop.call_soon_threadsafe(_set_result, job.future, result)
+
+
+def _set_result(future: asyncio.Future, result) -> None:
+    if not future.done():
+        future.set_result(result)
+
+
+def _set_exception(future: asyncio.Future, exc: BaseException) -> None:
+    if not future.done():
+        future.set_exception(exc)
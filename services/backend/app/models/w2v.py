@@ -0,0 +1,97 @@
+"""
+Word2Vec + LogisticRegression era scoring over memory-mapped arrays.
+
+The notebook model (log_reg_training.ipynb) is, per era e,
+    logit_e = w_e · mean(v_e(t) for t in tokens if t in V_e) + b_e
+Because the classifier is linear this equals the mean of the per-token
+projections w_e · v_e(t). `tools/export_w2v.py` therefore stores, for the
+union vocabulary of all eras, one projected score per (token, era) plus a
+presence mask, instead of six 768-dim embedding tables. Scoring a document
+is a gather of its token rows and one weighted sum over all eras.
+
+Files (np.load with mmap_mode="r", so pages are shared by every worker):
+    vocab.npy    sorted UTF-8 tokens (fixed-width bytes) for np.searchsorted
+    scores.npy   (n_tokens, n_eras) float32/float16 projected token scores
+    present.npy  (n_tokens, n_eras) bool, token is in that era's Word2Vec vocab
+    meta.json    eras, intercepts, dtype
+"""
+
+import json
+from collections import Counter
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+FORMAT_VERSION = 1
+
+
+def tokenize(text: str) -> list[str]:
+    """Same tokenizer as the training notebook."""
+    return text.lower().split()
+
+
+class Word2VecEraScorer:
+    def __init__(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"{directory}: unsupported format version {meta['format_version']}")
+        self.eras: list[str] = meta["eras"]
+        self.intercept = np.asarray(meta["intercepts"], dtype=np.float64)
+        self.vocab = np.load(directory / "vocab.npy", mmap_mode="r")
+        self.scores = np.load(directory / "scores.npy", mmap_mode="r")
+        self.present = np.load(directory / "present.npy", mmap_mode="r")
+        self._width = self.vocab.dtype.itemsize
+
+    def lookup(self, tokens: Sequence[str]) -> tuple[np.ndarray, np.ndarray]:
+        """Row ids and counts of the in-vocabulary tokens."""
+        counts = Counter(tokens)
+        encoded = [t.encode("utf-8") for t in counts]
+        keep = [i for i, b in enumerate(encoded) if len(b) <= self._width]  # longer ones cannot match
+        if not keep:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float64)
+        keys = np.array([encoded[i] for i in keep], dtype=self.vocab.dtype)
+        pos = np.searchsorted(self.vocab, keys)
+        pos[pos == len(self.vocab)] = 0
+        hit = self.vocab[pos] == keys
+        values = list(counts.values())
+        return pos[hit], np.array([values[i] for i in keep], dtype=np.float64)[hit]
+
+    def logits_batch(self, token_lists: Sequence[Sequence[str]]) -> np.ndarray:
+        n_docs, n_eras = len(token_lists), len(self.eras)
+        lookups = [self.lookup(tokens) for tokens in token_lists]
+        ids = np.concatenate([ids for ids, _ in lookups]) if lookups else np.empty(0, dtype=np.int64)
+        counts = np.concatenate([c for _, c in lookups]) if lookups else np.empty(0)
+        doc = np.repeat(np.arange(n_docs), [len(i) for i, _ in lookups])
+
+        numer = np.zeros((n_docs, n_eras))
+        denom = np.zeros((n_docs, n_eras))
+        if len(ids):
+            np.add.at(numer, doc, np.asarray(self.scores[ids], dtype=np.float64) * counts[:, None])
+            np.add.at(denom, doc, self.present[ids] * counts[:, None])
+        # no known token -> zero embedding -> logit is the intercept (as in the notebook)
+        mean = np.divide(numer, denom, out=np.zeros_like(numer), where=denom > 0)
+        return mean + self.intercept
+
+    def predict_proba_batch(self, texts: Sequence[str]) -> list[dict[str, float]]:
+        """P(era) from each era's binary model, for already cleaned texts."""
+        probs = 1.0 / (1.0 + np.exp(-self.logits_batch([tokenize(t) for t in texts])))
+        return [dict(zip(self.eras, row)) for row in probs.tolist()]
+
+    def predict_proba(self, text: str) -> dict[str, float]:
+        return self.predict_proba_batch([text])[0]
+
+
+def save_w2v_scorer(directory: str | Path, *, eras: list[str], vocab: list[str], scores: np.ndarray,
+                    present: np.ndarray, intercepts: Sequence[float], dtype: str = "float32") -> None:
+    """`vocab` must be sorted by UTF-8 bytes, with rows of `scores`/`present` in the same order."""
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    encoded = [t.encode("utf-8") for t in vocab]
+    np.save(directory / "vocab.npy", np.array(encoded, dtype=f"S{max(map(len, encoded), default=1)}"))
+    np.save(directory / "scores.npy", np.ascontiguousarray(scores, dtype=dtype))
+    np.save(directory / "present.npy", np.ascontiguousarray(present, dtype=bool))
+    meta = {"format_version": FORMAT_VERSION, "eras": eras, "intercepts": [float(b) for b in intercepts],
+            "dtype": dtype}
+    (directory / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
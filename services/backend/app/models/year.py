@@ -0,0 +1,78 @@
+"""
+Release-year regression: the TF-IDF + Ridge pair from log_reg_training.ipynb,
+exported by tools/export_year.py in the app.models.linear format
+(`multi_class="regression"`), plus a residual-quantile table for intervals.
+
+Files:
+    linear.npz       TfidfFeaturizer + Ridge coef/intercept
+    residuals.json   held-out residual (year - prediction) quantiles per
+                     prediction bin: {"edges", "levels", "quantiles", "counts"}
+
+The interval for coverage c is prediction + [q((1 - c) / 2), q((1 + c) / 2)]
+of the residuals in the bin of the prediction (split-conformal, conditioned on
+the predicted year because errors are much wider for early decades).
+"""
+
+import json
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from app.models.linear import LinearModel, SparseRow, load_linear_model
+
+RESIDUAL_LEVELS = np.round(np.linspace(0.01, 0.99, 99), 2)
+
+
+class YearRegressor:
+    def __init__(self, model: LinearModel, residuals: dict) -> None:
+        if model.scorer.multi_class != "regression":
+            raise ValueError(f"{model.name}: expected a regression export, got {model.scorer.multi_class!r}")
+        self.model = model
+        self.edges = np.asarray(residuals["edges"], dtype=np.float64)  # inner bin edges on the prediction
+        self.levels = np.asarray(residuals["levels"], dtype=np.float64)
+        self.quantiles = np.asarray(residuals["quantiles"], dtype=np.float64)  # (n_bins, n_levels)
+
+    @classmethod
+    def load(cls, directory: str | Path) -> "YearRegressor":
+        directory = Path(directory)
+        residuals = json.loads((directory / "residuals.json").read_text(encoding="utf-8"))
+        return cls(load_linear_model(directory / "linear.npz"), residuals)
+
+    @property
+    def featurizer(self):
+        return self.model.featurizer
+
+    def interval(self, predictions: np.ndarray, coverage: float) -> tuple[np.ndarray, np.ndarray]:
+        bins = np.searchsorted(self.edges, predictions, side="right")
+        lo_level, hi_level = (1 - coverage) / 2, (1 + coverage) / 2
+        lo = np.array([np.interp(lo_level, self.levels, self.quantiles[b]) for b in bins])
+        hi = np.array([np.interp(hi_level, self.levels, self.quantiles[b]) for b in bins])
+        return predictions + lo, predictions + hi
+
+    def predict_rows(self, rows: Sequence[SparseRow], coverage: float) -> list[dict]:
+        predictions = self.model.scorer.decision_function_batch(rows)[:, 0]
+        lo, hi = self.interval(predictions, coverage)
+        return [
+            {"year": round(float(p), 1), "interval": [round(float(a), 1), round(float(b), 1)], "coverage": coverage}
+            for p, a, b in zip(predictions, lo, hi)
+        ]
+
+
+def residual_table(predictions: np.ndarray, targets: np.ndarray, n_bins: int = 5, min_count: int = 200) -> dict:
+    """Residual quantiles per prediction-quantile bin (fewer bins when data is scarce)."""
+    predictions = np.asarray(predictions, dtype=np.float64)
+    residuals = np.asarray(targets, dtype=np.float64) - predictions
+    n_bins = max(1, min(n_bins, len(predictions) // min_count))
+    edges = np.unique(np.quantile(predictions, np.linspace(0, 1, n_bins + 1)[1:-1]))
+    bins = np.searchsorted(edges, predictions, side="right")
+    quantiles = [
+        np.quantile(residuals[bins == b] if np.any(bins == b) else residuals, RESIDUAL_LEVELS)
+        for b in range(len(edges) + 1)
+    ]
+    return {
+        "edges": edges.tolist(),
+        "levels": RESIDUAL_LEVELS.tolist(),
+        "quantiles": np.round(quantiles, 4).tolist(),
+        "counts": np.bincount(bins, minlength=len(edges) + 1).tolist(),
+    }
@@ -0,0 +1,117 @@
+"""
+Similar-song search over TF-IDF → truncated SVD song vectors with an IVF
+(inverted file) index, built by tools/build_similarity_index.py.
+
+Vectors are L2-normalized, so the score is cosine similarity. Songs are stored
+grouped by their nearest k-means centroid; a query scores the centroids, then
+only the songs of the `nprobe` closest lists, each a contiguous slice of the
+memory-mapped vector matrix. The TF-IDF + SVD projection is stored in the
+exported linear format (coef = SVD components), so querying needs only NumPy.
+
+Files:
+    meta.json            dim, eras, n_songs, default nprobe
+    projection.npz       TfidfFeaturizer + components (app.models.linear format)
+    centroids.npy        (n_lists, dim) float32
+    list_offsets.npy     (n_lists + 1) int64, list i is rows offsets[i]:offsets[i+1]
+    vectors.npy          (n_songs, dim) float16/float32, list order
+    song_ids.npy         (n_songs) int64, row -> song id (record index)
+    eras.npy             (n_songs) uint8, row -> index into meta["eras"], len(eras) when unknown
+    records.bin          UTF-8 JSON per song (title, artist, year, era, ...)
+    record_offsets.npy   (n_songs + 1) int64 into records.bin, by song id
+"""
+
+import json
+from pathlib import Path
+from typing import Iterable
+
+import numpy as np
+
+from app.models.linear import load_linear_model
+
+FORMAT_VERSION = 1
+
+
+class SimilarityIndex:
+    def __init__(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"{directory}: unsupported format version {meta['format_version']}")
+        self.eras: list[str] = meta["eras"]
+        self.default_nprobe: int = meta["nprobe"]
+        self.projection = load_linear_model(directory / "projection.npz")
+        self.centroids = np.load(directory / "centroids.npy")
+        self.offsets = np.load(directory / "list_offsets.npy")
+        self.vectors = np.load(directory / "vectors.npy", mmap_mode="r")
+        self.song_ids = np.load(directory / "song_ids.npy", mmap_mode="r")
+        self.song_eras = np.load(directory / "eras.npy", mmap_mode="r")
+        self.record_offsets = np.load(directory / "record_offsets.npy", mmap_mode="r")
+        self.records = np.memmap(directory / "records.bin", dtype=np.uint8, mode="r")
+
+    @property
+    def n_lists(self) -> int:
+        return len(self.centroids)
+
+    def embed(self, clean_text: str) -> np.ndarray | None:
+        """Unit-length query vector, or None when no term of the text is in the vocabulary."""
+        vec = self.projection.scorer.decision_function(self.projection.featurizer.transform(clean_text))
+        norm = float(np.linalg.norm(vec))
+        return (vec / norm).astype(np.float32) if norm > 0 else None
+
+    def era_mask(self, eras: Iterable[str] | None, exclude_eras: Iterable[str] | None) -> np.ndarray:
+        """
+        Allowed era codes; the extra last slot is songs without a known era,
+        kept only when `eras` is not given. Raises ValueError on unknown names.
+        """
+        eras, exclude_eras = list(eras or []), list(exclude_eras or [])
+        unknown = sorted({e for e in eras + exclude_eras if e not in self.eras})
+        if unknown:
+            raise ValueError(f"Unknown eras {unknown}; expected some of {self.eras}")
+        allowed = np.ones(len(self.eras) + 1, dtype=bool)
+        if eras:
+            allowed[:] = False
+            allowed[[self.eras.index(e) for e in eras]] = True
+        allowed[[self.eras.index(e) for e in exclude_eras]] = False
+        return allowed
+
+    def search(self, query: np.ndarray, k: int = 10, nprobe: int | None = None,
+               allowed_eras: np.ndarray | None = None) -> tuple[list[tuple[int, float]], dict]:
+        """
+        Top-k (song id, cosine) among songs in allowed eras. Probes more lists
+        when a strict era filter leaves fewer than k candidates.
+        """
+        nprobe = min(nprobe or self.default_nprobe, self.n_lists)
+        order = np.argsort(-(self.centroids @ query))
+        ids: list[np.ndarray] = []
+        scores: list[np.ndarray] = []
+        n_candidates = 0
+        probed = 0
+        while probed < self.n_lists and (probed < nprobe or n_candidates < k):
+            start, end = int(self.offsets[order[probed]]), int(self.offsets[order[probed] + 1])
+            probed += 1
+            if start == end:
+                continue
+            rows = np.arange(start, end)
+            if allowed_eras is not None:
+                rows = rows[allowed_eras[self.song_eras[start:end]]]
+                if not len(rows):
+                    continue
+                block = self.vectors[rows]
+            else:
+                block = self.vectors[start:end]
+            ids.append(rows)
+            scores.append(block.astype(np.float32) @ query)
+            n_candidates += len(rows)
+
+        stats = {"probed_lists": probed, "candidates": n_candidates}
+        if not n_candidates:
+            return [], stats
+        rows = np.concatenate(ids)
+        sims = np.concatenate(scores)
+        top = np.argpartition(-sims, k - 1)[:k] if k < len(sims) else np.arange(len(sims))
+        top = top[np.argsort(-sims[top], kind="stable")]
+        return [(int(self.song_ids[rows[i]]), float(sims[i])) for i in top], stats
+
+    def record(self, song_id: int) -> dict:
+        start, end = int(self.record_offsets[song_id]), int(self.record_offsets[song_id + 1])
+        return json.loads(self.records[start:end].tobytes().decode("utf-8"))
@@ -0,0 +1,11 @@
+import re
+
+
+def clean_text(text: str) -> str:
+    """Mirror notebook preprocessing for lyrics text."""
+    text = text.replace("\n", " ")
+    text = re.sub(r"[,\.!?]", "", text)
+    text = re.sub(r"\[.*?\]", " ", text)
+    text = re.sub(r"\w*\d\w*", " ", text)
+    text = re.sub(r"[()]", " ", text)
+    return text.lower().strip()
@@ -0,0 +1,91 @@
+"""
+Read side of the per-year n-gram index built by script_era/build_trend_index.py.
+
+The index is term-major over the hashed n-grams that occur, so one term's
+series is a binary search in `columns` plus one slice of memory-mapped arrays;
+a query touches a few pages regardless of index size. Era series are year
+sums over the same bins as mapping_era.py.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Sequence
+
+import numpy as np
+
+from app.hashing import hashed_index
+
+FORMAT_VERSION = 1
+ERA_BINS = [1970, 1980, 1990, 2000, 2010, 2020, 2026]
+ERA_LABELS = ["1970s", "1980s", "1990s", "2000s", "2010s", "2020s"]
+
+
+class TrendIndex:
+    def __init__(self, directory: str | Path) -> None:
+        directory = Path(directory)
+        meta = json.loads((directory / "meta.json").read_text(encoding="utf-8"))
+        if meta["format_version"] != FORMAT_VERSION:
+            raise ValueError(f"{directory}: unsupported format version {meta['format_version']}")
+        self.years: list[int] = meta["years"]
+        self.n_features: int = meta["n_features"]
+        self.ngram_range: tuple[int, int] = tuple(meta["ngram_range"])
+        self.lowercase: bool = meta["lowercase"]
+        self._token_re = re.compile(meta["token_pattern"])
+        self.columns = np.load(directory / "columns.npy", mmap_mode="r")
+        self.indptr = np.load(directory / "indptr.npy", mmap_mode="r")
+        self.year_idx = np.load(directory / "year_idx.npy", mmap_mode="r")
+        self.counts = np.load(directory / "counts.npy", mmap_mode="r")
+        songs, unigrams, bigrams = np.load(directory / "totals.npy")
+        self.songs = songs
+        self._ngram_totals = {1: unigrams, 2: bigrams}
+
+        years = np.asarray(self.years)
+        era_of_year = np.searchsorted(ERA_BINS, years, side="right") - 1
+        self._in_era = (era_of_year >= 0) & (era_of_year < len(ERA_LABELS))
+        self._era_of_year = era_of_year[self._in_era]
+
+    def normalize_term(self, term: str) -> str | None:
+        """The n-gram the builder's analyzer would produce for `term`, or None if it cannot be indexed."""
+        tokens = self._token_re.findall(term.lower() if self.lowercase else term)
+        min_n, max_n = self.ngram_range
+        if not min_n <= len(tokens) <= max_n:
+            return None
+        return " ".join(tokens)
+
+    def year_counts(self, ngram: str) -> np.ndarray:
+        col = hashed_index(ngram, self.n_features)
+        series = np.zeros(len(self.years), dtype=np.int64)
+        pos = int(np.searchsorted(self.columns, col))
+        if pos == len(self.columns) or self.columns[pos] != col:
+            return series
+        start, end = int(self.indptr[pos]), int(self.indptr[pos + 1])
+        series[self.year_idx[start:end]] = self.counts[start:end]
+        return series
+
+    def to_eras(self, series: np.ndarray) -> np.ndarray:
+        return np.bincount(self._era_of_year, weights=series[self._in_era], minlength=len(ERA_LABELS))
+
+    def trends(self, terms: Sequence[str], by: str = "year") -> dict:
+        """Counts and rate per 10k n-grams of the same length, per year or per era."""
+        buckets: list = self.years if by == "year" else ERA_LABELS
+        aggregate = (lambda s: s) if by == "year" else self.to_eras
+        series = {}
+        unknown = []
+        for term in terms:
+            ngram = self.normalize_term(term)
+            if ngram is None:
+                unknown.append(term)
+                continue
+            counts = aggregate(self.year_counts(ngram))
+            totals = aggregate(self._ngram_totals[len(ngram.split())])
+            rate = np.divide(counts * 10_000, totals, out=np.zeros(len(buckets)), where=totals > 0)
+            series[term] = {"ngram": ngram, "count": counts.astype(np.int64).tolist(),
+                            "per_10k": np.round(rate, 4).tolist()}
+        return {
+            "by": by,
+            "buckets": list(buckets),
+            "songs": aggregate(self.songs).astype(np.int64).tolist(),
+            "series": series,
+            "unindexable": unknown,
+        }
@@ -0,0 +1,350 @@
+"""
+Load-test benchmark for the inference backend.
+
+Boots the app on localhost (a separate uvicorn process) next to a stub
+lyrics site, replays real-length lyrics against /predict/era, /predict/genre
+and /api/search-lyrics at each requested concurrency, and writes RPS and
+p50/p95/p99 latency as JSON.
+
+--in-process runs uvicorn in a thread of the load generator instead. Server
+and client then share one process and one GIL, so those numbers understate
+the server's own capacity; the report records which mode was used.
+
+    python bench/loadtest.py run --concurrency 1 8 32 --requests 500 --out base.json
+    python bench/loadtest.py run --url http://127.0.0.1:8000 --endpoints era   # existing server
+    python bench/loadtest.py compare base.json new.json
+
+The corpus is a CSV with a `text` (or `lyrics`) column; without one, lyrics of
+realistic length are synthesized from script_era/era_top_tokens.csv.
+"""
+
+import argparse
+import asyncio
+import csv
+import html
+import json
+import math
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import threading
+import time
+import urllib.parse
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+import httpx
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+REPO_ROOT = BACKEND_DIR.parent.parent
+TOP_TOKENS_CSV = REPO_ROOT / "script_era" / "era_top_tokens.csv"
+
+ENDPOINTS = ("era", "genre", "search")
+WORDS_PER_SONG = (150, 450)  # typical lyric length range in the scraped data
+
+
+# ---------------------------------------------------------------------
+# Corpus
+# ---------------------------------------------------------------------
+def load_corpus(path: str | None, size: int, seed: int = 0) -> list[str]:
+    if path:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            column = "text" if "text" in (reader.fieldnames or []) else "lyrics"
+            texts = [row[column] for row in reader if row.get(column)]
+        if not texts:
+            raise SystemExit(f"No lyrics found in {path}")
+        return texts
+
+    rng = random.Random(seed)
+    with open(TOP_TOKENS_CSV, newline="", encoding="utf-8") as f:
+        vocab = sorted({row["token"] for row in csv.DictReader(f)})
+    return [" ".join(rng.choices(vocab, k=rng.randint(*WORDS_PER_SONG))) for _ in range(size)]
+
+
+# ---------------------------------------------------------------------
+# Stub lyrics site (same markup scrape_lyrics_lyricsfreak parses)
+# ---------------------------------------------------------------------
+def start_stub_site(corpus: list[str]) -> tuple[ThreadingHTTPServer, str]:
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            parsed = urllib.parse.urlsplit(self.path)
+            if parsed.path == "/search.php":
+                q = urllib.parse.parse_qs(parsed.query).get("q", [""])[0]
+                slug = urllib.parse.quote(q, safe="")
+                body = f'<html><body><a class="song" href="/song/{slug}">{html.escape(q)}</a></body></html>'
+            elif parsed.path.startswith("/song/"):
+                # crc32, not hash(): str hashes change per process, and so would the page served for a title
+                text = html.escape(corpus[zlib.crc32(parsed.path.encode("utf-8")) % len(corpus)])
+                body = f'<html><body><div class="lyrictxt">{text}</div></body></html>'
+            else:
+                self.send_error(404)
+                return
+            data = body.encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/html; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+# ---------------------------------------------------------------------
+# App under test
+# ---------------------------------------------------------------------
+def _free_port() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def start_app_process(env: dict[str, str]) -> tuple[subprocess.Popen, str]:
+    """uvicorn in its own process, so the load generator does not compete for its GIL."""
+    port = _free_port()
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(port),
+         "--log-level", "warning"],
+        cwd=BACKEND_DIR,
+        env={**os.environ, **env},
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    deadline = time.time() + 120  # model loading happens at import
+    while True:
+        if proc.poll() is not None:
+            raise SystemExit(f"Backend exited with status {proc.returncode} during startup")
+        if time.time() > deadline:
+            proc.terminate()
+            raise SystemExit("Backend did not start within 120s")
+        try:
+            httpx.get(f"{base_url}/metrics", timeout=1)
+            return proc, base_url
+        except httpx.TransportError:
+            time.sleep(0.2)
+
+
+def start_app(env: dict[str, str]) -> tuple[object, str]:
+    """uvicorn in a thread of this process (--in-process)."""
+    import uvicorn
+
+    os.environ.update(env)  # must be set before main is imported
+    sys.path.insert(0, str(BACKEND_DIR))
+    port = _free_port()
+    config = uvicorn.Config("main:app", host="127.0.0.1", port=port, log_level="warning")
+    server = uvicorn.Server(config)
+    threading.Thread(target=server.run, daemon=True).start()
+    deadline = time.time() + 120  # model loading happens at import
+    while not server.started:
+        if time.time() > deadline:
+            raise SystemExit("Backend did not start within 120s")
+        time.sleep(0.1)
+    return server, f"http://127.0.0.1:{port}"
+
+
+# ---------------------------------------------------------------------
+# Load generation
+# ---------------------------------------------------------------------
+def percentile(sorted_values: list[float], q: float) -> float | None:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(q / 100 * len(sorted_values)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def build_request(endpoint: str, i: int, corpus: list[str]) -> tuple[str, str, dict]:
+    if endpoint == "era":
+        return "POST", "/predict/era", {"json": {"text": corpus[i % len(corpus)]}}
+    if endpoint == "genre":
+        return "POST", "/predict/genre", {"json": {"text": corpus[i % len(corpus)]}}
+    # unique titles so the lyrics cache does not turn this into a cache benchmark
+    return "GET", "/api/search-lyrics", {"params": {"title": f"bench song {i}", "artist": "bench"}}
+
+
+async def run_endpoint(
+    base_url: str, endpoint: str, corpus: list[str], concurrency: int, total: int, warmup: int
+) -> dict:
+    latencies: list[float] = []
+    errors: dict[str, int] = {}
+
+    async with httpx.AsyncClient(
+        base_url=base_url, timeout=60, limits=httpx.Limits(max_connections=concurrency)
+    ) as client:
+
+        async def worker(indices, record: bool) -> None:
+            for i in indices:
+                method, path, kwargs = build_request(endpoint, i, corpus)
+                start = time.perf_counter()
+                try:
+                    response = await client.request(method, path, **kwargs)
+                    outcome = None if response.status_code < 400 else str(response.status_code)
+                except httpx.HTTPError as exc:
+                    outcome = type(exc).__name__
+                elapsed = time.perf_counter() - start
+                if not record:
+                    continue
+                if outcome is None:
+                    latencies.append(elapsed)
+                else:
+                    errors[outcome] = errors.get(outcome, 0) + 1
+
+        # workers share one iterator, so each request index is sent exactly once
+        warm = iter(range(warmup))
+        await asyncio.gather(*(worker(warm, False) for _ in range(concurrency)))
+        measured = iter(range(warmup, warmup + total))
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(measured, True) for _ in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    latencies.sort()
+    ms = lambda v: None if v is None else round(v * 1000, 3)  # noqa: E731
+    return {
+        "requests": total,
+        "ok": len(latencies),
+        "errors": errors,
+        "wall_sec": round(wall, 3),
+        "rps": round(len(latencies) / wall, 2) if wall else None,
+        "p50_ms": ms(percentile(latencies, 50)),
+        "p95_ms": ms(percentile(latencies, 95)),
+        "p99_ms": ms(percentile(latencies, 99)),
+        "mean_ms": ms(sum(latencies) / len(latencies)) if latencies else None,
+    }
+
+
+def _git_sha() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def cmd_run(args: argparse.Namespace) -> None:
+    corpus = load_corpus(args.corpus, args.corpus_size, args.seed)
+    stub = app_server = app_process = None
+    base_url = args.url
+    if base_url is None:
+        stub, stub_url = start_stub_site(corpus)
+        if args.in_process:
+            app_server, base_url = start_app({"LYRICSFREAK_BASE_URL": stub_url})
+            print("⚠️ In-process server shares this process's GIL with the load generator; "
+                  "numbers are a lower bound on the server's capacity")
+        else:
+            app_process, base_url = start_app_process({"LYRICSFREAK_BASE_URL": stub_url})
+        print(f"🚀 Backend on {base_url} (stub lyrics site {stub_url})")
+
+    results: dict[str, dict[str, dict]] = {}
+    try:
+        for endpoint in args.endpoints:
+            for c in args.concurrency:
+                stats = asyncio.run(run_endpoint(base_url, endpoint, corpus, c, args.requests, args.warmup))
+                results.setdefault(endpoint, {})[str(c)] = stats
+                print(
+                    f"📊 {endpoint:<6} c={c:<4} rps={stats['rps']} p50={stats['p50_ms']}ms "
+                    f"p95={stats['p95_ms']}ms p99={stats['p99_ms']}ms errors={stats['errors'] or 0}"
+                )
+    finally:
+        if app_server is not None:
+            app_server.should_exit = True
+        if app_process is not None:
+            app_process.terminate()
+            app_process.wait(timeout=30)
+        if stub is not None:
+            stub.shutdown()
+
+    report = {
+        "meta": {
+            "label": args.label,
+            "git_sha": _git_sha(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "cpus": os.cpu_count(),
+            "base_url": args.url or base_url,
+            "server": "external" if args.url else "in-process" if args.in_process else "subprocess",
+            "corpus": args.corpus or f"synthetic:{args.corpus_size}",
+            "requests": args.requests,
+            "warmup": args.warmup,
+        },
+        "results": results,
+    }
+    Path(args.out).write_text(json.dumps(report, indent=2), encoding="utf-8")
+    print(f"✅ Saved {args.out}")
+
+
+def cmd_compare(args: argparse.Namespace) -> None:
+    base = json.loads(Path(args.base).read_text(encoding="utf-8"))
+    new = json.loads(Path(args.new).read_text(encoding="utf-8"))
+    modes = (base["meta"].get("server"), new["meta"].get("server"))
+    if modes[0] != modes[1]:
+        print(f"⚠️ Reports were measured with different server modes ({modes[0]} vs {modes[1]})")
+    metrics = ("rps", "p50_ms", "p95_ms", "p99_ms")
+    diff: dict[str, dict[str, dict]] = {}
+
+    print(f"{'endpoint':<8} {'conc':>5} " + " ".join(f"{m:>22}" for m in metrics))
+    for endpoint, by_conc in base["results"].items():
+        for conc, b in by_conc.items():
+            n = new["results"].get(endpoint, {}).get(conc)
+            if n is None:
+                continue
+            row = {}
+            for m in metrics:
+                if b[m] is None or n[m] is None or not b[m]:
+                    row[m] = None
+                    continue
+                row[m] = {"base": b[m], "new": n[m], "change_pct": round((n[m] - b[m]) / b[m] * 100, 1)}
+            diff.setdefault(endpoint, {})[conc] = row
+            cells = [
+                f"{'-':>22}" if row[m] is None else f"{row[m]['base']:>8} → {row[m]['new']:<8}{row[m]['change_pct']:+5.1f}%"
+                for m in metrics
+            ]
+            print(f"{endpoint:<8} {conc:>5} " + " ".join(cells))
+
+    if args.out:
+        Path(args.out).write_text(
+            json.dumps({"base": base["meta"], "new": new["meta"], "diff": diff}, indent=2), encoding="utf-8"
+        )
+        print(f"✅ Saved {args.out}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    run = sub.add_parser("run", help="Run the load test and write a JSON report.")
+    run.add_argument("--url", help="Target an already running server instead of booting one.")
+    run.add_argument("--in-process", action="store_true",
+                     help="Run the server in a thread of this process (shares the GIL with the load generator).")
+    run.add_argument("--endpoints", nargs="+", choices=ENDPOINTS, default=list(ENDPOINTS))
+    run.add_argument("--concurrency", nargs="+", type=int, default=[1, 8, 32])
+    run.add_argument("--requests", type=int, default=300, help="Measured requests per endpoint and concurrency.")
+    run.add_argument("--warmup", type=int, default=20)
+    run.add_argument("--corpus", help="CSV with a `text` or `lyrics` column.")
+    run.add_argument("--corpus-size", type=int, default=500, help="Synthetic songs when --corpus is not given.")
+    run.add_argument("--seed", type=int, default=0)
+    run.add_argument("--label", default="")
+    run.add_argument("--out", default="loadtest.json")
+    run.set_defaults(func=cmd_run)
+
+    compare = sub.add_parser("compare", help="Compare two reports (new relative to base).")
+    compare.add_argument("base")
+    compare.add_argument("new")
+    compare.add_argument("--out", help="Also write the diff as JSON.")
+    compare.set_defaults(func=cmd_compare)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
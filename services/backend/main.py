@@ -1,14 +1,46 @@
 import logging
-import re
+import os
+import time
 import urllib.parse
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Literal
 
-import joblib
-import requests
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query, Request
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
-from bs4 import BeautifulSoup
-from pydantic import BaseModel
+from fastapi.responses import PlainTextResponse
+from pydantic import BaseModel, Field
+
+from app.cascade import CASCADE_ORDER, CascadeStep, era_margin
+from app.drift import DriftMonitor, model_vocabulary
+from app.metrics import (
+    METRICS,
+    TIMING_HEADER,
+    LRUCache,
+    record_request,
+    server_timing_header,
+    stage,
+    start_request_timing,
+    timed_model_load,
+)
+from app.models import (
+    FeatureAligner,
+    LinearModel,
+    Word2VecEraScorer,
+    YearRegressor,
+    load_linear_model,
+    pair_aligner,
+    transform_shared,
+)
+from app.similar import SimilarityIndex
+from app.text import clean_text as _clean_text
+from app.trends import TrendIndex
+
+# sklearn/joblib (fallback model loading) and requests/bs4 (lyrics scraping) are
+# imported where they are used so that cold start only pays for NumPy + FastAPI.
+
+MODELS_DIR = Path(__file__).parent / "app" / "models"
 
 app = FastAPI(title="Thai Lyrics Era Classifier")
 
@@ -22,36 +54,84 @@ app.add_middleware(
 )
 
 
+@app.middleware("http")
+async def timing_middleware(request: Request, call_next):
+    """Per-endpoint latency/counts; `X-Debug-Timing: 1` adds a Server-Timing breakdown."""
+    timings = start_request_timing() if request.headers.get(TIMING_HEADER) else None
+    start = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - start
+        route = request.scope.get("route")
+        record_request(getattr(route, "path", "unmatched"), status, elapsed)
+    if timings is not None:
+        response.headers["Server-Timing"] = server_timing_header(timings, elapsed)
+    return response
+
+
 @app.get("/ping")
 def ping() -> dict:
     return {"message": "pong"}
 
 
-def _clean_text(text: str) -> str:
-    """Mirror notebook preprocessing for lyrics text."""
-    text = text.replace("\n", " ")
-    text = re.sub(r"[,\.!?]", "", text)
-    text = re.sub(r"\[.*?\]", " ", text)
-    text = re.sub(r"\w*\d\w*", " ", text)
-    text = re.sub(r"[()]", " ", text)
-    return text.lower().strip()
+@app.get("/metrics", response_class=PlainTextResponse)
+def metrics() -> PlainTextResponse:
+    """Prometheus text exposition of request, stage, cache and model-load metrics."""
+    return PlainTextResponse(METRICS.render(), media_type="text/plain; version=0.0.4")
+
+
+@dataclass(slots=True)
+class SklearnPair:
+    """Fallback for a vectorizer/classifier pair not yet exported with tools/export_linear.py."""
+
+    vectorizer: object
+    clf: object
+    aligner: FeatureAligner | None = None  # when the vectorizer's vocabulary differs from the model's inputs
+
+    @classmethod
+    def load(cls, vectorizer, clf) -> "SklearnPair":
+        return cls(vectorizer, clf, pair_aligner(vectorizer, clf))
+
+    def transform(self, clean_text: str):
+        X = self.vectorizer.transform([clean_text])
+        return self.aligner.transform_csr(X) if self.aligner is not None else X
+
+
+def _exported(directory: Path) -> list[Path]:
+    return sorted(p for p in directory.glob("*.npz") if not p.name.endswith(".tmp.npz"))
 
 
 def _load_models_genre_model() -> dict:
-    model_path = Path(__file__).parent / "app" / "models" / "logistic_regression.pkl"
-    return joblib.load(model_path)
+    """
+    Genre one-vs-rest models keyed by genre. Uses the exported scorers in
+    app/models/genre_linear/ when present, otherwise the sklearn pickle.
+    """
+    linear_dir = MODELS_DIR / "genre_linear"
+    if linear_dir.is_dir() and _exported(linear_dir):
+        return {model.name: model for model in map(load_linear_model, _exported(linear_dir))}
+
+    import joblib
+
+    logging.warning("No exported genre models in %s; loading sklearn pickle", linear_dir)
+    bundles = joblib.load(MODELS_DIR / "logistic_regression.pkl")
+    return {genre: SklearnPair.load(b["vectorizer"], b["model"]) for genre, b in bundles.items()}
 
 
 # Load pickle only once at startup.
-GENRE_MODEL = _load_models_genre_model()
+with timed_model_load("genre"):
+    GENRE_MODEL = _load_models_genre_model()
 
 
 def _load_era_models(model_dir: Path | None = None) -> dict:
     """
     Load one-vs-rest logistic regression models and TF-IDF vectorizers per era.
-    Directory structure should be model_dir/<era>/{logreg.joblib, tfidf.joblib}.
+    Directory structure should be model_dir/<era>/linear.npz (exported) or
+    model_dir/<era>/{logreg.joblib, tfidf.joblib}.
     """
-    base_dir = model_dir or (Path(__file__).parent / "app" / "models" / "logreg_binary_era")
+    base_dir = model_dir or (MODELS_DIR / "logreg_binary_era")
     eras: list[str] = []
 
     for item in base_dir.iterdir():
@@ -65,14 +145,22 @@ def _load_era_models(model_dir: Path | None = None) -> dict:
     models: dict[str, dict] = {}
     for era in eras:
         era_path = base_dir / era
+        linear_path = era_path / "linear.npz"
         clf_path = era_path / "logreg.joblib"
         tfidf_path = era_path / "tfidf.joblib"
 
+        if linear_path.exists():
+            models[era] = load_linear_model(linear_path)
+            continue
+
         if not (clf_path.exists() and tfidf_path.exists()):
             logging.warning("Skipping %s — missing model or vectorizer file", era)
             continue
 
-        models[era] = {"clf": joblib.load(clf_path), "tfidf": joblib.load(tfidf_path)}
+        import joblib
+
+        logging.warning("%s has no linear.npz; loading sklearn pickles", era)
+        models[era] = SklearnPair.load(joblib.load(tfidf_path), joblib.load(clf_path))
 
     if not models:
         raise RuntimeError(f"No era models loaded from {base_dir}")
@@ -81,18 +169,226 @@ def _load_era_models(model_dir: Path | None = None) -> dict:
 
 
 # Load era classifiers once at startup.
-ERA_MODELS = _load_era_models()
+with timed_model_load("era_tfidf"):
+    ERA_MODELS = _load_era_models()
+
+
+def _load_roberta_engine():
+    """
+    Optional CPU RoBERTa era engine. ROBERTA_MODEL_DIR points at the multi-class
+    checkpoint or at a directory of per-era binary checkpoints; without one the
+    RoBERTa endpoint answers 503 and torch is never imported.
+    """
+    model_dir = Path(os.environ.get("ROBERTA_MODEL_DIR", MODELS_DIR / "roberta_era"))
+    if not model_dir.exists():
+        logging.info("No RoBERTa checkpoint at %s; /predict/era/roberta disabled", model_dir)
+        return None
+    try:
+        from app.models.roberta import RobertaConfig, RobertaEraEngine
+    except ImportError as exc:
+        logging.warning("RoBERTa dependencies missing (%s); /predict/era/roberta disabled", exc)
+        return None
+
+    threads = os.environ.get("ROBERTA_THREADS")
+    config = RobertaConfig(
+        max_length=int(os.environ.get("ROBERTA_MAX_LENGTH", 512)),
+        max_batch_size=int(os.environ.get("ROBERTA_MAX_BATCH", 16)),
+        max_wait_ms=float(os.environ.get("ROBERTA_MAX_WAIT_MS", 5)),
+        queue_size=int(os.environ.get("ROBERTA_QUEUE_SIZE", 64)),
+        num_threads=int(threads) if threads else None,
+        quantize=os.environ.get("ROBERTA_QUANTIZE", "1") != "0",
+    )
+    engine = RobertaEraEngine.load(model_dir, config)
+    engine.start()
+    return engine
+
+
+with timed_model_load("era_roberta"):
+    ROBERTA_ENGINE = _load_roberta_engine()
+
+
+def _load_w2v_scorer():
+    """Word2Vec era scorer exported by tools/export_w2v.py (memory-mapped, shared across workers)."""
+    model_dir = Path(os.environ.get("W2V_MODEL_DIR", MODELS_DIR / "w2v_era"))
+    if not (model_dir / "meta.json").exists():
+        logging.info("No Word2Vec export at %s; /predict/era/w2v disabled", model_dir)
+        return None
+    return Word2VecEraScorer(model_dir)
+
+
+with timed_model_load("era_w2v"):
+    W2V_SCORER = _load_w2v_scorer()
+
+
+def _load_year_regressor() -> YearRegressor | None:
+    """TF-IDF + Ridge year model from tools/export_year.py; reuses an era featurizer with the same vocabulary."""
+    model_dir = Path(os.environ.get("YEAR_MODEL_DIR", MODELS_DIR / "year_ridge"))
+    if not (model_dir / "linear.npz").exists():
+        logging.info("No year model at %s; /predict/year disabled", model_dir)
+        return None
+    regressor = YearRegressor.load(model_dir)
+    for model in ERA_MODELS.values():
+        if isinstance(model, LinearModel) and model.featurizer.row_key == regressor.featurizer.row_key:
+            regressor.model.featurizer = model.featurizer
+            break
+    return regressor
+
+
+with timed_model_load("year_ridge"):
+    YEAR_MODEL = _load_year_regressor()
+
+
+def _load_trend_index() -> TrendIndex | None:
+    """Per-year n-gram counts from script_era/build_trend_index.py (memory-mapped)."""
+    index_dir = Path(os.environ.get("TREND_INDEX_DIR", MODELS_DIR / "trend_index"))
+    if not (index_dir / "meta.json").exists():
+        logging.info("No trend index at %s; /trends disabled", index_dir)
+        return None
+    return TrendIndex(index_dir)
+
+
+with timed_model_load("trend_index"):
+    TREND_INDEX = _load_trend_index()
+
+
+def _load_similarity_index() -> SimilarityIndex | None:
+    """IVF index over song vectors from tools/build_similarity_index.py (memory-mapped)."""
+    index_dir = Path(os.environ.get("SIMILAR_INDEX_DIR", MODELS_DIR / "similar_index"))
+    if not (index_dir / "meta.json").exists():
+        logging.info("No similarity index at %s; /similar disabled", index_dir)
+        return None
+    return SimilarityIndex(index_dir)
+
+
+with timed_model_load("similar_index"):
+    SIMILAR_INDEX = _load_similarity_index()
+
+
+def _load_drift_monitor() -> DriftMonitor | None:
+    """Compares request texts with the training profile from tools/build_drift_reference.py."""
+    reference = Path(os.environ.get("DRIFT_REFERENCE", MODELS_DIR / "drift_reference.json"))
+    if not reference.exists():
+        logging.info("No drift reference at %s; /drift disabled", reference)
+        return None
+    featurizers = [m.featurizer for m in ERA_MODELS.values() if isinstance(m, LinearModel)]
+    window = int(os.environ.get("DRIFT_WINDOW", 10_000))
+    monitor = DriftMonitor.load(reference, model_vocabulary(featurizers), window=window)
+    monitor.start()
+    return monitor
+
+
+with timed_model_load("drift_reference"):
+    DRIFT_MONITOR = _load_drift_monitor()
+
+
+@app.on_event("shutdown")
+def _stop_workers() -> None:
+    if ROBERTA_ENGINE is not None:
+        ROBERTA_ENGINE.stop()
+    if DRIFT_MONITOR is not None:
+        DRIFT_MONITOR.stop()
 
 
 class PredictRequest(BaseModel):
     text: str
 
 
+class BatchPredictRequest(BaseModel):
+    texts: list[str]
+
+
+class EraPredictRequest(PredictRequest):
+    explain: int = Field(0, ge=0, le=50)  # top contributing terms per era; 0 disables
+
+
+class EraBatchRequest(BatchPredictRequest):
+    explain: int = Field(0, ge=0, le=50)
+
+
+class YearRequest(PredictRequest):
+    coverage: float = Field(0.8, ge=0.5, le=0.98)  # probability mass of the returned interval
+    include_era: bool = False  # also score the era models from the same tokens
+
+
+class YearBatchRequest(BatchPredictRequest):
+    coverage: float = Field(0.8, ge=0.5, le=0.98)
+    include_era: bool = False
+
+
+class SimilarRequest(PredictRequest):
+    k: int = Field(10, ge=1, le=100)
+    eras: list[str] | None = None  # only songs from these eras
+    exclude_eras: list[str] | None = None  # e.g. the query's own era
+    nprobe: int | None = Field(None, ge=1)  # IVF lists to scan; default from the index
+
+
+class EnsembleRequest(PredictRequest):
+    margin: float | None = None  # overrides ENSEMBLE_MARGIN for this request
+
+
+def _clean(text: str) -> str:
+    """`_clean_text` as a timed stage; the result is also sampled by the drift monitor."""
+    with stage("clean"):
+        clean_text = _clean_text(text)
+    if DRIFT_MONITOR is not None:
+        DRIFT_MONITOR.observe(clean_text)
+    return clean_text
+
+
+def _featurize(models: dict, clean_text: str) -> tuple[dict, dict]:
+    """SparseRows of exported models (shared where analyzers/vocabularies match) and sklearn inputs of the rest."""
+    linear = {name: m for name, m in models.items() if isinstance(m, LinearModel)}
+    fallback = {name: m for name, m in models.items() if not isinstance(m, LinearModel)}
+    with stage("vectorize"):
+        rows = dict(zip(linear, transform_shared((m.featurizer for m in linear.values()), clean_text)))
+        inputs = {name: pair.transform(clean_text) for name, pair in fallback.items()}
+    return rows, inputs
+
+
+def _score_models(models: dict, clean_text: str, explain: int = 0,
+                  featurized: tuple[dict, dict] | None = None) -> tuple[dict[str, float], dict[str, list]]:
+    """
+    P(positive) from every one-vs-rest model; texts are analyzed once per distinct analyzer.
+    With `explain`, also the top terms per model by coef * tf-idf (exported models only).
+    `featurized` passes rows already computed by `_featurize` (for a superset of `models`).
+    """
+    linear = {name: m for name, m in models.items() if isinstance(m, LinearModel)}
+    fallback = {name: m for name, m in models.items() if not isinstance(m, LinearModel)}
+    rows, inputs = featurized or _featurize(models, clean_text)
+
+    with stage("score"):
+        probs: dict[str, float] = {}
+        for name in models:
+            if name in linear:
+                probs[name] = linear[name].scorer.positive_proba(rows[name])
+            else:
+                probs[name] = float(fallback[name].clf.predict_proba(inputs[name])[0][1])
+
+    explanations: dict[str, list] = {}
+    if explain:
+        with stage("explain"):
+            for name in models:
+                pairs = linear[name].explain(rows[name], explain, clean_text) if name in linear else []
+                explanations[name] = [{"term": term, "contribution": c} for term, c in pairs]
+    return probs, explanations
+
+
+def _positive_probas(models: dict, clean_text: str) -> dict[str, float]:
+    return _score_models(models, clean_text)[0]
+
+
+# Overridable so benchmarks can point the scraper at a local stub site.
+LYRICSFREAK_BASE_URL = os.environ.get("LYRICSFREAK_BASE_URL", "https://www.lyricsfreak.com").rstrip("/")
+
+
 def scrape_lyrics_lyricsfreak(song: str, artist: str | None = None) -> str | None:
     """Scrape lyrics from lyricsfreak for a given song (artist optional)."""
+    import requests
+    from bs4 import BeautifulSoup
+
     query = f"{song} {artist}" if artist else song
     search_url = (
-        "https://www.lyricsfreak.com/search.php?a=search&type=song&q="
+        f"{LYRICSFREAK_BASE_URL}/search.php?a=search&type=song&q="
         + urllib.parse.quote(query)
     )
 
@@ -100,7 +396,7 @@ def scrape_lyrics_lyricsfreak(song: str, artist: str | None = None) -> str | Non
         search_html = requests.get(
             search_url,
             timeout=10,
-            headers={"Referer": "https://www.lyricsfreak.com"},
+            headers={"Referer": LYRICSFREAK_BASE_URL},
         ).text
     except requests.RequestException as exc:
         logging.warning("lyricsfreak search failed: %s", exc)
@@ -111,12 +407,12 @@ def scrape_lyrics_lyricsfreak(song: str, artist: str | None = None) -> str | Non
     if not result_link:
         return None
 
-    song_url = "https://www.lyricsfreak.com" + result_link["href"]
+    song_url = LYRICSFREAK_BASE_URL + result_link["href"]
     try:
         song_html = requests.get(
             song_url,
             timeout=10,
-            headers={"Referer": "https://www.lyricsfreak.com"},
+            headers={"Referer": LYRICSFREAK_BASE_URL},
         ).text
     except requests.RequestException as exc:
         logging.warning("lyricsfreak fetch failed: %s", exc)
@@ -132,6 +428,11 @@ SCRAPERS = [
     ("lyricsfreak", scrape_lyrics_lyricsfreak),
 ]
 
+# Opt-in (LYRICS_CACHE_TTL seconds, 0 = off): a cached result stays stale until it expires.
+# Found lyrics only; misses are retried on the next request.
+LYRICS_CACHE_TTL = float(os.environ.get("LYRICS_CACHE_TTL", 0))
+LYRICS_CACHE = LRUCache("search_lyrics", maxsize=512, ttl=LYRICS_CACHE_TTL) if LYRICS_CACHE_TTL > 0 else None
+
 
 def scrape_lyrics(song_name: str, artist_name: str | None = None) -> str | None:
     """Try available scrapers sequentially; return first lyrics found."""
@@ -153,41 +454,242 @@ def predict(payload: PredictRequest) -> dict:
     if not payload.text:
         raise HTTPException(status_code=400, detail="Text is required for prediction.")
 
-    scores: dict[str, float] = {}
-    clean_text = _clean_text(payload.text)
-
-    for genre, bundle in GENRE_MODEL.items():
-        vectorizer = bundle["vectorizer"]
-        model = bundle["model"]
+    clean_text = _clean(payload.text)
 
-        x_input = vectorizer.transform([clean_text])
-        probability = model.predict_proba(x_input)[0][1]
-        scores[genre] = float(probability)
+    scores = _positive_probas(GENRE_MODEL, clean_text)
 
     predicted_genre = max(scores, key=scores.get)
     return {"predicted_genre": predicted_genre, "scores": scores}
 
 
+def _predict_era_one(text: str, explain: int) -> dict:
+    clean_text = _clean(text)
+
+    probs, explanations = _score_models(ERA_MODELS, clean_text, explain)  # probability of POS class per era
+
+    predicted_era = max(probs, key=probs.get)
+    result = {"predicted_era": predicted_era, "scores": probs}
+    if explain:
+        result["explanation"] = explanations
+    return result
+
+
 @app.post("/predict/era")
-def predict_era(payload: PredictRequest) -> dict:
+def predict_era(payload: EraPredictRequest) -> dict:
+    """`explain: k` adds the k terms contributing most to each era's score."""
     if not payload.text:
         raise HTTPException(status_code=400, detail="Text is required for prediction.")
+    return _predict_era_one(payload.text, payload.explain)
+
+
+@app.post("/predict/era/batch")
+def predict_era_batch(payload: EraBatchRequest) -> dict:
+    if not payload.texts:
+        raise HTTPException(status_code=400, detail="At least one text is required for prediction.")
+    return {"results": [_predict_era_one(text, payload.explain) for text in payload.texts]}
 
-    probs: dict[str, float] = {}
-    clean_text = _clean_text(payload.text)
 
-    for era, bundle in ERA_MODELS.items():
-        clf = bundle["clf"]
-        tfidf = bundle["tfidf"]
+_YEAR_KEY = "__year__"
 
-        x_input = tfidf.transform([clean_text])
-        probability = clf.predict_proba(x_input)[0][1]  # probability of POS class
-        probs[era] = float(probability)
+
+def _predict_year_texts(texts: list[str], coverage: float, include_era: bool) -> list[dict]:
+    if YEAR_MODEL is None:
+        raise HTTPException(status_code=503, detail="Year model is not loaded.")
+
+    # One analysis per text feeds the year model and (optionally) every era model.
+    models = {_YEAR_KEY: YEAR_MODEL.model, **(ERA_MODELS if include_era else {})}
+    featurized = []
+    for text in texts:
+        clean_text = _clean(text)
+        featurized.append((clean_text, _featurize(models, clean_text)))
+
+    with stage("score"):
+        results = YEAR_MODEL.predict_rows([rows[_YEAR_KEY] for _, (rows, _) in featurized], coverage)
+    if include_era:
+        for result, (clean_text, features) in zip(results, featurized):
+            probs, _ = _score_models(ERA_MODELS, clean_text, featurized=features)
+            result["predicted_era"] = max(probs, key=probs.get)
+            result["era_scores"] = probs
+    return results
+
+
+@app.post("/predict/year")
+def predict_year(payload: YearRequest) -> dict:
+    """Release year with a `coverage` interval from held-out residuals; `include_era` adds era scores."""
+    if not payload.text:
+        raise HTTPException(status_code=400, detail="Text is required for prediction.")
+    return _predict_year_texts([payload.text], payload.coverage, payload.include_era)[0]
+
+
+@app.post("/predict/year/batch")
+def predict_year_batch(payload: YearBatchRequest) -> dict:
+    if not payload.texts:
+        raise HTTPException(status_code=400, detail="At least one text is required for prediction.")
+    return {"results": _predict_year_texts(payload.texts, payload.coverage, payload.include_era)}
+
+
+@app.post("/predict/era/tfidf")
+def predict_era_tfidf(payload: EraPredictRequest) -> dict:
+    return predict_era(payload)
+
+
+@app.post("/predict/era/roberta")
+async def predict_era_roberta(payload: PredictRequest) -> dict:
+    if not payload.text:
+        raise HTTPException(status_code=400, detail="Text is required for prediction.")
+    if ROBERTA_ENGINE is None:
+        raise HTTPException(status_code=503, detail="RoBERTa model is not loaded.")
+
+    from app.models.roberta import QueueFullError
+
+    clean_text = _clean(payload.text)
+
+    try:
+        with stage("roberta"):
+            probs = await ROBERTA_ENGINE.predict(clean_text)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="RoBERTa is overloaded, retry shortly.", headers={"Retry-After": "1"})
 
     predicted_era = max(probs, key=probs.get)
     return {"predicted_era": predicted_era, "scores": probs}
 
 
+@app.post("/predict/era/w2v")
+def predict_era_w2v(payload: PredictRequest) -> dict:
+    if not payload.text:
+        raise HTTPException(status_code=400, detail="Text is required for prediction.")
+    return predict_era_w2v_batch(BatchPredictRequest(texts=[payload.text]))["results"][0]
+
+
+@app.post("/predict/era/w2v/batch")
+def predict_era_w2v_batch(payload: BatchPredictRequest) -> dict:
+    if not payload.texts:
+        raise HTTPException(status_code=400, detail="At least one text is required for prediction.")
+    if W2V_SCORER is None:
+        raise HTTPException(status_code=503, detail="Word2Vec model is not loaded.")
+
+    clean_texts = [_clean(text) for text in payload.texts]
+    with stage("w2v"):
+        batch = W2V_SCORER.predict_proba_batch(clean_texts)
+
+    return {"results": [{"predicted_era": max(probs, key=probs.get), "scores": probs} for probs in batch]}
+
+
+# Escalate to the next (heavier) model while the normalized top-two era margin is below this.
+ENSEMBLE_MARGIN = float(os.environ.get("ENSEMBLE_MARGIN", 0.15))
+
+
+async def _ensemble_step(model: str, clean_text: str) -> dict[str, float] | None:
+    """
+    Scores of one cascade model; None when RoBERTa is overloaded. The CPU-bound
+    TF-IDF and Word2Vec stages run in the threadpool so they do not stall the
+    event loop; RoBERTa already scores on its own batching thread.
+    """
+    if model == "tfidf":
+        return await run_in_threadpool(_positive_probas, ERA_MODELS, clean_text)
+    if model == "w2v":
+        return (await run_in_threadpool(W2V_SCORER.predict_proba_batch, [clean_text]))[0]
+
+    from app.models.roberta import QueueFullError
+
+    try:
+        return await ROBERTA_ENGINE.predict(clean_text)
+    except QueueFullError:
+        return None
+
+
+@app.post("/predict/era/ensemble")
+async def predict_era_ensemble(payload: EnsembleRequest) -> dict:
+    """TF-IDF first, then Word2Vec, then RoBERTa, stopping once the top-two margin is wide enough."""
+    if not payload.text:
+        raise HTTPException(status_code=400, detail="Text is required for prediction.")
+
+    threshold = ENSEMBLE_MARGIN if payload.margin is None else payload.margin
+    loaded = {"tfidf": True, "w2v": W2V_SCORER is not None, "roberta": ROBERTA_ENGINE is not None}
+    clean_text = _clean(payload.text)
+
+    path: list[CascadeStep] = []
+    probs: dict[str, float] = {}
+    for model in (m for m in CASCADE_ORDER if loaded[m]):
+        start = time.perf_counter()
+        with stage(model):
+            step_probs = await _ensemble_step(model, clean_text)
+        if step_probs is None:
+            logging.warning("RoBERTa queue full; ensemble answers from %s", path[-1].model)
+            break
+        probs = step_probs
+        path.append(CascadeStep(model, era_margin(probs), (time.perf_counter() - start) * 1000))
+        if path[-1].margin >= threshold:
+            break
+
+    METRICS.inc("backend_cascade_exits_total", (path[-1].model,))
+    return {
+        "predicted_era": max(probs, key=probs.get),
+        "scores": probs,
+        "model": path[-1].model,
+        "threshold": threshold,
+        "path": [step.as_dict() for step in path],
+        "cost_ms": sum(step.ms for step in path),
+    }
+
+
+@app.post("/similar")
+def similar(payload: SimilarRequest) -> dict:
+    """Songs whose lyrics are closest (cosine over TF-IDF + SVD vectors) to the given text."""
+    if not payload.text:
+        raise HTTPException(status_code=400, detail="Text is required for search.")
+    if SIMILAR_INDEX is None:
+        raise HTTPException(status_code=503, detail="Similarity index is not loaded.")
+
+    allowed = None
+    if payload.eras or payload.exclude_eras:
+        try:
+            allowed = SIMILAR_INDEX.era_mask(payload.eras, payload.exclude_eras)
+        except ValueError as exc:
+            raise HTTPException(status_code=400, detail=str(exc)) from None
+
+    clean_text = _clean(payload.text)
+    with stage("embed"):
+        query = SIMILAR_INDEX.embed(clean_text)
+    if query is None:
+        return {"results": [], "probed_lists": 0, "candidates": 0}
+
+    with stage("ann_search"):
+        hits, stats = SIMILAR_INDEX.search(query, payload.k, payload.nprobe, allowed)
+
+    results = [{**SIMILAR_INDEX.record(song_id), "score": score} for song_id, score in hits]
+    return {"results": results, **stats}
+
+
+@app.get("/drift")
+def drift() -> dict:
+    """Drift of request texts vs. the training corpus (token mix, OOV rate, length); score >= 1 means drift."""
+    if DRIFT_MONITOR is None:
+        raise HTTPException(status_code=503, detail="Drift reference is not loaded.")
+    return DRIFT_MONITOR.report()
+
+
+MAX_TREND_TERMS = 50
+
+
+@app.get("/trends")
+def trends(terms: list[str] = Query(...), by: Literal["year", "era"] = "year") -> dict:
+    """
+    Usage of one or more words/bigrams over time: `?terms=baby&terms=love you`
+    or `?terms=baby,love you`. Returns counts and a rate per 10k n-grams.
+    """
+    if TREND_INDEX is None:
+        raise HTTPException(status_code=503, detail="Trend index is not loaded.")
+    wanted = [t.strip() for term in terms for t in term.split(",") if t.strip()]
+    if not wanted:
+        raise HTTPException(status_code=400, detail="At least one term is required.")
+    if len(wanted) > MAX_TREND_TERMS:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_TREND_TERMS} terms per request.")
+
+    with stage("trends"):
+        return TREND_INDEX.trends(wanted, by)
+
+
 @app.get("/api/search-lyrics")
 def search_lyrics(title: str, artist: str | None = None) -> dict:
     """
@@ -196,7 +698,12 @@ def search_lyrics(title: str, artist: str | None = None) -> dict:
     if not title:
         raise HTTPException(status_code=400, detail="Title is required for search.")
 
-    lyrics = scrape_lyrics(title, artist)
+    with stage("scrape"):
+        if LYRICS_CACHE is None:
+            lyrics = scrape_lyrics(title, artist)
+        else:
+            key = (title.strip().lower(), (artist or "").strip().lower())
+            lyrics = LYRICS_CACHE.get_or_compute(key, lambda: scrape_lyrics(title, artist))
     if not lyrics:
         raise HTTPException(status_code=404, detail="Lyrics not found.")
 
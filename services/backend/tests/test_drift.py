@@ -0,0 +1,44 @@
+import random
+
+from app.drift import DriftMonitor, build_reference
+
+TRAINING_WORDS = "love heart baby tonight dance forever together dream".split()
+DRIFTED_WORDS = "zorp quix blarg fnord wibble snark".split()
+
+
+def make_texts(words: list[str], n: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return [" ".join(rng.choice(words) for _ in range(rng.randint(20, 120))) for _ in range(n)]
+
+
+def monitor(window: int) -> DriftMonitor:
+    reference = build_reference(make_texts(TRAINING_WORDS, 500, seed=0), TRAINING_WORDS)
+    return DriftMonitor(reference, TRAINING_WORDS, window=window)
+
+
+def test_window_forgets_old_drift():
+    windowed, unbounded = monitor(window=50), monitor(window=0)
+    for m in (windowed, unbounded):
+        for text in make_texts(DRIFTED_WORDS, 100, seed=1):
+            m.update(text)
+        assert m.report()["status"] == "drift"
+        for text in make_texts(TRAINING_WORDS, 200, seed=2):
+            m.update(text)
+
+    report = windowed.report()
+    assert 50 <= report["texts"] <= 100 and report["texts_seen"] == 300
+    assert report["status"] == "ok" and report["oov_rate"] == 0
+    assert all(hit["token"] in TRAINING_WORDS for hit in report["heavy_hitters"])
+    assert unbounded.report()["texts"] == 300
+    assert unbounded.report()["status"] == "drift"
+
+
+def test_report_merges_both_generations():
+    m = monitor(window=10)
+    texts = make_texts(TRAINING_WORDS, 15, seed=3)
+    for text in texts:
+        m.update(text)
+    report = m.report()
+    assert report["texts"] == 15
+    assert report["tokens"] == sum(len(t.split()) for t in texts)
+    assert sum(report["length_histogram"]["live"]) == 15
@@ -0,0 +1,198 @@
+"""
+Parity of the sklearn-free linear exports (app.models.linear) with the
+scikit-learn models they replace, and the cold-start promise that importing
+`main` with exported models loads none of scikit-learn, scipy, bs4 or requests.
+"""
+
+import json
+import random
+import shutil
+import subprocess
+import sys
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from sklearn.feature_extraction.text import HashingVectorizer, TfidfTransformer, TfidfVectorizer
+from sklearn.linear_model import LogisticRegression, Ridge
+from sklearn.multiclass import OneVsRestClassifier
+from sklearn.pipeline import make_pipeline
+
+from app.models.linear import load_linear_model, save_linear_model, transform_shared
+from conftest import BACKEND_DIR
+from export_linear import export_pair, vectorizer_config, vectorizer_idf, vectorizer_terms
+
+TOLERANCE = 1e-9
+TOPICS = [
+    "love heart baby tonight dance",
+    "money street hustle block cash",
+    "road whiskey truck river home",
+]
+NOISE = ["the", "and", "I'm", "you're", "café", "naïve", "2020", "x2", "oh", "yeah", "A"]
+
+
+def make_corpus(n: int = 240, seed: int = 0) -> tuple[list[str], np.ndarray]:
+    rng = random.Random(seed)
+    texts, labels = [], []
+    for i in range(n):
+        label = i % len(TOPICS)
+        words = TOPICS[label].split()
+        other = TOPICS[(label + 1) % len(TOPICS)].split()
+        k = rng.randint(5, 60)
+        texts.append(" ".join(
+            rng.choice(words) if r < 0.6 else rng.choice(other) if r < 0.8 else rng.choice(NOISE)
+            for r in (rng.random() for _ in range(k))
+        ))
+        labels.append(label)
+    return texts, np.array(labels)
+
+
+TEXTS, LABELS = make_corpus()
+CHECK_TEXTS = make_corpus(80, seed=1)[0] + ["", "the and", "unseen words only"]
+
+
+def fit_vectorizer(kind: str):
+    if kind == "hashing":
+        vectorizer = make_pipeline(
+            HashingVectorizer(ngram_range=(1, 2), n_features=2 ** 12, alternate_sign=False, norm=None),
+            TfidfTransformer(sublinear_tf=True),
+        )
+    else:
+        vectorizer = TfidfVectorizer(stop_words="english", ngram_range=(1, 2), min_df=2, strip_accents="unicode")
+    return vectorizer, vectorizer.fit_transform(TEXTS)
+
+
+def fit_classifier(mode: str, X):
+    if mode == "binary":
+        return LogisticRegression(solver="liblinear", class_weight="balanced").fit(X, LABELS == 0)
+    if mode == "multinomial":
+        return LogisticRegression(max_iter=1000).fit(X, LABELS)
+    # One binary liblinear model per class, as the era models are trained; predict_proba normalizes
+    # the per-class sigmoids, which is what the exported "ovr" scorer reproduces.
+    ovr = OneVsRestClassifier(LogisticRegression(solver="liblinear")).fit(X, LABELS)
+    return SimpleNamespace(
+        coef_=np.vstack([e.coef_ for e in ovr.estimators_]),
+        intercept_=np.concatenate([e.intercept_ for e in ovr.estimators_]),
+        classes_=ovr.classes_,
+        solver="liblinear",
+        n_features_in_=X.shape[1],
+        predict_proba=ovr.predict_proba,
+    )
+
+
+def max_deviation(vectorizer, clf, model) -> float:
+    expected = clf.predict_proba(vectorizer.transform(CHECK_TEXTS))
+    actual = np.vstack([model.predict_proba(t) for t in CHECK_TEXTS])
+    return float(np.abs(expected - actual).max())
+
+
+@pytest.mark.parametrize("kind", ["tfidf", "hashing"])
+@pytest.mark.parametrize("mode", ["binary", "ovr", "multinomial"])
+def test_export_matches_predict_proba(tmp_path, kind, mode):
+    vectorizer, X = fit_vectorizer(kind)
+    clf = fit_classifier(mode, X)
+    path = tmp_path / "model.npz"
+    export_pair(vectorizer, clf, "m", path)
+
+    model = load_linear_model(path)
+    assert model.scorer.multi_class == mode
+    assert max_deviation(vectorizer, clf, model) < TOLERANCE
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float64", TOLERANCE), ("int8", 2e-2)])
+def test_notebook_hashing_export_matches_sklearn(tmp_path, dtype, tolerance):
+    # The hashing pipeline exactly as log_reg_training.ipynb fits it, with its N_FEATURES and min_df.
+    n_features, min_df = 2 ** 18, 3
+    vectorizer = make_pipeline(
+        HashingVectorizer(stop_words="english", ngram_range=(1, 2), n_features=n_features,
+                          alternate_sign=False, norm=None),
+        TfidfTransformer(),
+    )
+    hasher, tfidf = vectorizer[0], vectorizer[1]
+    counts = hasher.transform(TEXTS)
+    tfidf.fit(counts)
+    df = np.bincount(counts.indices, minlength=n_features)
+    tfidf.idf_ = np.where(df >= min_df, tfidf.idf_, 0.0)
+    clf = LogisticRegression(max_iter=1000, class_weight="balanced", solver="liblinear").fit(
+        tfidf.transform(counts), LABELS == 0
+    )
+    path = tmp_path / "hashing.npz"
+    export_pair(vectorizer, clf, "m", path, dtype)
+
+    model = load_linear_model(path)
+    assert model.featurizer.n_features == n_features
+    assert max_deviation(vectorizer, clf, model) < tolerance
+
+
+@pytest.mark.parametrize("dtype, tolerance", [("float32", 1e-5), ("float16", 5e-3), ("int8", 2e-2)])
+def test_quantized_export_stays_close(tmp_path, dtype, tolerance):
+    vectorizer, X = fit_vectorizer("tfidf")
+    clf = fit_classifier("binary", X)
+    path = tmp_path / "model.npz"
+    export_pair(vectorizer, clf, "m", path, dtype)
+
+    model = load_linear_model(path)
+    assert model.scorer.storage_dtype == dtype
+    assert max_deviation(vectorizer, clf, model) < tolerance
+
+
+def test_batch_scoring_and_shared_rows_match_single(tmp_path):
+    vectorizer, X = fit_vectorizer("tfidf")
+    export_pair(vectorizer, fit_classifier("binary", X), "a", tmp_path / "a.npz")
+    export_pair(vectorizer, fit_classifier("multinomial", X), "b", tmp_path / "b.npz")
+    a, b = load_linear_model(tmp_path / "a.npz"), load_linear_model(tmp_path / "b.npz")
+    assert a.featurizer.row_key == b.featurizer.row_key
+
+    rows = [transform_shared([a.featurizer, b.featurizer], t) for t in CHECK_TEXTS]
+    assert all(row_a is row_b for row_a, row_b in rows)  # vectorized once per identical featurizer
+    batch = a.scorer.decision_function_batch([row for row, _ in rows])
+    single = np.vstack([a.scorer.decision_function(row) for row, _ in rows])
+    np.testing.assert_allclose(batch, single, atol=1e-12)
+
+
+def test_ridge_export_matches_predict(tmp_path):
+    vectorizer, X = fit_vectorizer("tfidf")
+    years = 1970 + 10 * LABELS + np.random.default_rng(0).normal(0, 2, len(LABELS))
+    ridge = Ridge(alpha=1.0).fit(X, years)
+    path = tmp_path / "year.npz"
+    save_linear_model(
+        path, name="year", config=vectorizer_config(vectorizer), terms=vectorizer_terms(vectorizer),
+        idf=vectorizer_idf(vectorizer), coef=ridge.coef_[None, :], intercept=np.atleast_1d(ridge.intercept_),
+        classes=np.array([], dtype=str), multi_class="regression",
+    )
+    model = load_linear_model(path)
+    expected = ridge.predict(vectorizer.transform(CHECK_TEXTS))
+    actual = [model.scorer.predict(model.featurizer.transform(t)) for t in CHECK_TEXTS]
+    assert np.abs(expected - actual).max() < 1e-6
+
+
+@pytest.mark.parametrize("kind", ["tfidf", "hashing"])
+def test_explain_names_document_terms(tmp_path, kind):
+    vectorizer, X = fit_vectorizer(kind)
+    export_pair(vectorizer, fit_classifier("binary", X), "m", tmp_path / "m.npz")
+    model = load_linear_model(tmp_path / "m.npz")
+    text = "love heart baby tonight money"
+    terms = model.explain(model.featurizer.transform(text), 3, text)
+
+    assert terms and [c for _, c in terms] == sorted((c for _, c in terms), reverse=True)
+    analyzed = set(model.featurizer.analyze(text))
+    assert all(set(name.split(" | ")) <= analyzed for name, _ in terms)
+
+
+def test_main_import_loads_no_sklearn_scipy_or_scrapers(tmp_path):
+    app_dir = tmp_path / "app"
+    shutil.copytree(BACKEND_DIR / "app", app_dir,
+                    ignore=shutil.ignore_patterns("__pycache__", "logreg_binary_era", "genre_linear", "*.pkl"))
+    shutil.copy(BACKEND_DIR / "main.py", tmp_path / "main.py")
+    vectorizer, X = fit_vectorizer("tfidf")
+    for era in ("1970s", "1980s"):
+        (app_dir / "models" / "logreg_binary_era" / era).mkdir(parents=True)
+        export_pair(vectorizer, fit_classifier("binary", X), era,
+                    app_dir / "models" / "logreg_binary_era" / era / "linear.npz")
+    (app_dir / "models" / "genre_linear").mkdir()
+    export_pair(vectorizer, fit_classifier("binary", X), "pop", app_dir / "models" / "genre_linear" / "pop.npz")
+
+    probe = ("import json, sys, main; "
+             "print(json.dumps([m for m in ('sklearn', 'scipy', 'bs4', 'requests', 'joblib') if m in sys.modules]))")
+    result = subprocess.run([sys.executable, "-c", probe], cwd=tmp_path, capture_output=True, text=True, check=True)
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
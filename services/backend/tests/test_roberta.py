@@ -0,0 +1,96 @@
+"""
+RoBERTa serving path against a tiny randomly initialised checkpoint saved with
+its tokenizer, so no weights are downloaded.
+"""
+
+import asyncio
+import threading
+import time
+
+import pytest
+
+torch = pytest.importorskip("torch")
+pytest.importorskip("transformers")
+from tokenizers import Tokenizer, models, pre_tokenizers
+from transformers import PreTrainedTokenizerFast, RobertaConfig as HFRobertaConfig, RobertaForSequenceClassification
+
+from app.models.roberta import ERA_LABELS, QueueFullError, RobertaConfig, RobertaEraEngine
+
+WORDS = "love heart baby tonight money street hustle road whiskey truck river".split()
+TEXTS = ["love", "money street hustle block", "road whiskey truck river home tonight baby", "heart heart"]
+
+
+@pytest.fixture(scope="module")
+def checkpoint(tmp_path_factory):
+    path = tmp_path_factory.mktemp("roberta_era")
+    vocab = {token: i for i, token in enumerate(["<s>", "<pad>", "</s>", "<unk>"] + WORDS)}
+    raw = Tokenizer(models.WordLevel(vocab, unk_token="<unk>"))
+    raw.pre_tokenizer = pre_tokenizers.Whitespace()
+    tokenizer = PreTrainedTokenizerFast(
+        tokenizer_object=raw, bos_token="<s>", eos_token="</s>", pad_token="<pad>", unk_token="<unk>"
+    )
+    torch.manual_seed(0)
+    model = RobertaForSequenceClassification(HFRobertaConfig(
+        vocab_size=len(vocab), hidden_size=16, num_hidden_layers=2, num_attention_heads=2, intermediate_size=32,
+        max_position_embeddings=64, num_labels=len(ERA_LABELS), pad_token_id=tokenizer.pad_token_id,
+    ))
+    model.save_pretrained(path)
+    tokenizer.save_pretrained(path)
+    return path
+
+
+def test_padded_batch_matches_single_texts(checkpoint):
+    engine = RobertaEraEngine.load(checkpoint, RobertaConfig(quantize=False), tokenizer_name="unused-offline")
+    assert engine.labels == ERA_LABELS
+
+    batch = engine.predict_batch(TEXTS)
+    for text, scores in zip(TEXTS, batch):
+        (single,) = engine.predict_batch([text])
+        assert single.keys() == scores.keys()
+        assert max(abs(single[k] - scores[k]) for k in scores) < 1e-5
+        assert abs(sum(scores.values()) - 1) < 1e-5
+
+
+def test_predict_batches_concurrent_requests(checkpoint):
+    engine = RobertaEraEngine.load(checkpoint, RobertaConfig(max_wait_ms=50))
+    expected = engine.predict_batch(TEXTS)
+    sizes = []
+    predict_batch = engine.predict_batch
+    engine.predict_batch = lambda texts: sizes.append(len(texts)) or predict_batch(texts)
+
+    async def scenario():
+        return await asyncio.gather(*(engine.predict(text) for text in TEXTS))
+
+    engine.start()
+    try:
+        results = asyncio.run(scenario())
+    finally:
+        engine.stop()
+    assert max(sizes) > 1
+    for got, want in zip(results, expected):
+        assert max(abs(got[k] - want[k]) for k in want) < 1e-5
+
+
+def test_full_queue_rejects_and_stop_does_not_block(checkpoint):
+    engine = RobertaEraEngine.load(checkpoint, RobertaConfig(queue_size=1, max_wait_ms=1))
+    release = threading.Event()
+    engine.predict_batch = lambda texts: [{"1970s": 1.0} for _ in texts] if release.wait(5) else []
+
+    async def scenario():
+        running = asyncio.ensure_future(engine.predict("love"))
+        await asyncio.sleep(0.1)  # the worker is now blocked scoring the first request
+        queued = asyncio.ensure_future(engine.predict("money"))
+        await asyncio.sleep(0)
+        with pytest.raises(QueueFullError):
+            await engine.predict("road")
+
+        threading.Timer(0.2, release.set).start()
+        start = time.perf_counter()
+        await asyncio.get_running_loop().run_in_executor(None, engine.stop)
+        assert time.perf_counter() - start < 5
+        assert await running == {"1970s": 1.0}
+        with pytest.raises(RuntimeError, match="stopped"):
+            await queued
+
+    engine.start()
+    asyncio.run(scenario())
@@ -0,0 +1,60 @@
+"""
+Build the reference profile the backend's drift monitor (app.drift) compares
+live requests against: token counts, out-of-vocabulary rate and text-length
+histogram of the training lyrics.
+
+    python tools/build_drift_reference.py --data ../../script_era/datasets/train_split.csv
+
+The vocabulary is the union of the exported era TF-IDF models' unigrams, the
+same set the backend derives at startup.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.drift import build_reference, model_vocabulary  # noqa: E402
+from app.models.linear import load_linear_model  # noqa: E402
+from app.text import clean_text  # noqa: E402
+
+MODELS_DIR = BACKEND_DIR / "app" / "models"
+ERA_DIR = MODELS_DIR / "logreg_binary_era"
+OUT = MODELS_DIR / "drift_reference.json"
+
+
+def iter_texts(path: Path):
+    for chunk in pd.read_csv(path, chunksize=50_000):
+        if "clean_lyrics" in chunk.columns:
+            yield from chunk["clean_lyrics"].dropna().astype(str)
+        else:
+            yield from (clean_text(t) for t in chunk["lyrics"].dropna().astype(str))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, required=True, help="Training CSV (clean_lyrics or lyrics column).")
+    parser.add_argument("--era-dir", type=Path, default=ERA_DIR)
+    parser.add_argument("--top-n", type=int, default=1000, help="Reference tokens compared with live traffic.")
+    parser.add_argument("--out", type=Path, default=OUT)
+    args = parser.parse_args()
+
+    exported = sorted(args.era_dir.glob("*/linear.npz"))
+    if not exported:
+        raise SystemExit(f"No linear.npz under {args.era_dir}; run tools/export_linear.py first")
+    vocabulary = model_vocabulary(load_linear_model(p).featurizer for p in exported)
+
+    reference = build_reference(iter_texts(args.data), vocabulary, args.top_n)
+    reference["source"] = str(args.data)
+    args.out.write_text(json.dumps(reference, ensure_ascii=False), encoding="utf-8")
+    print(f"✅ {reference['n_texts']:,} texts, {reference['n_tokens']:,} tokens, "
+          f"OOV {reference['oov_rate']:.2%} → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,189 @@
+"""
+Build the similar-song index served by POST /similar (app.similar).
+
+    python tools/build_similarity_index.py --data ../../script_era/datasets/song_lyrics_map_era.csv
+    python tools/build_similarity_index.py --data songs.csv --dim 256 --dtype float16
+
+Songs are embedded with TF-IDF (same settings as the era models) reduced by
+TruncatedSVD and L2-normalized. The vectorizer and SVD are fitted on a sample
+and every song is then projected in chunks, so memory stays bounded for
+million-song corpora. MiniBatchKMeans centroids define the IVF lists; nprobe
+is the smallest power of two whose recall@k against exact search reaches
+--target-recall on held-in queries.
+
+Needs scikit-learn and pandas; the backend only needs NumPy.
+"""
+
+import argparse
+import json
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+from sklearn.cluster import MiniBatchKMeans
+from sklearn.decomposition import TruncatedSVD
+from sklearn.feature_extraction.text import TfidfVectorizer
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models.linear import save_linear_model  # noqa: E402
+from app.similar import FORMAT_VERSION, SimilarityIndex  # noqa: E402
+from app.text import clean_text  # noqa: E402
+from export_linear import vectorizer_config  # noqa: E402
+
+OUT_DIR = BACKEND_DIR / "app" / "models" / "similar_index"
+RECORD_COLUMNS = ("id", "title", "artist", "year", "song_era")
+CHUNK = 50_000
+
+
+def read_songs(path: Path, limit: int | None) -> tuple[list[str], pd.DataFrame]:
+    df = pd.read_csv(path, nrows=limit)
+    if "clean_lyrics" in df.columns:
+        texts = df["clean_lyrics"].fillna("").astype(str).tolist()
+    elif "lyrics" in df.columns:
+        texts = [clean_text(t) for t in df["lyrics"].fillna("").astype(str)]
+    else:
+        raise SystemExit(f"{path}: need a clean_lyrics or lyrics column")
+    if "song_era" not in df.columns:
+        raise SystemExit(f"{path}: need a song_era column")
+    return texts, df[[c for c in RECORD_COLUMNS if c in df.columns]]
+
+
+def embed_all(texts: list[str], vectorizer, svd) -> np.ndarray:
+    out = np.empty((len(texts), svd.n_components), dtype=np.float32)
+    for start in range(0, len(texts), CHUNK):
+        block = svd.transform(vectorizer.transform(texts[start:start + CHUNK]))
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        out[start:start + CHUNK] = block / np.where(norms > 0, norms, 1.0)
+    return out
+
+
+def assign_lists(vectors: np.ndarray, centroids: np.ndarray) -> np.ndarray:
+    return np.concatenate([
+        np.argmax(vectors[s:s + CHUNK] @ centroids.T, axis=1) for s in range(0, len(vectors), CHUNK)
+    ])
+
+
+def write_records(out: Path, records: pd.DataFrame) -> None:
+    blobs = [
+        json.dumps({k: (v.item() if hasattr(v, "item") else v) for k, v in row.items() if pd.notna(v)},
+                   ensure_ascii=False).encode("utf-8")
+        for row in records.rename(columns={"song_era": "era"}).to_dict("records")
+    ]
+    offsets = np.zeros(len(blobs) + 1, dtype=np.int64)
+    np.cumsum([len(b) for b in blobs], out=offsets[1:])
+    (out / "records.bin").write_bytes(b"".join(blobs))
+    np.save(out / "record_offsets.npy", offsets)
+
+
+def exact_top_k(vectors: np.ndarray, query: np.ndarray, k: int) -> set[int]:
+    sims = vectors @ query
+    return set(np.argpartition(-sims, k - 1)[:k].tolist())
+
+
+def tune_nprobe(index: SimilarityIndex, vectors: np.ndarray, queries: np.ndarray, k: int, target: float) -> int:
+    """Smallest power-of-two nprobe reaching `target` mean recall@k; prints the curve."""
+    truth = [exact_top_k(vectors, q, k) for q in queries]
+    nprobe = 1
+    while True:
+        times, hits = [], 0
+        for q, expected in zip(queries, truth):
+            start = time.perf_counter()
+            found, _ = index.search(q, k, nprobe=nprobe)
+            times.append(time.perf_counter() - start)
+            hits += len(expected & {song_id for song_id, _ in found})
+        recall = hits / (k * len(queries))
+        print(f"  nprobe={nprobe:<5} recall@{k}={recall:.3f}  p50={np.median(times) * 1000:.2f}ms  "
+              f"p95={np.percentile(times, 95) * 1000:.2f}ms")
+        if recall >= target or nprobe >= index.n_lists:
+            return min(nprobe, index.n_lists)
+        nprobe *= 2
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, required=True)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    parser.add_argument("--limit", type=int, help="Only the first N songs.")
+    parser.add_argument("--dim", type=int, default=128, help="SVD components.")
+    parser.add_argument("--lists", type=int, help="IVF lists (default ~2*sqrt(n_songs)).")
+    parser.add_argument("--fit-sample", type=int, default=200_000, help="Songs used to fit TF-IDF/SVD/k-means.")
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--target-recall", type=float, default=0.95)
+    parser.add_argument("--queries", type=int, default=200)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    texts, records = read_songs(args.data, args.limit)
+    n = len(texts)
+    sample = np.sort(rng.choice(n, size=min(n, args.fit_sample), replace=False))
+    print(f"{n:,} songs; fitting on {len(sample):,}")
+
+    start = time.perf_counter()
+    vectorizer = TfidfVectorizer(stop_words="english", max_features=50000, ngram_range=(1, 2), min_df=3,
+                                 dtype=np.float32)
+    X_sample = vectorizer.fit_transform([texts[i] for i in sample])
+    svd = TruncatedSVD(n_components=args.dim, random_state=42).fit(X_sample)
+    vectors = embed_all(texts, vectorizer, svd)
+    print(f"Embedded in {time.perf_counter() - start:.1f}s "
+          f"(SVD explains {svd.explained_variance_ratio_.sum():.1%} of the variance)")
+
+    n_lists = args.lists or max(1, min(n, int(2 * np.sqrt(n))))
+    start = time.perf_counter()
+    kmeans = MiniBatchKMeans(n_clusters=n_lists, batch_size=4096, n_init=3, random_state=42)
+    kmeans.fit(vectors[sample[:max(n_lists * 64, 10_000)]])
+    centroids = kmeans.cluster_centers_.astype(np.float32)
+    centroids /= np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+    lists = assign_lists(vectors, centroids)
+    order = np.argsort(lists, kind="stable")
+    offsets = np.zeros(n_lists + 1, dtype=np.int64)
+    np.cumsum(np.bincount(lists, minlength=n_lists), out=offsets[1:])
+    print(f"{n_lists:,} IVF lists in {time.perf_counter() - start:.1f}s "
+          f"(largest {np.diff(offsets).max():,}, empty {(np.diff(offsets) == 0).sum()})")
+
+    eras = sorted(records["song_era"].dropna().astype(str).unique().tolist())
+    # Songs without a usable era get the reserved code len(eras); era filters never select them.
+    era_codes = records["song_era"].astype(str).map({e: i for i, e in enumerate(eras)}).fillna(len(eras)).to_numpy()
+    if (era_codes == len(eras)).any():
+        print(f"{int((era_codes == len(eras)).sum()):,} songs without a known era")
+
+    tmp = args.out.with_name(args.out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    save_linear_model(
+        tmp / "projection.npz", name="tfidf_svd", config=vectorizer_config(vectorizer),
+        terms=vectorizer.get_feature_names_out().tolist(), idf=vectorizer.idf_, coef=svd.components_,
+        intercept=np.zeros(args.dim), classes=np.arange(args.dim), multi_class="multinomial",
+    )
+    np.save(tmp / "centroids.npy", centroids)
+    np.save(tmp / "list_offsets.npy", offsets)
+    np.save(tmp / "vectors.npy", vectors[order].astype(args.dtype))
+    np.save(tmp / "song_ids.npy", order.astype(np.int64))
+    np.save(tmp / "eras.npy", era_codes[order].astype(np.uint8))
+    write_records(tmp, records)
+    meta = {"format_version": FORMAT_VERSION, "dim": args.dim, "n_songs": n, "eras": eras, "nprobe": 1,
+            "source": str(args.data)}
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    index = SimilarityIndex(tmp)
+    queries_idx = rng.choice(n, size=min(n, args.queries), replace=False)
+    embedded = [index.embed(texts[i]) for i in queries_idx]
+    drift = max(float(np.abs(q - vectors[i]).max()) for q, i in zip(embedded, queries_idx) if q is not None)
+    print(f"Projection parity vs sklearn: max |Δ| = {drift:.2e}")
+    queries = np.stack([q for q in embedded if q is not None])
+    meta["nprobe"] = tune_nprobe(index, vectors, queries, args.k, args.target_recall)
+    (tmp / "meta.json").write_text(json.dumps(meta, indent=2), encoding="utf-8")
+
+    shutil.rmtree(args.out, ignore_errors=True)
+    tmp.replace(args.out)
+    size = sum(p.stat().st_size for p in args.out.iterdir())
+    print(f"✅ {args.out}: {n:,} songs, nprobe={meta['nprobe']}, {size / 1e6:.1f} MB")
+
+
+if __name__ == "__main__":
+    main()
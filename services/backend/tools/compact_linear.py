@@ -0,0 +1,188 @@
+"""
+Drop vocabulary entries whose coefficients are near zero in every class from
+exported TF-IDF + logistic-regression models, and report what that costs on a
+validation split.
+
+    python tools/compact_linear.py --data ../../script_era/datasets/val_split.csv
+    python tools/compact_linear.py --data val_split.csv --threshold 0.05 --write
+    python tools/compact_linear.py --task genre --data tag_val_split.csv --ignore misc --sweep 0,0.01,0.1
+
+A term is kept when max |coef| over the classes of any model using that
+featurizer exceeds --threshold (0 drops exact zeros); models whose featurizers are identical keep
+the union, so the backend still vectorizes them once. Terms, idf and
+coefficient columns are rewritten together; --dtype also quantizes the result
+(app.models.linear), from the exact weights when the input is float64. Dropped terms also leave the
+TF-IDF l2 norm, so scores change slightly even for zero-weight terms; the
+sweep reports accuracy, prediction agreement and max |Δproba| against the
+uncompacted models for each threshold, plus vocabulary size and transform
+time.
+
+--write replaces the exports in place for --threshold, unless accuracy drops
+by more than --max-drop; the first original is kept as <file>.orig. Hashing
+models (no vocabulary, one column per bucket) are rejected.
+"""
+
+import argparse
+import shutil
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models.linear import (  # noqa: E402
+    STORAGE_DTYPES,
+    HashingFeaturizer,
+    LinearModel,
+    LinearScorer,
+    TfidfFeaturizer,
+    load_linear_model,
+    quantize,
+    save_linear_model,
+)
+from evaluate import MODELS_DIR, read_split, score_linear  # noqa: E402
+
+DEFAULT_SWEEP = "0,0.005,0.01,0.02,0.05,0.1,0.2"
+
+
+def export_paths(task: str, args) -> list[Path]:
+    if task == "genre":
+        return sorted(p for p in args.genre_dir.glob("*.npz") if not p.name.endswith(".tmp.npz"))
+    return sorted(args.era_dir.glob("*/linear.npz"))
+
+
+def keep_masks(models: list[LinearModel], threshold: float) -> dict[str, np.ndarray]:
+    """Per featurizer row_key: columns whose max |coef| exceeds `threshold` in any model sharing it."""
+    masks: dict[str, np.ndarray] = {}
+    for model in models:
+        key = model.featurizer.row_key
+        strong = np.abs(model.scorer.weights).max(axis=0) > threshold
+        masks[key] = masks[key] | strong if key in masks else strong
+    return masks
+
+
+def compact(model: LinearModel, keep: np.ndarray, dtype: str,
+            featurizer: TfidfFeaturizer | None = None) -> LinearModel:
+    """
+    `model` restricted to the `keep` columns and stored as `dtype` (quantized
+    block scales do not survive dropping columns, so weights are requantized
+    from their dequantized values). Pass `featurizer` to share one compacted featurizer.
+    """
+    columns = np.flatnonzero(keep)
+    if featurizer is None:
+        old = model.featurizer
+        idf, idf_scale = quantize(old.idf_weights[columns], dtype) if old.idf is not None else (None, None)
+        featurizer = TfidfFeaturizer(old.config, [old.terms[i] for i in columns], idf, idf_scale)
+    coef, coef_scale = quantize(model.scorer.weights[:, columns], dtype)
+    scorer = LinearScorer(coef, model.scorer.intercept, model.scorer.classes, model.scorer.multi_class, coef_scale)
+    return LinearModel(name=model.name, featurizer=featurizer, scorer=scorer)
+
+
+def compact_all(models: list[LinearModel], threshold: float, dtype: str | None = None) -> list[LinearModel]:
+    """`dtype` None keeps each model's storage dtype."""
+    masks = keep_masks(models, threshold)
+    shared: dict[str, TfidfFeaturizer] = {}
+    out = []
+    for model in models:
+        key = model.featurizer.row_key
+        compacted = compact(model, masks[key], dtype or model.scorer.storage_dtype, shared.get(key))
+        shared.setdefault(key, compacted.featurizer)
+        out.append(compacted)
+    return out
+
+
+def distinct_featurizers(models: list[LinearModel]) -> list[TfidfFeaturizer]:
+    return list({m.featurizer.row_key: m.featurizer for m in models}.values())
+
+
+def evaluate(models: list[LinearModel], texts: list[str], labels: np.ndarray) -> tuple[np.ndarray, float, float]:
+    """Scores, accuracy of the argmax class, and transform time per document (ms) over all featurizers."""
+    featurizers = distinct_featurizers(models)
+    sample = texts[:500]
+    start = time.perf_counter()
+    for text in sample:
+        for featurizer in featurizers:
+            featurizer.transform(text)
+    transform_ms = (time.perf_counter() - start) / max(len(sample), 1) * 1000
+    scores = score_linear(models, texts)
+    names = np.array([m.name for m in models])
+    return scores, float(np.mean(names[scores.argmax(axis=1)] == labels)), transform_ms
+
+
+def save(model: LinearModel, path: Path) -> None:
+    featurizer, scorer = model.featurizer, model.scorer
+    save_linear_model(path, name=model.name, config=featurizer.config, terms=featurizer.terms, idf=featurizer.idf,
+                      coef=scorer.coef, intercept=scorer.intercept, classes=scorer.classes,
+                      multi_class=scorer.multi_class, dtype=scorer.storage_dtype,
+                      idf_scale=featurizer.idf_scale, coef_scale=scorer.coef_scale)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, required=True, help="Validation split with labels.")
+    parser.add_argument("--task", choices=["era", "genre"], default="era")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--ignore", action="append", default=[], help="Label to leave out; repeatable.")
+    parser.add_argument("--era-dir", type=Path, default=MODELS_DIR / "logreg_binary_era")
+    parser.add_argument("--genre-dir", type=Path, default=MODELS_DIR / "genre_linear")
+    parser.add_argument("--sweep", default=DEFAULT_SWEEP, help="Comma-separated thresholds to report.")
+    parser.add_argument("--threshold", type=float, default=0.01, help="Threshold used by --write.")
+    parser.add_argument("--max-drop", type=float, default=0.005, help="Largest accuracy loss --write accepts.")
+    parser.add_argument("--dtype", choices=STORAGE_DTYPES, help="Store the result as (default: unchanged).")
+    parser.add_argument("--write", action="store_true")
+    args = parser.parse_args()
+
+    paths = export_paths(args.task, args)
+    if not paths:
+        raise SystemExit("No exported models found; run tools/export_linear.py first")
+    models = [load_linear_model(p) for p in paths]
+    if any(isinstance(m.featurizer, HashingFeaturizer) for m in models):
+        raise SystemExit("Hashing models have one column per bucket and no vocabulary to compact; "
+                         "use tools/export_linear.py --dtype to shrink them")
+    texts, labels = read_split(args.data, args.task, args.limit)
+    keep = [i for i, label in enumerate(labels) if label not in set(args.ignore)]
+    texts, labels = [texts[i] for i in keep], np.array([labels[i] for i in keep])
+
+    base_scores, base_acc, base_ms = evaluate(models, texts, labels)
+    base_terms = sum(len(f.terms) for f in distinct_featurizers(models))
+    print(f"{len(models)} models, {len(texts):,} validation documents")
+    print(f"{'threshold':>10} {'terms':>10} {'kept':>7} {'accuracy':>9} {'Δacc':>8} {'agree':>7} "
+          f"{'max|Δp|':>8} {'transform':>10}")
+    print(f"{'original':>10} {base_terms:>10,} {1:>7.1%} {base_acc:>9.4f} {0:>+8.4f} {1:>7.2%} {0:>8.4f} "
+          f"{base_ms:>8.3f}ms")
+
+    thresholds = sorted({float(t) for t in args.sweep.split(",")} | ({args.threshold} if args.write else set()))
+    chosen: tuple[list[LinearModel], float] | None = None
+    for threshold in thresholds:
+        compacted = compact_all(models, threshold, args.dtype)
+        scores, acc, ms = evaluate(compacted, texts, labels)
+        terms = sum(len(f.terms) for f in distinct_featurizers(compacted))
+        agree = float(np.mean(scores.argmax(axis=1) == base_scores.argmax(axis=1)))
+        print(f"{threshold:>10g} {terms:>10,} {terms / base_terms:>7.1%} {acc:>9.4f} {acc - base_acc:>+8.4f} "
+              f"{agree:>7.2%} {np.abs(scores - base_scores).max():>8.4f} {ms:>8.3f}ms")
+        if threshold == args.threshold:
+            chosen = (compacted, acc)
+
+    if not args.write:
+        return
+    compacted, acc = chosen
+    if base_acc - acc > args.max_drop:
+        raise SystemExit(f"❌ threshold {args.threshold:g} loses {base_acc - acc:.4f} accuracy "
+                         f"(> --max-drop {args.max_drop:g}); nothing written")
+    for model, path in zip(compacted, paths):
+        tmp = path.with_name(path.stem + ".tmp.npz")
+        save(model, tmp)
+        before = path.stat().st_size
+        original = path.with_name(path.name + ".orig")
+        if not original.exists():  # keep the uncompacted export across repeated runs
+            shutil.copy2(path, original)
+        tmp.replace(path)
+        print(f"✅ {model.name}: {len(model.featurizer.terms):,} terms, "
+              f"{before / 1e6:.2f} → {path.stat().st_size / 1e6:.2f} MB → {path}")
+
+
+if __name__ == "__main__":
+    main()
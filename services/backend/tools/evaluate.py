@@ -0,0 +1,287 @@
+"""
+Score a labelled split with every served model and write classification
+reports and confusion matrices (replaces the row-by-row scoring in
+dev/classification_report*.ipynb).
+
+    python tools/evaluate.py --data ../../script_era/datasets/test_split.csv
+    python tools/evaluate.py --task genre --data tag_test_split.csv --ignore misc
+    python tools/evaluate.py --data test_split.csv --models tfidf,w2v --out reports/
+
+Exported .npz models are preferred; without them the sklearn pickles are
+scored directly, with vocabulary mismatches remapped by app.models.align.
+Each model scores the whole split in batches, in its own process, so models
+run in parallel. Score matrices are cached under --cache keyed by the model
+files' content hash and the dataset hash (texts + labels); re-running after
+changing one model only rescores that model.
+
+Outputs per model in --out: <model>_report.csv (precision/recall/f1/support
+per class plus accuracy and macro/weighted averages), <model>_confusion.csv
+(rows = true, columns = predicted), and summary.json across models.
+"""
+
+import argparse
+import csv
+import hashlib
+import json
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.text import clean_text  # noqa: E402
+
+MODELS_DIR = BACKEND_DIR / "app" / "models"
+CACHE_DIR = BACKEND_DIR / ".eval_cache"
+BATCH = {"tfidf": 4096, "w2v": 4096, "roberta": 32}
+TEXT_COLUMNS = ("clean_lyrics", "text", "lyrics")
+LABEL_COLUMNS = {"era": ("song_era", "era", "label"), "genre": ("tag", "genre", "label")}
+
+
+def model_paths(task: str, args) -> dict[str, tuple[Path, list[Path]]]:
+    """Model name -> (root directory, files that define it); only models that exist."""
+    if task == "genre":
+        exported = sorted(args.genre_dir.glob("*.npz"))
+        pickles = [args.genre_pkl] if args.genre_pkl.exists() else []
+        models = {"tfidf": (args.genre_dir, exported) if exported else (args.genre_pkl.parent, pickles)}
+    else:
+        exported = sorted(args.era_dir.glob("*/linear.npz"))
+        pickles = sorted(args.era_dir.glob("*/logreg.joblib")) + sorted(args.era_dir.glob("*/tfidf.joblib"))
+        models = {"tfidf": (args.era_dir, exported or pickles)}
+        if (args.w2v_dir / "meta.json").exists():
+            models["w2v"] = (args.w2v_dir, sorted(p for p in args.w2v_dir.iterdir() if p.is_file()))
+        if args.roberta_dir.exists():
+            models["roberta"] = (args.roberta_dir, sorted(p for p in args.roberta_dir.rglob("*") if p.is_file()))
+    return {name: (root, files) for name, (root, files) in models.items() if files}
+
+
+def fingerprint(root: Path, files: list[Path]) -> str:
+    """Content hash of a model's files, so a re-export or retrain invalidates its cached scores."""
+    digest = hashlib.sha1()
+    for path in files:
+        digest.update(str(path.relative_to(root)).encode("utf-8"))
+        with open(path, "rb") as f:
+            for block in iter(lambda: f.read(1 << 20), b""):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def dataset_hash(texts: list[str], labels: list[str]) -> str:
+    digest = hashlib.sha1()
+    for text, label in zip(texts, labels):
+        digest.update(text.encode("utf-8"))
+        digest.update(b"\0")
+        digest.update(label.encode("utf-8"))
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def read_split(path: Path, task: str, limit: int | None) -> tuple[list[str], list[str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        text_col = next((c for c in TEXT_COLUMNS if c in fields), None)
+        label_col = next((c for c in LABEL_COLUMNS[task] if c in fields), None)
+        if text_col is None or label_col is None:
+            raise SystemExit(f"{path}: need one of {TEXT_COLUMNS} and one of {LABEL_COLUMNS[task]}")
+        rows = [(row[text_col], row[label_col]) for row in reader if row.get(text_col) and row.get(label_col)]
+    rows = rows[:limit] if limit else rows
+    return [clean_text(t) for t, _ in rows], [label for _, label in rows]
+
+
+# ---- scoring (runs in worker processes) ----
+def _score_tfidf(paths: list[Path], texts: list[str]) -> tuple[list[str], np.ndarray]:
+    from app.models import load_linear_model
+
+    models = [load_linear_model(p) for p in paths]
+    return [m.name for m in models], score_linear(models, texts)
+
+
+def score_linear(models: list, texts: list[str]) -> np.ndarray:
+    """(n_texts, n_models) P(positive) of binary one-vs-rest LinearModels, batched."""
+    from app.models import transform_shared
+
+    featurizers = [m.featurizer for m in models]
+    scores = np.empty((len(texts), len(models)), dtype=np.float64)
+    for start in range(0, len(texts), BATCH["tfidf"]):
+        rows = [transform_shared(featurizers, text) for text in texts[start:start + BATCH["tfidf"]]]
+        for j, model in enumerate(models):
+            logits = model.scorer.decision_function_batch([r[j] for r in rows])[:, -1]
+            scores[start:start + len(rows), j] = 1.0 / (1.0 + np.exp(-logits))
+    return scores
+
+
+def _score_sklearn(paths: list[Path], texts: list[str]) -> tuple[list[str], np.ndarray]:
+    """Unexported pairs (genre pickle or <era>/{tfidf,logreg}.joblib), aligned without densifying."""
+    import joblib
+
+    from app.models import pair_aligner
+
+    if paths[0].suffix == ".pkl":
+        pairs = {name: (b["vectorizer"], b["model"]) for name, b in joblib.load(paths[0]).items()}
+    else:
+        pairs = {p.parent.name: (joblib.load(p.parent / "tfidf.joblib"), joblib.load(p))
+                 for p in paths if p.name == "logreg.joblib"}
+    scores = np.empty((len(texts), len(pairs)), dtype=np.float64)
+    for j, (vectorizer, clf) in enumerate(pairs.values()):
+        aligner = pair_aligner(vectorizer, clf)
+        for start in range(0, len(texts), BATCH["tfidf"]):
+            X = vectorizer.transform(texts[start:start + BATCH["tfidf"]])
+            X = aligner.transform_csr(X) if aligner is not None else X
+            scores[start:start + X.shape[0], j] = clf.predict_proba(X)[:, 1]
+    return list(pairs), scores
+
+
+def _score_dicts(predict_batch, texts: list[str], batch: int) -> tuple[list[str], np.ndarray]:
+    out: list[dict[str, float]] = []
+    for start in range(0, len(texts), batch):
+        out.extend(predict_batch(texts[start:start + batch]))
+    classes = list(out[0]) if out else []
+    return classes, np.array([[d[c] for c in classes] for d in out], dtype=np.float64)
+
+
+def score_model(name: str, root: Path, paths: list[Path], texts: list[str]) -> tuple[list[str], np.ndarray, float]:
+    start = time.perf_counter()
+    if name == "tfidf" and paths[0].suffix == ".npz":
+        classes, scores = _score_tfidf(paths, texts)
+    elif name == "tfidf":
+        classes, scores = _score_sklearn(paths, texts)
+    elif name == "w2v":
+        from app.models import Word2VecEraScorer
+
+        classes, scores = _score_dicts(Word2VecEraScorer(root).predict_proba_batch, texts, BATCH["w2v"])
+    else:
+        from app.models.roberta import RobertaEraEngine
+
+        engine = RobertaEraEngine.load(root)
+        classes, scores = _score_dicts(engine.predict_batch, texts, BATCH["roberta"])
+    return classes, scores, time.perf_counter() - start
+
+
+# ---- reports ----
+def confusion_matrix(y_true: np.ndarray, y_pred: np.ndarray, n: int) -> np.ndarray:
+    return np.bincount(y_true * n + y_pred, minlength=n * n).reshape(n, n)
+
+
+def classification_report(cm: np.ndarray, labels: list[str]) -> list[dict]:
+    """Rows like sklearn's classification_report(output_dict=True), from a confusion matrix."""
+    tp = np.diag(cm).astype(np.float64)
+    support = cm.sum(axis=1)
+    predicted = cm.sum(axis=0)
+    precision = np.divide(tp, predicted, out=np.zeros_like(tp), where=predicted > 0)
+    recall = np.divide(tp, support, out=np.zeros_like(tp), where=support > 0)
+    denom = precision + recall
+    f1 = np.divide(2 * precision * recall, denom, out=np.zeros_like(tp), where=denom > 0)
+    total = support.sum()
+    rows = [{"label": label, "precision": p, "recall": r, "f1": f, "support": int(s)}
+            for label, p, r, f, s in zip(labels, precision, recall, f1, support)]
+    rows.append({"label": "accuracy", "precision": None, "recall": None, "f1": tp.sum() / max(total, 1),
+                 "support": int(total)})
+    rows.append({"label": "macro avg", "precision": precision.mean(), "recall": recall.mean(), "f1": f1.mean(),
+                 "support": int(total)})
+    weights = support / max(total, 1)
+    rows.append({"label": "weighted avg", "precision": precision @ weights, "recall": recall @ weights,
+                 "f1": f1 @ weights, "support": int(total)})
+    return rows
+
+
+def format_report(name: str, rows: list[dict], seconds: float | None, n: int) -> str:
+    speed = f"{seconds:.1f}s, {n / seconds:,.0f} docs/s" if seconds else "cached"
+    lines = [f"=== {name} ({speed}) ===", f"{'':>14}{'precision':>10}{'recall':>10}{'f1':>10}{'support':>10}"]
+    for row in rows:
+        cells = "".join(f"{row[k]:>10.3f}" if row[k] is not None else " " * 10 for k in ("precision", "recall", "f1"))
+        lines.append(f"{row['label']:>14}{cells}{row['support']:>10}")
+    return "\n".join(lines)
+
+
+def write_csv(path: Path, header: list, rows: list[list]) -> None:
+    with open(path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, required=True)
+    parser.add_argument("--task", choices=list(LABEL_COLUMNS), default="era")
+    parser.add_argument("--models", help="Comma-separated subset of tfidf,w2v,roberta (default: all available).")
+    parser.add_argument("--limit", type=int, help="Only the first N rows.")
+    parser.add_argument("--ignore", action="append", default=[], help="Label to leave out (e.g. misc); repeatable.")
+    parser.add_argument("--era-dir", type=Path, default=MODELS_DIR / "logreg_binary_era")
+    parser.add_argument("--genre-dir", type=Path, default=MODELS_DIR / "genre_linear")
+    parser.add_argument("--genre-pkl", type=Path, default=MODELS_DIR / "logistic_regression.pkl",
+                        help="Used when there are no genre exports.")
+    parser.add_argument("--w2v-dir", type=Path, default=MODELS_DIR / "w2v_era")
+    parser.add_argument("--roberta-dir", type=Path, default=MODELS_DIR / "roberta_era")
+    parser.add_argument("--cache", type=Path, default=CACHE_DIR)
+    parser.add_argument("--no-cache", action="store_true")
+    parser.add_argument("--jobs", type=int, help="Worker processes (default: one per model).")
+    parser.add_argument("--out", type=Path, default=Path("eval_reports"))
+    args = parser.parse_args()
+
+    texts, labels = read_split(args.data, args.task, args.limit)
+    if args.ignore:
+        keep = [i for i, label in enumerate(labels) if label not in set(args.ignore)]
+        texts, labels = [texts[i] for i in keep], [labels[i] for i in keep]
+    data_key = dataset_hash(texts, labels)
+    print(f"{len(texts):,} documents from {args.data} (dataset {data_key[:12]})")
+
+    models = model_paths(args.task, args)
+    if args.models:
+        wanted = args.models.split(",")
+        missing = [m for m in wanted if m not in models]
+        if missing:
+            raise SystemExit(f"Not available for task {args.task}: {', '.join(missing)}")
+        models = {m: models[m] for m in wanted}
+    if not models:
+        raise SystemExit("No exported models found")
+
+    args.cache.mkdir(parents=True, exist_ok=True)
+    results: dict[str, tuple[list[str], np.ndarray, float | None]] = {}
+    todo = {}
+    for name, (root, paths) in models.items():
+        cache_path = args.cache / f"{args.task}-{name}-{fingerprint(root, paths)[:16]}-{data_key[:16]}.npz"
+        if cache_path.exists() and not args.no_cache:
+            with np.load(cache_path, allow_pickle=False) as cached:
+                results[name] = (cached["classes"].tolist(), cached["scores"], None)
+        else:
+            todo[name] = (root, paths, cache_path)
+
+    if todo:
+        with ProcessPoolExecutor(max_workers=args.jobs or len(todo)) as pool:
+            futures = {name: pool.submit(score_model, name, root, paths, texts)
+                       for name, (root, paths, _) in todo.items()}
+            for name, future in futures.items():
+                classes, scores, seconds = future.result()
+                np.savez(todo[name][2], classes=np.array(classes), scores=scores)
+                results[name] = (classes, scores, seconds)
+
+    args.out.mkdir(parents=True, exist_ok=True)
+    summary = {"data": str(args.data), "dataset_hash": data_key, "documents": len(texts), "models": {}}
+    for name, (classes, scores, seconds) in results.items():
+        predicted = np.array(classes)[np.argmax(scores, axis=1)]
+        label_set = sorted(set(labels) | set(predicted.tolist()))  # as sklearn: labels seen in y_true or y_pred
+        index = {label: i for i, label in enumerate(label_set)}
+        y_true = np.array([index[label] for label in labels], dtype=np.int64)
+        y_pred = np.array([index[c] for c in predicted.tolist()], dtype=np.int64)
+        cm = confusion_matrix(y_true, y_pred, len(label_set))
+        rows = classification_report(cm, label_set)
+        print(format_report(name, rows, seconds, len(texts)))
+
+        write_csv(args.out / f"{name}_report.csv", ["label", "precision", "recall", "f1", "support"],
+                  [[r["label"], r["precision"], r["recall"], r["f1"], r["support"]] for r in rows])
+        write_csv(args.out / f"{name}_confusion.csv", ["true \\ predicted", *label_set],
+                  [[label, *cm[i].tolist()] for i, label in enumerate(label_set)])
+        summary["models"][name] = {"accuracy": rows[-3]["f1"], "macro_f1": rows[-2]["f1"],
+                                   "seconds": seconds, "cached": seconds is None}
+    (args.out / "summary.json").write_text(json.dumps(summary, indent=2), encoding="utf-8")
+    print(f"✅ Reports in {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,225 @@
+"""
+Export the era and genre TfidfVectorizer + LogisticRegression pairs to the
+sklearn-free `.npz` format read by app.models.linear, and check that the
+exported scorer reproduces `predict_proba` before writing anything.
+
+    python tools/export_linear.py                       # era + genre, default paths
+    python tools/export_linear.py --texts lyrics.csv    # parity on real lyrics (`text`/`lyrics` column)
+    python tools/export_linear.py --dtype int8          # 8-bit coef/idf; parity reports the max deviation
+
+Era models:   app/models/logreg_binary_era/<era>/{logreg,tfidf}.joblib -> <era>/linear.npz
+Genre models: app/models/logistic_regression.pkl -> app/models/genre_linear/<genre>.npz
+
+`tfidf.joblib` may also be a HashingVectorizer + TfidfTransformer pipeline
+(log_reg_training.ipynb with VECTORIZER = "hashing"); those export as an idf
+array per hash bucket with no terms, and need --texts for the parity check.
+"""
+
+import argparse
+import csv
+import random
+import re
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models.align import pair_aligner  # noqa: E402
+from app.models.linear import STORAGE_DTYPES, LinearModel, load_linear_model, save_linear_model  # noqa: E402
+from app.text import clean_text  # noqa: E402
+
+MODELS_DIR = BACKEND_DIR / "app" / "models"
+ERA_DIR = MODELS_DIR / "logreg_binary_era"
+GENRE_PKL = MODELS_DIR / "logistic_regression.pkl"
+GENRE_OUT = MODELS_DIR / "genre_linear"
+PARITY_TOLERANCE = 1e-9
+QUANTIZED_TOLERANCE = 0.01  # default max |Δproba| accepted for float16/int8 storage
+
+
+def _analyzer_config(vectorizer) -> dict:
+    if vectorizer.analyzer != "word" or vectorizer.preprocessor is not None or vectorizer.tokenizer is not None:
+        raise ValueError("Only analyzer='word' with the default preprocessor/tokenizer can be exported")
+    if vectorizer.strip_accents not in (None, "unicode", "ascii"):
+        raise ValueError(f"Unsupported strip_accents: {vectorizer.strip_accents!r}")
+    stop_words = vectorizer.get_stop_words()
+    return {
+        "lowercase": bool(vectorizer.lowercase),
+        "strip_accents": vectorizer.strip_accents,
+        "token_pattern": vectorizer.token_pattern,
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "ngram_range": list(vectorizer.ngram_range),
+    }
+
+
+def hashing_steps(vectorizer):
+    """(HashingVectorizer, TfidfTransformer) of a hashing pipeline, or None for a TfidfVectorizer."""
+    steps = getattr(vectorizer, "steps", None)
+    if steps is None:
+        return None
+    kinds = [type(step).__name__ for _, step in steps]
+    if kinds != ["HashingVectorizer", "TfidfTransformer"]:
+        raise ValueError(f"Unsupported pipeline {kinds}; expected HashingVectorizer + TfidfTransformer")
+    return steps[0][1], steps[1][1]
+
+
+def vectorizer_config(vectorizer) -> dict:
+    """Analyzer/weighting settings of a fitted TfidfVectorizer or hashing pipeline; rejects what is not reproducible."""
+    hashing = hashing_steps(vectorizer)
+    counter, weighting = hashing or (vectorizer, vectorizer)
+    if hashing is not None and (counter.alternate_sign or counter.norm is not None):
+        raise ValueError("HashingVectorizer must use alternate_sign=False and norm=None "
+                         "(the TfidfTransformer normalizes)")
+    config = _analyzer_config(counter)
+    config.update({
+        "norm": weighting.norm,
+        "binary": bool(counter.binary),
+        "sublinear_tf": bool(weighting.sublinear_tf),
+        "use_idf": bool(weighting.use_idf),
+    })
+    if hashing is not None:
+        config["n_features"] = int(counter.n_features)
+    return config
+
+
+def vectorizer_terms(vectorizer) -> list[str]:
+    """Column names of a TfidfVectorizer; empty for a hashing pipeline."""
+    if hashing_steps(vectorizer) is not None:
+        return []
+    terms = np.empty(len(vectorizer.vocabulary_), dtype=object)
+    for term, index in vectorizer.vocabulary_.items():
+        terms[index] = term
+    return terms.tolist()
+
+
+def vectorizer_idf(vectorizer) -> np.ndarray | None:
+    _, weighting = hashing_steps(vectorizer) or (vectorizer, vectorizer)
+    return weighting.idf_ if weighting.use_idf else None
+
+
+def multi_class_mode(clf) -> str:
+    if clf.coef_.shape[0] == 1:
+        return "binary"
+    mode = getattr(clf, "multi_class", "auto")
+    if mode == "ovr" or (mode in ("auto", "deprecated") and clf.solver == "liblinear"):
+        return "ovr"
+    return "multinomial"
+
+
+def export_pair(vectorizer, clf, name: str, path: Path, dtype: str = "float64") -> None:
+    """Coefficients are stored in the vectorizer's column order (re-indexed if the model's inputs differ)."""
+    aligner = pair_aligner(vectorizer, clf)
+    save_linear_model(
+        path,
+        name=name,
+        config=vectorizer_config(vectorizer),
+        terms=vectorizer_terms(vectorizer),
+        idf=vectorizer_idf(vectorizer),
+        coef=aligner.align_coef(clf.coef_) if aligner is not None else clf.coef_,
+        intercept=clf.intercept_,
+        classes=clf.classes_,
+        multi_class=multi_class_mode(clf),
+        dtype=dtype,
+    )
+
+
+def parity_texts(path: str | None, vectorizer, n: int = 300, seed: int = 0) -> list[str]:
+    """Real lyrics if given; otherwise documents mixing vocabulary terms, stop words, digits and punctuation."""
+    if path:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            column = next((c for c in ("text", "lyrics", "clean_lyrics") if c in (reader.fieldnames or [])), "lyrics")
+            return [row[column] for row in reader if row.get(column)][:n]
+    if hashing_steps(vectorizer) is not None:
+        raise SystemExit("Hashing vectorizers have no vocabulary to sample parity texts from; pass --texts")
+
+    rng = random.Random(seed)
+    words = sorted({w for term in vectorizer.vocabulary_ for w in term.split()})
+    extras = ["the", "and", "I'm", "you're", "café", "naïve", "2020", "x2", "[Chorus]", "(oh)", "yeah!", "A"]
+    docs = ["", "the and of"]  # empty / stop-words-only inputs
+    for _ in range(n):
+        k = rng.randint(5, 400)
+        docs.append(" ".join(rng.choice(words) if rng.random() < 0.85 else rng.choice(extras) for _ in range(k)))
+    return docs
+
+
+def check_parity(vectorizer, clf, model: LinearModel, texts: list[str]) -> float:
+    cleaned = [clean_text(t) for t in texts]
+    X = vectorizer.transform(cleaned)
+    aligner = pair_aligner(vectorizer, clf)
+    expected = clf.predict_proba(aligner.transform_csr(X) if aligner is not None else X)
+    actual = np.vstack([model.predict_proba(t) for t in cleaned])
+    return float(np.abs(expected - actual).max())
+
+
+def export_and_check(vectorizer, clf, name: str, path: Path, texts_path: str | None, dtype: str = "float64",
+                     tolerance: float = PARITY_TOLERANCE) -> float:
+    """Max |Δproba| against the float64 sklearn model; nothing is written above `tolerance`."""
+    tmp = path.with_name(path.stem + ".tmp.npz")
+    export_pair(vectorizer, clf, name, tmp, dtype)
+    diff = check_parity(vectorizer, clf, load_linear_model(tmp), parity_texts(texts_path, vectorizer))
+    if diff > tolerance:
+        tmp.unlink()
+        raise SystemExit(f"❌ {name}: max |Δproba| = {diff:.3e} exceeds {tolerance:g}; nothing written")
+    tmp.replace(path)
+    hashing = hashing_steps(vectorizer)
+    size = f"{hashing[0].n_features:,} hash buckets" if hashing else f"{len(vectorizer.vocabulary_):,} terms"
+    print(f"✅ {name}: {size}, {dtype} {path.stat().st_size / 1e6:.2f} MB, "
+          f"max |Δproba| = {diff:.2e} → {path}")
+    return diff
+
+
+def slug(name: str) -> str:
+    return re.sub(r"[^\w\-]+", "_", name).strip("_") or "model"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--era-dir", type=Path, default=ERA_DIR)
+    parser.add_argument("--genre-pkl", type=Path, default=GENRE_PKL)
+    parser.add_argument("--genre-out", type=Path, default=GENRE_OUT)
+    parser.add_argument("--texts", help="CSV with real lyrics for the parity check (required for hashing models).")
+    parser.add_argument("--skip-era", action="store_true")
+    parser.add_argument("--skip-genre", action="store_true")
+    parser.add_argument("--dtype", choices=STORAGE_DTYPES, default="float64", help="Storage of coef and idf.")
+    parser.add_argument("--max-deviation", type=float,
+                        help=f"Max |Δproba| accepted (default {PARITY_TOLERANCE:g} for float64, "
+                             f"{QUANTIZED_TOLERANCE:g} otherwise).")
+    args = parser.parse_args()
+    tolerance = args.max_deviation
+    if tolerance is None:
+        tolerance = PARITY_TOLERANCE if args.dtype == "float64" else QUANTIZED_TOLERANCE
+    deviations: dict[str, float] = {}
+
+    if not args.skip_era:
+        for era_path in sorted(p for p in args.era_dir.iterdir() if p.is_dir() and not p.name.startswith(".")):
+            clf_path, tfidf_path = era_path / "logreg.joblib", era_path / "tfidf.joblib"
+            if not (clf_path.exists() and tfidf_path.exists()):
+                print(f"⚠️ Skipping {era_path.name}: missing model or vectorizer file")
+                continue
+            deviations[era_path.name] = export_and_check(
+                joblib.load(tfidf_path), joblib.load(clf_path), era_path.name, era_path / "linear.npz", args.texts,
+                args.dtype, tolerance,
+            )
+
+    if not args.skip_genre and not args.genre_pkl.exists():
+        print(f"⚠️ Skipping genre models: {args.genre_pkl} not found")
+    elif not args.skip_genre:
+        args.genre_out.mkdir(parents=True, exist_ok=True)
+        for genre, bundle in joblib.load(args.genre_pkl).items():
+            deviations[genre] = export_and_check(
+                bundle["vectorizer"], bundle["model"], genre, args.genre_out / f"{slug(genre)}.npz", args.texts,
+                args.dtype, tolerance,
+            )
+
+    if deviations and args.dtype != "float64":
+        worst = max(deviations, key=deviations.get)
+        print(f"Parity ({args.dtype} vs float64): max |Δproba| = {deviations[worst]:.2e} ({worst}), "
+              f"mean of per-model maxima = {np.mean(list(deviations.values())):.2e}")
+
+
+if __name__ == "__main__":
+    main()
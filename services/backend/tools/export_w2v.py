@@ -0,0 +1,133 @@
+"""
+Export the per-era Word2Vec + LogisticRegression models trained in
+script_era/log_reg_training.ipynb to the memory-mapped format read by
+app.models.w2v, and check the exported scorer against `predict_proba` on
+mean embeddings before replacing anything.
+
+    python tools/export_w2v.py                        # default paths, float32
+    python tools/export_w2v.py --dtype float16        # half the size; parity is reported, not enforced
+    python tools/export_w2v.py --texts lyrics.csv     # parity on real lyrics (`text`/`lyrics` column)
+
+In:  app/models/logreg_binary_word2vec/<era>/{logreg.joblib, word2vec.model}
+Out: app/models/w2v_era/{vocab,scores,present}.npy + meta.json
+
+Needs gensim and scikit-learn; the backend only needs NumPy.
+"""
+
+import argparse
+import csv
+import random
+import shutil
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models.w2v import Word2VecEraScorer, save_w2v_scorer, tokenize  # noqa: E402
+from app.text import clean_text  # noqa: E402
+
+MODELS_DIR = BACKEND_DIR / "app" / "models"
+SRC_DIR = MODELS_DIR / "logreg_binary_word2vec"
+OUT_DIR = MODELS_DIR / "w2v_era"
+PARITY_TOLERANCE = 1e-5  # float32 storage of the projected scores
+
+
+def load_era(era_path: Path):
+    from gensim.models import Word2Vec
+
+    clf = joblib.load(era_path / "logreg.joblib")
+    wv = Word2Vec.load(str(era_path / "word2vec.model")).wv
+    if clf.coef_.shape != (1, wv.vector_size):
+        raise ValueError(f"{era_path.name}: expected a binary classifier over {wv.vector_size}-dim embeddings")
+    return wv, clf
+
+
+def project(eras: dict) -> tuple[list[str], np.ndarray, np.ndarray, np.ndarray]:
+    """Union vocabulary (sorted by UTF-8 bytes) with w_e · v_e(t) per era and the presence mask."""
+    vocab = sorted({w for wv, _ in eras.values() for w in wv.index_to_key}, key=lambda w: w.encode("utf-8"))
+    row = {w: i for i, w in enumerate(vocab)}
+    scores = np.zeros((len(vocab), len(eras)))
+    present = np.zeros((len(vocab), len(eras)), dtype=bool)
+    intercepts = np.zeros(len(eras))
+    for j, (wv, clf) in enumerate(eras.values()):
+        rows = np.fromiter((row[w] for w in wv.index_to_key), dtype=np.int64, count=len(wv.index_to_key))
+        scores[rows, j] = wv.vectors.astype(np.float64) @ clf.coef_[0]
+        present[rows, j] = True
+        intercepts[j] = clf.intercept_[0]
+    return vocab, scores, present, intercepts
+
+
+def notebook_proba(wv, clf, tokens: list[str]) -> float:
+    """sentence_embedding() + predict_proba exactly as in the training notebook."""
+    vecs = [wv[w] for w in tokens if w in wv.key_to_index]
+    emb = np.mean(vecs, axis=0) if vecs else np.zeros(wv.vector_size, dtype=np.float32)
+    return float(clf.predict_proba(emb.reshape(1, -1))[0][1])
+
+
+def parity_texts(path: str | None, vocab: list[str], n: int = 300, seed: int = 0) -> list[str]:
+    if path:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            column = "text" if "text" in (reader.fieldnames or []) else "lyrics"
+            return [row[column] for row in reader if row.get(column)][:n]
+
+    rng = random.Random(seed)
+    extras = ["zzzunknown", "ไม่มีคำนี้", "x2", "[Chorus]"]
+    docs = ["", "zzzunknown"]  # empty / out-of-vocabulary only
+    for _ in range(n):
+        k = rng.randint(1, 400)
+        docs.append(" ".join(rng.choice(vocab) if rng.random() < 0.9 else rng.choice(extras) for _ in range(k)))
+    return docs
+
+
+def check_parity(eras: dict, scorer: Word2VecEraScorer, texts: list[str]) -> float:
+    cleaned = [clean_text(t) for t in texts]
+    actual = scorer.predict_proba_batch(cleaned)
+    diff = 0.0
+    for text, got in zip(cleaned, actual):
+        tokens = tokenize(text)
+        for era, (wv, clf) in eras.items():
+            diff = max(diff, abs(notebook_proba(wv, clf, tokens) - got[era]))
+    return diff
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--src", type=Path, default=SRC_DIR)
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    parser.add_argument("--dtype", choices=["float32", "float16"], default="float32")
+    parser.add_argument("--texts", help="CSV with real lyrics for the parity check.")
+    args = parser.parse_args()
+
+    eras = {}
+    for era_path in sorted(p for p in args.src.iterdir() if p.is_dir() and not p.name.startswith(".")):
+        if not ((era_path / "logreg.joblib").exists() and (era_path / "word2vec.model").exists()):
+            print(f"⚠️ Skipping {era_path.name}: missing logreg.joblib or word2vec.model")
+            continue
+        eras[era_path.name] = load_era(era_path)
+    if not eras:
+        raise SystemExit(f"No Word2Vec era models under {args.src}")
+
+    vocab, scores, present, intercepts = project(eras)
+    tmp = args.out.with_name(args.out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    save_w2v_scorer(tmp, eras=list(eras), vocab=vocab, scores=scores, present=present,
+                    intercepts=intercepts, dtype=args.dtype)
+
+    diff = check_parity(eras, Word2VecEraScorer(tmp), parity_texts(args.texts, vocab))
+    if args.dtype == "float32" and diff > PARITY_TOLERANCE:
+        shutil.rmtree(tmp)
+        raise SystemExit(f"❌ max |Δproba| = {diff:.3e} exceeds {PARITY_TOLERANCE:g}; nothing written")
+    shutil.rmtree(args.out, ignore_errors=True)
+    tmp.replace(args.out)
+    size = sum(p.stat().st_size for p in args.out.iterdir())
+    print(f"✅ {len(eras)} eras, {len(vocab):,} tokens, {size / 1e6:.1f} MB ({args.dtype}), "
+          f"max |Δproba| = {diff:.2e} → {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+"""
+Export the TF-IDF + Ridge year regressor from log_reg_training.ipynb
+(`regression_year_model/{ridge_regressor,tfidf}.joblib`) for sklearn-free
+serving by POST /predict/year, with the residual table used for its intervals.
+
+    python tools/export_year.py --model-dir ../../regression_year_model \
+        --calibration ../../script_era/datasets/val_split.csv --test ../../script_era/datasets/test_split.csv
+
+Residual quantiles come from the calibration split (never the training split,
+whose residuals are optimistic); --test reports the empirical coverage of the
+intervals on another split. The exported scorer must reproduce Ridge.predict
+before anything is written.
+"""
+
+import argparse
+import json
+import shutil
+import sys
+from pathlib import Path
+
+import joblib
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.models.linear import save_linear_model  # noqa: E402
+from app.models.year import YearRegressor, residual_table  # noqa: E402
+from app.text import clean_text  # noqa: E402
+from export_linear import parity_texts, vectorizer_config, vectorizer_idf, vectorizer_terms  # noqa: E402
+
+OUT_DIR = BACKEND_DIR / "app" / "models" / "year_ridge"
+PARITY_TOLERANCE = 1e-6  # years
+COVERAGES = (0.5, 0.8, 0.9)
+
+
+def read_split(path: Path, label_col: str | None) -> tuple[list[str], np.ndarray]:
+    df = pd.read_csv(path)
+    label_col = label_col or ("labels" if "labels" in df.columns else "year")
+    df = df.dropna(subset=[label_col])
+    if "clean_lyrics" in df.columns:
+        texts = df["clean_lyrics"].fillna("").astype(str).tolist()
+    else:
+        texts = [clean_text(t) for t in df["lyrics"].fillna("").astype(str)]
+    return texts, df[label_col].to_numpy(dtype=np.float64)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--model-dir", type=Path, required=True, help="Contains ridge_regressor.joblib + tfidf.joblib.")
+    parser.add_argument("--calibration", type=Path, required=True, help="Held-out CSV for the residual table.")
+    parser.add_argument("--test", type=Path, help="Optional CSV to report interval coverage on.")
+    parser.add_argument("--label-col", help="Year column (default: labels, else year).")
+    parser.add_argument("--bins", type=int, default=5, help="Prediction bins of the residual table.")
+    parser.add_argument("--out", type=Path, default=OUT_DIR)
+    args = parser.parse_args()
+
+    vectorizer = joblib.load(args.model_dir / "tfidf.joblib")
+    ridge = joblib.load(args.model_dir / "ridge_regressor.joblib")
+    if np.ndim(ridge.coef_) != 1:
+        raise SystemExit("Only single-target regressors can be exported")
+
+    texts, years = read_split(args.calibration, args.label_col)
+    predictions = ridge.predict(vectorizer.transform(texts))
+    table = residual_table(predictions, years, n_bins=args.bins)
+
+    tmp = args.out.with_name(args.out.name + ".tmp")
+    shutil.rmtree(tmp, ignore_errors=True)
+    tmp.mkdir(parents=True)
+    save_linear_model(
+        tmp / "linear.npz", name="year_ridge", config=vectorizer_config(vectorizer),
+        terms=vectorizer_terms(vectorizer), idf=vectorizer_idf(vectorizer), coef=ridge.coef_[None, :],
+        intercept=np.atleast_1d(ridge.intercept_), classes=np.array([], dtype=str), multi_class="regression",
+    )
+    (tmp / "residuals.json").write_text(json.dumps(table), encoding="utf-8")
+
+    regressor = YearRegressor.load(tmp)
+    check = [clean_text(t) for t in parity_texts(None, vectorizer)] + texts[:300]
+    expected = ridge.predict(vectorizer.transform(check))
+    actual = [regressor.model.scorer.predict(regressor.featurizer.transform(t)) for t in check]
+    diff = float(np.abs(expected - actual).max())
+    if diff > PARITY_TOLERANCE:
+        shutil.rmtree(tmp)
+        raise SystemExit(f"❌ max |Δyear| = {diff:.3e} exceeds {PARITY_TOLERANCE:g}; nothing written")
+    print(f"✅ parity: max |Δyear| = {diff:.2e} over {len(check)} texts")
+    print(f"Residual table: {len(table['counts'])} bins, counts {table['counts']}")
+
+    for name, path in (("calibration", args.calibration), ("test", args.test)):
+        if path is None:
+            continue
+        eval_texts, eval_years = (texts, years) if path == args.calibration else read_split(path, args.label_col)
+        preds = predictions if path == args.calibration else ridge.predict(vectorizer.transform(eval_texts))
+        mae = np.abs(eval_years - preds).mean()
+        covered = []
+        for coverage in COVERAGES:
+            lo, hi = regressor.interval(preds, coverage)
+            covered.append(f"{coverage:.0%}→{np.mean((eval_years >= lo) & (eval_years <= hi)):.1%} "
+                           f"(±{np.mean(hi - lo) / 2:.1f}y)")
+        print(f"{name}: MAE {mae:.2f}y; coverage " + ", ".join(covered))
+
+    shutil.rmtree(args.out, ignore_errors=True)
+    tmp.replace(args.out)
+    print(f"✅ {args.out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+"""
+Replay the /predict/era/ensemble cascade over a held-out split and print the
+accuracy / latency trade-off for a range of margin thresholds.
+
+    python tools/replay_cascade.py --data ../../script_era/datasets/val_split.csv
+    python tools/replay_cascade.py --data test_split.csv --limit 500 --out cascade.json
+
+Every available model (TF-IDF exports, Word2Vec export, RoBERTa checkpoint)
+scores every document once and is timed per document; the cascade is then
+simulated for each threshold from those scores. RoBERTa is timed one text at
+a time, i.e. without the server's micro-batching.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from app.cascade import replay  # noqa: E402
+from app.models import Word2VecEraScorer, load_linear_model, transform_shared  # noqa: E402
+from app.text import clean_text  # noqa: E402
+
+MODELS_DIR = BACKEND_DIR / "app" / "models"
+DEFAULT_THRESHOLDS = "0,0.02,0.05,0.1,0.15,0.2,0.3,0.5,1.01"
+
+
+def read_split(path: Path, limit: int | None) -> tuple[list[str], list[str]]:
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        reader = csv.DictReader(f)
+        fields = reader.fieldnames or []
+        text_col = next((c for c in ("clean_lyrics", "text", "lyrics") if c in fields), None)
+        label_col = next((c for c in ("song_era", "era", "label") if c in fields), None)
+        if text_col is None or label_col is None:
+            raise SystemExit(f"{path}: need a clean_lyrics/text/lyrics column and a song_era/era/label column")
+        rows = [(row[text_col], row[label_col]) for row in reader if row.get(text_col) and row.get(label_col)]
+    rows = rows[:limit] if limit else rows
+    return [clean_text(t) for t, _ in rows], [label for _, label in rows]
+
+
+def load_scorers(era_dir: Path, w2v_dir: Path, roberta_dir: Path | None) -> dict:
+    """Model name -> callable(clean_text) -> {era: P(era)}, in cascade order."""
+    exported = sorted(era_dir.glob("*/linear.npz"))
+    if not exported:
+        raise SystemExit(f"No linear.npz under {era_dir}; run tools/export_linear.py first")
+    era_models = {path.parent.name: load_linear_model(path) for path in exported}
+
+    def tfidf(text: str) -> dict[str, float]:
+        rows = transform_shared((m.featurizer for m in era_models.values()), text)
+        return {era: m.scorer.positive_proba(row) for (era, m), row in zip(era_models.items(), rows)}
+
+    scorers = {"tfidf": tfidf}
+    if (w2v_dir / "meta.json").exists():
+        w2v = Word2VecEraScorer(w2v_dir)
+        scorers["w2v"] = lambda text: w2v.predict_proba_batch([text])[0]
+    if roberta_dir is not None and roberta_dir.exists():
+        from app.models.roberta import RobertaEraEngine
+
+        engine = RobertaEraEngine.load(roberta_dir)
+        scorers["roberta"] = lambda text: engine.predict_batch([text])[0]
+    return scorers
+
+
+def score_all(scorers: dict, texts: list[str]) -> tuple[dict, dict]:
+    scores, seconds = {}, {}
+    for name, score in scorers.items():
+        score(texts[0])  # warm-up
+        out, took = [], np.empty(len(texts))
+        for i, text in enumerate(texts):
+            start = time.perf_counter()
+            out.append(score(text))
+            took[i] = time.perf_counter() - start
+        scores[name], seconds[name] = out, took
+        print(f"  {name:<8} mean {took.mean() * 1000:8.3f} ms/doc", file=sys.stderr)
+    return scores, seconds
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data", type=Path, required=True, help="Held-out CSV (e.g. script_era/datasets/val_split.csv).")
+    parser.add_argument("--limit", type=int)
+    parser.add_argument("--thresholds", default=DEFAULT_THRESHOLDS, help="Comma-separated margin thresholds.")
+    parser.add_argument("--era-dir", type=Path, default=MODELS_DIR / "logreg_binary_era")
+    parser.add_argument("--w2v-dir", type=Path, default=MODELS_DIR / "w2v_era")
+    parser.add_argument("--roberta-dir", type=Path, default=MODELS_DIR / "roberta_era")
+    parser.add_argument("--out", type=Path, help="Write the curve as JSON.")
+    args = parser.parse_args()
+
+    texts, labels = read_split(args.data, args.limit)
+    if not texts:
+        raise SystemExit(f"{args.data}: no rows")
+    scorers = load_scorers(args.era_dir, args.w2v_dir, args.roberta_dir)
+    print(f"Scoring {len(texts)} documents with {', '.join(scorers)}", file=sys.stderr)
+    scores, seconds = score_all(scorers, texts)
+
+    curve = [replay(scores, seconds, labels, float(t)) for t in args.thresholds.split(",")]
+    print(f"{'threshold':>9}  {'accuracy':>8}  {'mean ms':>8}  {'p95 ms':>8}  exit rate")
+    for point in curve:
+        exits = "  ".join(f"{m}={r:.0%}" for m, r in point["exit_rate"].items())
+        print(f"{point['threshold']:>9g}  {point['accuracy']:>8.3f}  {point['mean_ms']:>8.3f}  "
+              f"{point['p95_ms']:>8.3f}  {exits}")
+
+    if args.out:
+        report = {"data": str(args.data), "n": len(texts), "models": list(scorers), "curve": curve}
+        args.out.write_text(json.dumps(report, indent=2), encoding="utf-8")
+        print(f"wrote {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,238 @@
+import csv
+from dataclasses import MISSING, fields
+from itertools import repeat
+from pathlib import Path
+from typing import Iterable, Iterator, Sequence
+
+import numpy as np
+from numpy.dtypes import StringDType
+
+from .config import SCRAPE_DATE
+from .dataclass import ThaiMusicRecord
+
+# Same field groups ThaiMusicRecord.__post_init__ normalizes one record at a time.
+TRIM_FIELDS: tuple[str, ...] = (
+    "id", "platform", "platform_type", "url", "content_type",
+    "song_title", "artist", "language_variant",
+)
+TEXT_FIELDS: tuple[str, ...] = ("text", "raw_text")
+
+
+# Fields __post_init__ runs string ops on, besides the timestamp formatting.
+STRING_FIELDS: tuple[str, ...] = TRIM_FIELDS + ("release_year",)
+_STR_OR_NONE = frozenset({str, type(None)})
+
+
+def _field_defaults() -> dict[str, object]:
+    defaults: dict[str, object] = {}
+    for f in fields(ThaiMusicRecord):
+        if f.default is not MISSING:
+            defaults[f.name] = f.default
+        elif f.default_factory is not MISSING:
+            defaults[f.name] = f.default_factory()
+    return defaults
+
+
+def _objects(values: Sequence) -> np.ndarray:
+    return np.fromiter(values, dtype=object, count=len(values))
+
+
+def _odd_values(col: np.ndarray) -> np.ndarray:
+    """Mask of values that are neither str nor None (one C-level type scan when there are none)."""
+    values = col.tolist()
+    if set(map(type, values)) <= _STR_OR_NONE:
+        return np.zeros(len(values), dtype=bool)
+    return np.fromiter((type(v) not in _STR_OR_NONE for v in values), dtype=bool, count=len(values))
+
+
+def _read_csv_arrow(path: str | Path, names: list[str]) -> dict[str, np.ndarray] | None:
+    """`names` columns as object arrays of str, or None without pyarrow or on rows it rejects."""
+    try:
+        import pyarrow as pa
+        import pyarrow.csv as pa_csv
+    except ImportError:
+        return None
+
+    try:
+        table = pa_csv.read_csv(
+            path,
+            parse_options=pa_csv.ParseOptions(newlines_in_values=True),
+            convert_options=pa_csv.ConvertOptions(
+                column_types=dict.fromkeys(names, pa.string()), include_columns=names,
+                strings_can_be_null=False,
+            ),
+        )
+    except pa.ArrowInvalid:  # e.g. ragged rows; the csv module reads those as before
+        return None
+    return {name: table.column(name).to_numpy() for name in names}
+
+
+class ThaiMusicRecordBatch:
+    """
+    Column-wise ThaiMusicRecord collection (one NumPy object array per CSV
+    field). Produces exactly the values ThaiMusicRecord.__post_init__ would,
+    but once per column instead of once per record, so whole scraped files
+    can be loaded and validated without building per-row objects.
+
+    Columns hold the same Python str/None values a record would. Strings are
+    trimmed with `map(str.strip, ...)`, which runs in C and beats converting
+    to a NumPy StringDType first (~250 ns per value on Thai text); StringDType
+    is only used for the release_year checks. Rows holding anything but
+    str/None where a string is expected (int or datetime timestamps, numeric
+    years, ...) are rare and are normalized by ThaiMusicRecord itself.
+    """
+
+    CSV_FIELDS: tuple[str, ...] = ThaiMusicRecord.CSV_FIELDS
+
+    __slots__ = ("columns", "invalid_year")
+
+    def __init__(self, columns: dict[str, Sequence], *, normalize: bool = True) -> None:
+        lengths = {len(col) for col in columns.values()}
+        if len(lengths) > 1:
+            raise ValueError(f"Column lengths differ: {lengths}")
+        n = lengths.pop() if lengths else 0
+
+        defaults = _field_defaults()
+        self.columns: dict[str, np.ndarray] = {}
+        for name in self.CSV_FIELDS:
+            col = columns.get(name)
+            if col is None:
+                col = [defaults.get(name)] * n
+            if not isinstance(col, np.ndarray) or col.dtype != object:
+                col = _objects(col)
+            elif normalize:
+                col = col.copy()  # _normalize writes into the columns
+            self.columns[name] = col
+        self.invalid_year = np.zeros(n, dtype=bool)
+
+        if normalize:
+            self._normalize()
+
+    def __len__(self) -> int:
+        return len(self.columns["url"])
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    # ---- normalization (vectorized __post_init__) ----
+    def _normalize(self) -> None:
+        cols = self.columns
+        n = len(self)
+        had_year = np.not_equal(cols["release_year"], None)
+
+        # Rows ThaiMusicRecord has to normalize: non-str timestamps, or non-str
+        # values where string ops run. They are patched in at the end.
+        odd = np.zeros(n, dtype=bool)
+        for name in ("timestamp",) + STRING_FIELDS:
+            odd |= _odd_values(cols[name])
+        odd_rows = np.flatnonzero(odd)
+        fixed = [ThaiMusicRecord(**{name: cols[name][i] for name in self.CSV_FIELDS}) for i in odd_rows]
+        for name in ("timestamp",) + STRING_FIELDS:
+            cols[name][odd_rows] = None
+
+        # --- timestamp: str kept as-is, missing -> ""
+        ts = cols["timestamp"]
+        ts[np.equal(ts, None)] = ""
+
+        # --- release_year -> 4-digit string or None
+        year = cols["release_year"]
+        present = np.flatnonzero(np.not_equal(year, None))
+        y = np.array(list(map(str.strip, year[present].tolist())), dtype=StringDType())
+        ok = (np.strings.str_len(y) == 4) & np.strings.isdigit(y)
+        year[present[~ok]] = None
+        year[present[ok]] = _objects(y[ok].tolist())
+
+        # --- defensive trimming (only str values; None stays None)
+        for name in TRIM_FIELDS:
+            col = cols[name]
+            present = np.not_equal(col, None)
+            if present.all():
+                cols[name] = _objects(list(map(str.strip, col.tolist())))
+            else:
+                col[present] = _objects(list(map(str.strip, col[present].tolist())))
+
+        # --- `value or default` for the text fields and scrape_date
+        for name, default in [(name, "") for name in TEXT_FIELDS] + [("scrape_date", SCRAPE_DATE)]:
+            col = cols[name]
+            col[~col.astype(bool)] = default
+
+        for i, record in zip(odd_rows, fixed):
+            for name in self.CSV_FIELDS:
+                cols[name][i] = getattr(record, name)
+        self.invalid_year = had_year & np.equal(cols["release_year"], None)
+
+    # ---- constructors ----
+    @classmethod
+    def from_records(cls, records: Sequence[ThaiMusicRecord]) -> "ThaiMusicRecordBatch":
+        """Records are already normalized, so only the column transpose is paid."""
+        columns = {name: _objects([getattr(r, name) for r in records]) for name in cls.CSV_FIELDS}
+        return cls(columns, normalize=False)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[dict]) -> "ThaiMusicRecordBatch":
+        rows = list(rows)
+        columns = {
+            name: np.fromiter(map(dict.get, rows, repeat(name)), dtype=object, count=len(rows))
+            for name in cls.CSV_FIELDS
+            if rows and name in rows[0]
+        }
+        return cls(columns)
+
+    @classmethod
+    def from_csv(cls, path: str | Path, encoding: str = "utf-8-sig") -> "ThaiMusicRecordBatch":
+        """
+        Load a scraped CSV column-wise; unknown columns are ignored. Parsed by
+        pyarrow when it is installed (several times faster than the csv
+        module), else by the csv module.
+        """
+        with open(path, newline="", encoding=encoding) as f:
+            header = next(csv.reader(f), [])
+        names = [name for name in header if name in cls.CSV_FIELDS]
+
+        raw = None
+        if encoding.lower().replace("_", "-") in ("utf-8", "utf8", "utf-8-sig"):
+            raw = _read_csv_arrow(path, names)
+        if raw is None:
+            with open(path, newline="", encoding=encoding) as f:
+                reader = csv.reader(f)
+                next(reader, None)
+                width = len(header)
+                rows = list(zip(*(row if len(row) == width else (row + [""] * width)[:width] for row in reader)))
+            raw = {name: rows[i] if rows else () for i, name in enumerate(header) if name in cls.CSV_FIELDS}
+
+        columns: dict[str, np.ndarray] = {}
+        for name, values in raw.items():
+            col = _objects(values)
+            if name in ("album", "release_year", "genre", "scraper_module"):
+                col[col == ""] = None  # csv.DictWriter writes None as ""
+            columns[name] = col
+        return cls(columns)
+
+    # ---- conversions ----
+    def to_records(self) -> list[ThaiMusicRecord]:
+        return [ThaiMusicRecord(**dict(zip(self.CSV_FIELDS, values))) for values in self.iter_rows()]
+
+    def iter_rows(self) -> Iterator[tuple]:
+        """Yield CSV rows as tuples in CSV_FIELDS order."""
+        return zip(*(self.columns[name].tolist() for name in self.CSV_FIELDS))
+
+    def to_csv(self, path: str | Path, encoding: str = "utf-8") -> None:
+        with open(path, "w", newline="", encoding=encoding) as f:
+            writer = csv.writer(f)
+            writer.writerow(self.CSV_FIELDS)
+            writer.writerows(self.iter_rows())
+
+    # ---- bulk validation ----
+    def validate(self) -> dict[str, int]:
+        """Counts of rows that would be rejected or lose data during normalization."""
+        url = self.columns["url"]
+        missing = np.equal(url, None) | (url == "")
+        _, counts = np.unique(url[~missing].astype(StringDType()), return_counts=True)
+        return {
+            "rows": len(self),
+            "invalid_release_year": int(self.invalid_year.sum()),
+            "missing_release_year": int(np.equal(self.columns["release_year"], None).sum()),
+            "missing_url": int(missing.sum()),
+            "duplicate_url": int((counts[counts > 1] - 1).sum()),
+            "empty_text": int((self.columns["text"] == "").sum()),
+        }
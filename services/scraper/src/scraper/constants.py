@@ -17,4 +17,18 @@ DATETIME_FORMAT = "%Y-%m-%d %H:%M:%S"
 
 # Ensure directories exist
 for p in [OUTPUT_DIR, OUTPUT_DIR_MUSIC, OUTPUT_DIR_MUSICATM, OUTPUT_DIR_SANOOK, OUTPUT_DIR_YOUTUBE]:
-    p.mkdir(parents=True, exist_ok=True)
\ No newline at end of file
+    p.mkdir(parents=True, exist_ok=True)
+
+# Crawl politeness defaults (per host)
+CRAWL_CONCURRENCY = 8
+HOST_RATE_PER_SEC = 2.0
+HOST_BURST = 4
+BACKOFF_BASE_SEC = 1.0
+BACKOFF_MAX_SEC = 60.0
+REQUEST_TIMEOUT_SEC = 20.0
+FRONTIER_DB = Path(OUTPUT_DIR, "frontier.sqlite3")
+CRAWL_STATE_DB = Path(OUTPUT_DIR, "crawl_state.sqlite3")
+
+# Scraper instrumentation (JSON snapshots)
+METRICS_SNAPSHOT_FILE = Path(OUTPUT_DIR, "scraper_metrics.json")
+METRICS_SNAPSHOT_SEC = 30.0
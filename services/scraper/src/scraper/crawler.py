@@ -0,0 +1,371 @@
+import asyncio
+import json
+import random
+import sqlite3
+import time
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterable, Literal, TypeAlias
+from urllib.parse import urlsplit
+
+import httpx
+
+from .constants import (
+    ATTEMPT_STEP,
+    BACKOFF_BASE_SEC,
+    BACKOFF_MAX_SEC,
+    CRAWL_CONCURRENCY,
+    FRONTIER_DB,
+    HOST_BURST,
+    HOST_RATE_PER_SEC,
+    REQUEST_TIMEOUT_SEC,
+)
+from .incremental import CrawlStateStore, content_hash
+from .metrics import METRICS
+
+UrlKind: TypeAlias = Literal["letter", "artist", "song"]
+
+# Status codes worth retrying; everything else in 4xx is treated as final.
+RETRY_STATUSES: frozenset[int] = frozenset({408, 425, 429, 500, 502, 503, 504})
+
+DEFAULT_HEADERS: dict[str, str] = {
+    "User-Agent": (
+        "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/123.0 Safari/537.36"
+    ),
+}
+
+
+class TokenBucket:
+    """
+    Classic token bucket: refills `rate` tokens per second up to `capacity`.
+    Waiters queue on the lock, so a busy host is served in FIFO order.
+    """
+
+    def __init__(self, rate: float, capacity: int) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns seconds waited."""
+        started = time.monotonic()
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return now - started
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class HostRateLimiter:
+    """One TokenBucket per host; `overrides` maps host -> (rate, burst)."""
+
+    def __init__(
+        self,
+        rate: float = HOST_RATE_PER_SEC,
+        burst: int = HOST_BURST,
+        overrides: dict[str, tuple[float, int]] | None = None,
+    ) -> None:
+        self.rate = rate
+        self.burst = burst
+        self.overrides = overrides or {}
+        self._buckets: dict[str, TokenBucket] = {}
+
+    def bucket(self, host: str) -> TokenBucket:
+        if host not in self._buckets:
+            rate, burst = self.overrides.get(host, (self.rate, self.burst))
+            self._buckets[host] = TokenBucket(rate, burst)
+        return self._buckets[host]
+
+    async def acquire(self, url: str) -> float:
+        return await self.bucket(urlsplit(url).netloc).acquire()
+
+
+@dataclass(slots=True)
+class FrontierItem:
+    url: str
+    kind: UrlKind
+    payload: dict[str, Any] = field(default_factory=dict)
+    attempts: int = 0
+
+
+class Frontier:
+    """
+    Persistent crawl queue backed by SQLite.
+    Every URL is stored once (the primary key doubles as the seen-set), so a
+    crashed or interrupted crawl resumes exactly where it stopped.
+    """
+
+    def __init__(self, path: str | Path = FRONTIER_DB, max_attempts: int = 3) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_attempts = max_attempts
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS frontier (
+                url      TEXT PRIMARY KEY,
+                kind     TEXT NOT NULL,
+                payload  TEXT NOT NULL DEFAULT '{}',
+                status   TEXT NOT NULL DEFAULT 'pending',
+                attempts INTEGER NOT NULL DEFAULT 0,
+                priority INTEGER NOT NULL DEFAULT 0,
+                updated  REAL NOT NULL
+            )
+            """
+        )
+        self._db.execute("CREATE INDEX IF NOT EXISTS frontier_pending ON frontier (status, priority)")
+        # Anything in flight when the last run died goes back to the queue.
+        self._db.execute("UPDATE frontier SET status = 'pending' WHERE status = 'inflight'")
+        self._db.commit()
+
+    def add(self, url: str, kind: UrlKind, priority: int = 0, **payload: Any) -> bool:
+        """Queue `url` unless it was seen before. Returns True when newly added."""
+        cur = self._db.execute(
+            "INSERT OR IGNORE INTO frontier (url, kind, payload, priority, updated) VALUES (?, ?, ?, ?, ?)",
+            (url, kind, json.dumps(payload, ensure_ascii=False), priority, time.time()),
+        )
+        self._db.commit()
+        return cur.rowcount > 0
+
+    def claim(self) -> FrontierItem | None:
+        """Pop the highest-priority pending item and mark it in flight."""
+        row = self._db.execute(
+            "SELECT url, kind, payload, attempts FROM frontier "
+            "WHERE status = 'pending' ORDER BY priority DESC, updated LIMIT 1"
+        ).fetchone()
+        if row is None:
+            return None
+        self._db.execute(
+            "UPDATE frontier SET status = 'inflight', updated = ? WHERE url = ?", (time.time(), row[0])
+        )
+        self._db.commit()
+        return FrontierItem(url=row[0], kind=row[1], payload=json.loads(row[2]), attempts=row[3])
+
+    def done(self, url: str) -> None:
+        self.done_many([url])
+
+    def done_many(self, urls: Iterable[str]) -> None:
+        now = time.time()
+        self._db.executemany("UPDATE frontier SET status = 'done', updated = ? WHERE url = ?", ((now, u) for u in urls))
+        self._db.commit()
+
+    def fail(self, url: str) -> None:
+        """Requeue after a failure, or park it as 'failed' once attempts run out."""
+        self._db.execute(
+            "UPDATE frontier SET attempts = attempts + 1, updated = ?, "
+            "status = CASE WHEN attempts + 1 >= ? THEN 'failed' ELSE 'pending' END WHERE url = ?",
+            (time.time(), self.max_attempts, url),
+        )
+        self._db.commit()
+
+    def give_up(self, url: str) -> None:
+        """Park as 'failed' right away, for errors a retry cannot fix (404, 410, ...)."""
+        self._db.execute(
+            "UPDATE frontier SET attempts = attempts + 1, updated = ?, status = 'failed' WHERE url = ?",
+            (time.time(), url),
+        )
+        self._db.commit()
+
+    def reset(self, kinds: tuple[UrlKind, ...]) -> int:
+        """Mark items of the given kinds pending again (e.g. to start a fresh pass)."""
+        placeholders = ", ".join("?" for _ in kinds)
+        cur = self._db.execute(
+            f"UPDATE frontier SET status = 'pending', attempts = 0 WHERE kind IN ({placeholders})",
+            kinds,
+        )
+        self._db.commit()
+        return cur.rowcount
+
+    def counts(self) -> dict[str, int]:
+        return dict(self._db.execute("SELECT status, COUNT(*) FROM frontier GROUP BY status").fetchall())
+
+    def close(self) -> None:
+        self._db.close()
+
+
+Handler: TypeAlias = Callable[["AsyncCrawler", FrontierItem, httpx.Response], Awaitable[None]]
+Fingerprint: TypeAlias = Callable[[FrontierItem, httpx.Response], str]
+
+
+def body_fingerprint(item: FrontierItem, response: httpx.Response) -> str:
+    return content_hash(response.content)
+
+
+class AsyncCrawler:
+    """
+    Drains a Frontier with `concurrency` workers sharing one HTTP client.
+    Every request (including side lookups made by handlers via `fetch`) goes
+    through the per-host rate limiter, so throughput is bounded by the
+    politeness budget rather than by serial latency.
+
+    With a CrawlStateStore, items of `conditional_kinds` are fetched with
+    If-None-Match / If-Modified-Since and their handler is skipped when the
+    server answers 304 or the page fingerprint matches the previous crawl.
+
+    Items of `deferred_kinds` stay in flight after their handler returns
+    (together with their crawl-state update) until `commit()` is called with
+    their URL, typically with the urls a RecordSink checkpoint made durable.
+    Anything not committed when the process dies is fetched again on resume.
+    """
+
+    def __init__(
+        self,
+        frontier: Frontier,
+        handlers: dict[str, Handler],
+        *,
+        concurrency: int = CRAWL_CONCURRENCY,
+        limiter: HostRateLimiter | None = None,
+        max_attempts: int = ATTEMPT_STEP,
+        timeout: float = REQUEST_TIMEOUT_SEC,
+        headers: dict[str, str] | None = None,
+        state: CrawlStateStore | None = None,
+        conditional_kinds: tuple[UrlKind, ...] = ("song",),
+        fingerprint: Fingerprint = body_fingerprint,
+        deferred_kinds: tuple[UrlKind, ...] = (),
+    ) -> None:
+        self.frontier = frontier
+        self.handlers = handlers
+        self.concurrency = concurrency
+        self.limiter = limiter or HostRateLimiter()
+        self.max_attempts = max_attempts
+        self.timeout = timeout
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.state = state
+        self.conditional_kinds = conditional_kinds
+        self.fingerprint = fingerprint
+        self.deferred_kinds = deferred_kinds
+        self._uncommitted: dict[str, Callable[[], None]] = {}
+        self._durable: set[str] = set()  # committed while their handler was still running
+        self.changes: dict[str, int] = {"new": 0, "modified": 0, "unchanged": 0}
+        self.client: httpx.AsyncClient | None = None
+        self._active = 0
+
+    def enqueue(self, url: str, kind: UrlKind, priority: int = 0, **payload: Any) -> bool:
+        return self.frontier.add(url, kind, priority, **payload)
+
+    def commit(self, urls: Iterable[str]) -> int:
+        """Mark handled items of `deferred_kinds` done now that their output is durable. Returns how many."""
+        committed = []
+        for url in urls:
+            finish = self._uncommitted.pop(url, None)
+            if finish is None:
+                self._durable.add(url)
+                continue
+            finish()
+            committed.append(url)
+        if committed:
+            self.frontier.done_many(committed)
+        return len(committed)
+
+    async def fetch(self, url: str, **kwargs: Any) -> httpx.Response:
+        """GET with per-host rate limiting and exponential backoff with jitter."""
+        assert self.client is not None, "fetch() is only available while run() is active"
+        for attempt in range(self.max_attempts):
+            METRICS.observe("rate_limit_wait", await self.limiter.acquire(url))
+            start = time.perf_counter()
+            try:
+                response = await self.client.get(url, **kwargs)
+                METRICS.observe_request(url, time.perf_counter() - start, response.status_code, tier="crawl")
+                if response.status_code == 304:  # answer to a conditional request
+                    return response
+                if response.status_code in RETRY_STATUSES:
+                    raise httpx.HTTPStatusError(
+                        f"retryable status {response.status_code}", request=response.request, response=response
+                    )
+                response.raise_for_status()
+                return response
+            except httpx.HTTPStatusError as e:
+                if e.response.status_code not in RETRY_STATUSES or attempt + 1 == self.max_attempts:
+                    raise
+                delay = self._backoff(attempt, e.response.headers.get("Retry-After"))
+            except httpx.TransportError:
+                METRICS.observe_request(url, time.perf_counter() - start, "error", tier="crawl")
+                if attempt + 1 == self.max_attempts:
+                    raise
+                delay = self._backoff(attempt)
+            METRICS.record_retry(url)
+            print(f"⚠️ Retry {attempt+1}/{self.max_attempts} for {url} in {delay:.1f}s")
+            await asyncio.sleep(delay)
+        raise RuntimeError("unreachable")
+
+    @staticmethod
+    def _backoff(attempt: int, retry_after: str | None = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return min(BACKOFF_MAX_SEC, float(retry_after))
+        return min(BACKOFF_MAX_SEC, BACKOFF_BASE_SEC * 2**attempt) * random.uniform(0.5, 1.5)
+
+    async def _worker(self) -> None:
+        while True:
+            item = self.frontier.claim()
+            if item is None:
+                if self._active == 0:
+                    return
+                await asyncio.sleep(0.05)
+                continue
+
+            self._active += 1
+            try:
+                finish = await self._process(item)
+                if finish is not None and item.kind in self.deferred_kinds and item.url not in self._durable:
+                    self._uncommitted[item.url] = finish
+                else:
+                    self._durable.discard(item.url)
+                    if finish is not None:
+                        finish()
+                    self.frontier.done(item.url)
+                METRICS.incr(f"pages.{item.kind}")
+            except Exception as e:
+                print(f"❌ {item.kind} {item.url}: {e}")
+                METRICS.incr(f"failed.{item.kind}")
+                if isinstance(e, httpx.HTTPStatusError) and e.response.status_code not in RETRY_STATUSES:
+                    self.frontier.give_up(item.url)
+                else:
+                    self.frontier.fail(item.url)
+            finally:
+                self._active -= 1
+
+    async def _process(self, item: FrontierItem) -> Callable[[], None] | None:
+        """
+        Fetch `item` and run its handler. Returns what completes it once its
+        output is kept (the crawl-state update), or None when the handler was
+        skipped because the page is unchanged.
+        """
+        if self.state is None or item.kind not in self.conditional_kinds:
+            response = await self.fetch(item.url)
+            await self.handlers[item.kind](self, item, response)
+            return lambda: None
+
+        response = await self.fetch(item.url, headers=self.state.conditional_headers(item.url))
+        fingerprint = "" if response.status_code == 304 else self.fingerprint(item, response)
+        change = self.state.classify(item.url, response, fingerprint)
+        self.changes[change] += 1
+        if change == "unchanged":
+            self.state.touch(item.url, response)
+            return None
+        await self.handlers[item.kind](self, item, response)
+        return lambda: self.state.record(item.url, response, fingerprint)
+
+    async def run(self) -> dict[str, int]:
+        """Crawl until the frontier is empty. Returns the final status counts."""
+        async with httpx.AsyncClient(
+            headers=self.headers,
+            timeout=self.timeout,
+            follow_redirects=True,
+            limits=httpx.Limits(max_connections=self.concurrency * 2),
+        ) as client:
+            self.client = client
+            try:
+                await asyncio.gather(*(self._worker() for _ in range(self.concurrency)))
+            finally:
+                self.client = None
+        return self.frontier.counts()
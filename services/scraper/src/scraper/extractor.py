@@ -1,14 +1,12 @@
 
 import re
 import csv
-import random
-import time
 from pathlib import Path
 from typing import Optional
-from playwright.sync_api import sync_playwright
 from scraper.dataclass import ThaiMusicRecord
 
-from .constants import ATTEMPT_STEP
+from .fetcher import fetch_page_text
+from .metrics import METRICS
 
 def extract_year(text: str, is_heavy_search: bool = False) -> str | None:
     """
@@ -73,46 +71,13 @@ def extract_year(text: str, is_heavy_search: bool = False) -> str | None:
 
 
 def scrape_song_metadata(song_title: str, artist: str, base_query: str, ending_keyword: str="") -> dict:
-    """Scrape DuckDuckGo and extract album/year info for a Thai song."""
+    """Search for a Thai song (plain HTTP first, browser only if needed) and extract its year."""
     query_url = f"{base_query}{song_title}+{artist}+{ending_keyword}"
     print(f"🔍 Searching: {song_title}+{artist}")
 
-    with sync_playwright() as p:
-        browser = p.chromium.launch(
-            headless=True,
-            args=[
-                "--no-sandbox",
-                "--disable-setuid-sandbox",
-                "--ignore-certificate-errors",
-                "--disable-blink-features=AutomationControlled",
-                "--disable-dev-shm-usage",
-                "--disable-web-security",
-                "--disable-features=IsolateOrigins,site-per-process",
-                "--disable-features=SameSiteByDefaultCookies",
-                "--disable-extensions",
-                "--disable-background-networking",
-                "--disable-software-rasterizer",
-                "--single-process",
-            ],
-        )
-        context = browser.new_context(
-            ignore_https_errors=True,
-            java_script_enabled=True,
-            user_agent=(
-                "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/123.0 Safari/537.36"
-            ),
-        )
-        page = context.new_page()
-        for attempt in range(ATTEMPT_STEP):
-            try:
-                page.goto(query_url, timeout=60000)
-                break
-            except Exception as e:
-                print(f"⚠️ Retry {attempt+1}/{ATTEMPT_STEP} due to {e}")
-                time.sleep(random.uniform(3, 6))
-        text = page.inner_text("body")
-        browser.close()
+    text, tier = fetch_page_text(query_url)
+    if tier == "browser":
+        print(f"🌐 Browser fallback used for: {song_title}+{artist}")
 
-    return extract_year(text)
\ No newline at end of file
+    with METRICS.timer("extraction"):
+        return extract_year(text)
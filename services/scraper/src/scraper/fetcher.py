@@ -0,0 +1,187 @@
+import random
+import re
+import time
+from html.parser import HTMLParser
+from typing import Literal, TypeAlias
+
+import httpx
+
+from .constants import ATTEMPT_STEP, REQUEST_TIMEOUT_SEC
+from .metrics import METRICS
+
+FetchTier: TypeAlias = Literal["http", "browser"]
+
+USER_AGENT = (
+    "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) "
+    "AppleWebKit/537.36 (KHTML, like Gecko) "
+    "Chrome/123.0 Safari/537.36"
+)
+
+# JS-only search pages that have a static HTML twin.
+HTTP_REWRITES: dict[str, str] = {
+    "https://duckduckgo.com/?q=": "https://html.duckduckgo.com/html/?q=",
+}
+
+# Below this much visible text the plain HTTP result is treated as a shell page.
+MIN_TEXT_CHARS = 200
+
+SCRIPT_GATE_MARKERS: tuple[str, ...] = (
+    "enable javascript",
+    "javascript is disabled",
+    "javascript is required",
+    "please turn on javascript",
+    "unusual traffic",
+    "captcha",
+)
+
+# Everything the year extractor never looks at.
+BLOCKED_RESOURCE_TYPES: frozenset[str] = frozenset({"image", "font", "stylesheet", "media"})
+
+BROWSER_ARGS: list[str] = [
+    "--no-sandbox",
+    "--disable-setuid-sandbox",
+    "--ignore-certificate-errors",
+    "--disable-blink-features=AutomationControlled",
+    "--disable-dev-shm-usage",
+    "--disable-web-security",
+    "--disable-features=IsolateOrigins,site-per-process",
+    "--disable-features=SameSiteByDefaultCookies",
+    "--disable-extensions",
+    "--disable-background-networking",
+    "--disable-software-rasterizer",
+    "--single-process",
+]
+
+
+class _TextExtractor(HTMLParser):
+    """Visible-text extractor (roughly `inner_text("body")` without a browser)."""
+
+    SKIP_TAGS = frozenset({"script", "style", "noscript", "template", "head"})
+    BLOCK_TAGS = frozenset({
+        "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt",
+        "footer", "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main",
+        "nav", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul",
+    })
+
+    def __init__(self) -> None:
+        super().__init__(convert_charrefs=True)
+        self._skip_depth = 0
+        self.parts: list[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP_TAGS:
+            self._skip_depth += 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP_TAGS and self._skip_depth:
+            self._skip_depth -= 1
+        elif tag in self.BLOCK_TAGS:
+            self.parts.append("\n")
+
+    def handle_data(self, data):
+        if not self._skip_depth:
+            data = data.strip()
+            if data:
+                self.parts.append(data)
+
+
+def html_to_text(html: str) -> str:
+    parser = _TextExtractor()
+    parser.feed(html)
+    parser.close()
+    # Inline runs join with spaces, block boundaries with newlines (like inner_text).
+    text = re.sub(r"[ \t]*\n\s*", "\n", " ".join(parser.parts))
+    return text.strip()
+
+
+def looks_script_gated(text: str) -> bool:
+    """True when the static page is empty or asks for JavaScript / a challenge."""
+    if len(text) < MIN_TEXT_CHARS:
+        return True
+    lowered = text[:2000].lower()
+    return any(marker in lowered for marker in SCRIPT_GATE_MARKERS)
+
+
+_client: httpx.Client | None = None
+
+
+def _http_client() -> httpx.Client:
+    # One pooled client per process keeps TLS connections warm across lookups.
+    global _client
+    if _client is None:
+        _client = httpx.Client(
+            headers={"User-Agent": USER_AGENT, "Accept-Language": "th,en;q=0.8"},
+            timeout=REQUEST_TIMEOUT_SEC,
+            follow_redirects=True,
+        )
+    return _client
+
+
+def http_fetch_text(url: str) -> str | None:
+    """Cheap tier: plain GET + HTML parse. Returns None when the page needs a browser."""
+    for prefix, replacement in HTTP_REWRITES.items():
+        if url.startswith(prefix):
+            url = replacement + url[len(prefix):]
+            break
+    start = time.perf_counter()
+    try:
+        response = _http_client().get(url)
+    except httpx.HTTPError as e:
+        METRICS.observe_request(url, time.perf_counter() - start, "error")
+        print(f"⚠️ HTTP fetch failed for {url}: {e}")
+        return None
+    METRICS.observe_request(url, time.perf_counter() - start, response.status_code)
+    if response.status_code != 200:
+        return None
+    text = html_to_text(response.text)
+    return None if looks_script_gated(text) else text
+
+
+def browser_fetch_text(url: str) -> str:
+    """Expensive tier: headless Chromium with images/fonts/CSS/media blocked."""
+    from playwright.sync_api import sync_playwright
+
+    text = ""
+    with sync_playwright() as p:
+        with METRICS.timer("browser_launch"):
+            browser = p.chromium.launch(headless=True, args=BROWSER_ARGS)
+            context = browser.new_context(
+                ignore_https_errors=True,
+                java_script_enabled=True,
+                user_agent=USER_AGENT,
+            )
+        context.route(
+            "**/*",
+            lambda route: route.abort()
+            if route.request.resource_type in BLOCKED_RESOURCE_TYPES
+            else route.continue_(),
+        )
+        page = context.new_page()
+        for attempt in range(ATTEMPT_STEP):
+            start = time.perf_counter()
+            try:
+                response = page.goto(url, timeout=60000)
+                METRICS.observe_request(
+                    url, time.perf_counter() - start, response.status if response else "none", tier="browser"
+                )
+                break
+            except Exception as e:
+                METRICS.observe_request(url, time.perf_counter() - start, "error", tier="browser")
+                METRICS.record_retry(url)
+                print(f"⚠️ Retry {attempt+1}/{ATTEMPT_STEP} due to {e}")
+                time.sleep(random.uniform(3, 6))
+        text = page.inner_text("body")
+        browser.close()
+    return text
+
+
+def fetch_page_text(url: str) -> tuple[str, FetchTier]:
+    """Try the HTTP tier first and only escalate to the browser when it comes back empty or gated."""
+    text = http_fetch_text(url)
+    if text is not None:
+        METRICS.incr("fetch_tier.http")
+        return text, "http"
+    METRICS.incr("fetch_tier.browser")
+    return browser_fetch_text(url), "browser"
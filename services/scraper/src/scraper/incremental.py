@@ -0,0 +1,143 @@
+import hashlib
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Literal, TypeAlias
+
+import httpx
+
+from .constants import CRAWL_STATE_DB
+
+PageChange: TypeAlias = Literal["new", "modified", "unchanged"]
+
+
+def content_hash(content: str | bytes) -> str:
+    if isinstance(content, str):
+        content = content.encode("utf-8")
+    return hashlib.sha256(content).hexdigest()
+
+
+@dataclass(slots=True)
+class PageState:
+    url: str
+    etag: str | None
+    last_modified: str | None
+    content_hash: str | None
+    release_year: str | None
+    checked_at: float
+    changed_at: float
+
+
+class CrawlStateStore:
+    """
+    Per-URL validators from the last crawl (ETag, Last-Modified, content hash).
+    Lets refresh runs send conditional requests and skip parsing + year lookup
+    for song pages that did not change since the previous crawl.
+    """
+
+    def __init__(self, path: str | Path = CRAWL_STATE_DB) -> None:
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(self.path)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.execute(
+            """
+            CREATE TABLE IF NOT EXISTS page_state (
+                url           TEXT PRIMARY KEY,
+                etag          TEXT,
+                last_modified TEXT,
+                content_hash  TEXT,
+                release_year  TEXT,
+                checked_at    REAL NOT NULL,
+                changed_at    REAL NOT NULL
+            )
+            """
+        )
+        self._db.commit()
+        self._years: dict[str, str] = {}  # looked up for pages whose record() has not run yet
+
+    def get(self, url: str) -> PageState | None:
+        row = self._db.execute(
+            "SELECT url, etag, last_modified, content_hash, release_year, checked_at, changed_at "
+            "FROM page_state WHERE url = ?",
+            (url,),
+        ).fetchone()
+        return PageState(*row) if row else None
+
+    def conditional_headers(self, url: str) -> dict[str, str]:
+        state = self.get(url)
+        headers: dict[str, str] = {}
+        if state is not None:
+            if state.etag:
+                headers["If-None-Match"] = state.etag
+            if state.last_modified:
+                headers["If-Modified-Since"] = state.last_modified
+        return headers
+
+    def classify(self, url: str, response: httpx.Response, fingerprint: str) -> PageChange:
+        """304 or an identical content hash means the page is unchanged."""
+        state = self.get(url)
+        if state is None:
+            return "new"
+        if response.status_code == 304 or state.content_hash == fingerprint:
+            return "unchanged"
+        return "modified"
+
+    def touch(self, url: str, response: httpx.Response | None = None) -> None:
+        """Record a check that found no change (refreshing validators the server sent)."""
+        now = time.time()
+        etag = response.headers.get("ETag") if response is not None else None
+        last_modified = response.headers.get("Last-Modified") if response is not None else None
+        self._db.execute(
+            "UPDATE page_state SET checked_at = ?, "
+            "etag = COALESCE(?, etag), last_modified = COALESCE(?, last_modified) WHERE url = ?",
+            (now, etag, last_modified, url),
+        )
+        self._db.commit()
+
+    def record(self, url: str, response: httpx.Response, fingerprint: str) -> None:
+        """Store validators, hash and any year from `remember_year` after a page was (re)processed."""
+        now = time.time()
+        self._db.execute(
+            """
+            INSERT INTO page_state (url, etag, last_modified, content_hash, release_year, checked_at, changed_at)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+            ON CONFLICT(url) DO UPDATE SET
+                etag = excluded.etag,
+                last_modified = excluded.last_modified,
+                content_hash = excluded.content_hash,
+                release_year = COALESCE(excluded.release_year, release_year),
+                checked_at = excluded.checked_at,
+                changed_at = excluded.changed_at
+            """,
+            (
+                url,
+                response.headers.get("ETag"),
+                response.headers.get("Last-Modified"),
+                fingerprint,
+                self._years.pop(url, None),
+                now,
+                now,
+            ),
+        )
+        self._db.commit()
+
+    def remember_year(self, url: str, release_year: str | int | None) -> None:
+        """
+        Cache the looked-up year so modified pages can skip the search too.
+        It is written by `record()`, so a page whose processing never
+        completes gets no page_state row and is still "new" on the next run.
+        """
+        if release_year is not None:
+            self._years[url] = str(release_year)
+
+    def known_year(self, url: str) -> str | None:
+        if url in self._years:
+            return self._years[url]
+        state = self.get(url)
+        return state.release_year if state else None
+
+    def close(self) -> None:
+        self._db.close()
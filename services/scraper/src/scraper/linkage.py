@@ -0,0 +1,236 @@
+import csv
+import hashlib
+import math
+import re
+import unicodedata
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Iterable, Sequence
+
+from .batch import ThaiMusicRecordBatch
+from .dataclass import ThaiMusicRecord
+
+_THAI_DIGITS = str.maketrans("๐๑๒๓๔๕๖๗๘๙", "0123456789")
+_ZERO_WIDTH = re.compile(r"[\u200b-\u200d\u2060\ufeff]")
+_BRACKETED = re.compile(r"\(.*?\)|\[.*?\]|【.*?】|「.*?」")
+_TITLE_NOISE = re.compile(
+    r"official\s*(music\s*)?(video|mv|audio)|lyrics?\s*video|music\s*video|\bmv\b|\bm/v\b"
+    r"|\baudio\b|\blyrics?\b|เนื้อเพลง|คอร์ดเพลง|คาราโอเกะ|karaoke",
+)
+_FEAT = re.compile(r"\s(feat\.?|ft\.?|featuring)\s.*$")
+_ARTIST_SPLIT = re.compile(r"\s*(?:,|&|\+|\bx\b|\band\b|และ|/)\s*")
+# Keep word characters plus the whole Thai block (vowel signs and tone marks are not \w).
+_NON_KEY = re.compile(r"[^\w\u0e00-\u0e7f]+")
+
+
+def normalize_title(title: str) -> str:
+    t = unicodedata.normalize("NFC", title or "").lower().translate(_THAI_DIGITS)
+    t = _ZERO_WIDTH.sub("", t)
+    t = _BRACKETED.sub(" ", t)
+    t = _FEAT.sub("", t)
+    t = _TITLE_NOISE.sub(" ", t)
+    return _NON_KEY.sub("", t)
+
+
+def normalize_artist(artist: str) -> str:
+    """Primary artist only: 'A feat. B', 'A x B' and 'A, B' all key on A."""
+    a = unicodedata.normalize("NFC", artist or "").lower().translate(_THAI_DIGITS)
+    a = _ZERO_WIDTH.sub("", a)
+    a = _BRACKETED.sub(" ", a)
+    a = _FEAT.sub("", a)
+    a = _ARTIST_SPLIT.split(a.strip(), maxsplit=1)[0]
+    return _NON_KEY.sub("", a)
+
+
+def char_ngrams(key: str, n: int = 3) -> frozenset[str]:
+    if len(key) <= n:
+        return frozenset({key}) if key else frozenset()
+    return frozenset(key[i:i + n] for i in range(len(key) - n + 1))
+
+
+def jaccard(a: frozenset[str], b: frozenset[str]) -> float:
+    if not a or not b:
+        return 0.0
+    inter = len(a & b)
+    return inter / (len(a) + len(b) - inter)
+
+
+class _UnionFind:
+    __slots__ = ("parent",)
+
+    def __init__(self, n: int) -> None:
+        self.parent = list(range(n))
+
+    def find(self, x: int) -> int:
+        parent = self.parent
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    def union(self, a: int, b: int) -> None:
+        ra, rb = self.find(a), self.find(b)
+        if ra != rb:
+            self.parent[max(ra, rb)] = min(ra, rb)
+
+
+@dataclass(slots=True, kw_only=True)
+class CanonicalSong:
+    """One real-world song merged from records on any SUPPORTED_PLATFORMS entry."""
+
+    song_id: str
+    song_title: str
+    artist: str
+    release_year: str | None
+    platforms: tuple[str, ...]
+    record_ids: tuple[str, ...]
+    year_votes: dict[str, int] = field(default_factory=dict)
+
+
+@dataclass(slots=True)
+class LinkageResult:
+    songs: list[CanonicalSong]
+    assignment: list[int]  # record index -> index into `songs`
+    candidate_pairs: int
+    skipped_ngrams: int = 0  # title n-grams too common to block on (see link_records max_block)
+
+
+def _best_year(years: Iterable[str | None]) -> tuple[str | None, dict[str, int]]:
+    """Most frequent 4-digit year; ties go to the earliest (original release over re-issues)."""
+    votes = Counter(y for y in years if y and len(y) == 4 and y.isdigit())
+    if not votes:
+        return None, {}
+    best = min(votes.items(), key=lambda kv: (-kv[1], kv[0]))[0]
+    return best, dict(votes)
+
+
+def _most_common_shortest(values: Iterable[str]) -> str:
+    """Most frequent display value; ties prefer the shortest (no "(Official MV)" suffix)."""
+    counts = Counter(v for v in values if v)
+    if not counts:
+        return ""
+    return min(counts.items(), key=lambda kv: (-kv[1], len(kv[0]), kv[0]))[0]
+
+
+def link_records(
+    records: Sequence[ThaiMusicRecord],
+    *,
+    title_threshold: float = 0.8,
+    artist_threshold: float = 0.6,
+    ngram: int = 3,
+    max_block: int = 1000,
+) -> LinkageResult:
+    """
+    Merge duplicate songs across platforms.
+
+    Blocking has two layers so the full all-pairs comparison never happens:
+    1. exact (normalized title, primary artist) key buckets are merged outright;
+    2. fuzzy candidates come from a title n-gram index with prefix filtering:
+       each key indexes only its rarest `|g| - ceil(t*|g|) + 1` n-grams, which
+       is guaranteed to surface every pair with title Jaccard >= t.
+    Candidates are then verified on title and artist n-gram Jaccard.
+
+    N-grams shared by more than `max_block` title keys ("รัก", "love", ...)
+    are not blocked on, which keeps candidate pairs near-linear in the number
+    of keys. A title made only of such n-grams then merges only on its exact
+    key (layer 1); pairs linked through a rarer n-gram are still found.
+    """
+    n = len(records)
+    titles = [normalize_title(r.song_title) for r in records]
+    artists = [normalize_artist(r.artist) for r in records]
+    uf = _UnionFind(n)
+
+    # ---- layer 1: exact key buckets (also collapses work for layer 2)
+    key_first: dict[tuple[str, str], int] = {}
+    reps: list[int] = []
+    for i, key in enumerate(zip(titles, artists)):
+        if not key[0]:
+            reps.append(i)  # untitled records never merge on the key
+            continue
+        first = key_first.setdefault(key, i)
+        if first == i:
+            reps.append(i)
+        else:
+            uf.union(first, i)
+
+    # ---- layer 2: prefix-filtered n-gram blocking over one representative per key
+    title_grams = {i: char_ngrams(titles[i], ngram) for i in reps if titles[i]}
+    artist_grams: dict[int, frozenset[str]] = {}
+    df = Counter(g for grams in title_grams.values() for g in grams)
+    common = {g for g, count in df.items() if count > max_block}
+
+    index: dict[str, list[int]] = defaultdict(list)
+    candidate_pairs = 0
+    for i in sorted(title_grams, key=lambda k: len(title_grams[k])):
+        grams = sorted(title_grams[i], key=lambda g: (df[g], g))
+        prefix = len(grams) - math.ceil(title_threshold * len(grams)) + 1
+        seen: set[int] = set()
+        for g in grams[:prefix]:
+            if g in common:
+                continue
+            for j in index[g]:
+                if j in seen:
+                    continue
+                seen.add(j)
+                # length filter: Jaccard >= t needs |small| >= t * |large|
+                if len(title_grams[j]) < title_threshold * len(title_grams[i]):
+                    continue
+                candidate_pairs += 1
+                if jaccard(title_grams[i], title_grams[j]) < title_threshold:
+                    continue
+                if artists[i] != artists[j]:
+                    a_i = artist_grams.get(i) or artist_grams.setdefault(i, char_ngrams(artists[i], ngram))
+                    a_j = artist_grams.get(j) or artist_grams.setdefault(j, char_ngrams(artists[j], ngram))
+                    if jaccard(a_i, a_j) < artist_threshold:
+                        continue
+                uf.union(i, j)
+            index[g].append(i)
+
+    # ---- collapse clusters into canonical songs
+    clusters: dict[int, list[int]] = defaultdict(list)
+    for i in range(n):
+        clusters[uf.find(i)].append(i)
+
+    songs: list[CanonicalSong] = []
+    assignment = [0] * n
+    for root in sorted(clusters):
+        members = clusters[root]
+        title = _most_common_shortest(records[i].song_title for i in members)
+        artist = _most_common_shortest(records[i].artist for i in members)
+        year, votes = _best_year(records[i].release_year for i in members)
+        key = f"{titles[root]}|{artists[root]}" if titles[root] else records[root].url or str(root)
+        song = CanonicalSong(
+            song_id=hashlib.sha1(key.encode("utf-8")).hexdigest()[:16],
+            song_title=title,
+            artist=artist,
+            release_year=year,
+            platforms=tuple(sorted({records[i].platform for i in members})),
+            record_ids=tuple(records[i].id or records[i].url for i in members),
+            year_votes=votes,
+        )
+        for i in members:
+            assignment[i] = len(songs)
+        songs.append(song)
+
+    return LinkageResult(songs=songs, assignment=assignment, candidate_pairs=candidate_pairs,
+                         skipped_ngrams=len(common))
+
+
+def write_canonical(result: LinkageResult, path: str | Path, encoding: str = "utf-8") -> None:
+    """One row per canonical song; record ids are `|`-joined."""
+    with open(path, "w", newline="", encoding=encoding) as f:
+        writer = csv.writer(f)
+        writer.writerow(["song_id", "song_title", "artist", "release_year", "platforms", "record_ids"])
+        for s in result.songs:
+            writer.writerow(
+                [s.song_id, s.song_title, s.artist, s.release_year or "", "|".join(s.platforms), "|".join(s.record_ids)]
+            )
+
+
+def link_csv_files(paths: Iterable[str | Path], **kwargs) -> LinkageResult:
+    """Load scraped CSVs (any mix of platforms) and link them in one pass."""
+    records: list[ThaiMusicRecord] = []
+    for path in paths:
+        records.extend(ThaiMusicRecordBatch.from_csv(path).to_records())
+    return link_records(records, **kwargs)
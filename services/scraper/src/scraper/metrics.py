@@ -0,0 +1,209 @@
+import bisect
+import json
+import os
+import threading
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Iterator
+from urllib.parse import urlsplit
+
+from .constants import METRICS_SNAPSHOT_FILE, METRICS_SNAPSHOT_SEC
+
+# Upper bounds (seconds); the last bucket is open-ended.
+LATENCY_BUCKETS_SEC: tuple[float, ...] = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def domain_of(url: str) -> str:
+    return urlsplit(url).hostname or "unknown"
+
+
+class Histogram:
+    """Fixed-bucket latency histogram (not locked; ScraperMetrics holds the lock)."""
+
+    __slots__ = ("counts", "count", "total", "max")
+
+    def __init__(self) -> None:
+        self.counts = [0] * (len(LATENCY_BUCKETS_SEC) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def observe(self, seconds: float) -> None:
+        self.counts[bisect.bisect_left(LATENCY_BUCKETS_SEC, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    def quantile(self, q: float) -> float | None:
+        """Upper bound of the bucket holding the q-th observation."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, n in zip(LATENCY_BUCKETS_SEC, self.counts):
+            seen += n
+            if seen >= rank:
+                return bound
+        return self.max
+
+    def to_dict(self) -> dict:
+        return {
+            "count": self.count,
+            "mean": round(self.total / self.count, 4) if self.count else None,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": round(self.max, 4),
+            "buckets": {
+                **{f"le_{b:g}": n for b, n in zip(LATENCY_BUCKETS_SEC, self.counts)},
+                "le_inf": self.counts[-1],
+            },
+        }
+
+
+class ScraperMetrics:
+    """
+    Process-wide scraper counters and latency histograms.
+    - requests: per-domain latency, split by fetch tier ("http", "browser", "crawl")
+    - retries: per-domain count of retried attempts (ATTEMPT_STEP loops, backoff)
+    - timers: browser_launch, extraction, rate_limit_wait, ...
+    - songs: completed songs, reported as songs/minute overall and since the last written snapshot
+    Thread-safe; the crawler (asyncio), the sync fetcher and the exporter thread share it.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.requests: dict[tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+        self.retries: Counter = Counter()
+        self.timers: dict[str, Histogram] = defaultdict(Histogram)
+        self.counters: Counter = Counter()
+        self.songs = 0
+        self._last_songs = 0
+        self._last_snapshot = time.monotonic()
+        self._stop = threading.Event()
+        self._threads: list[threading.Thread] = []
+        self._server: ThreadingHTTPServer | None = None
+
+    # ---- recording ----
+    def observe_request(self, url: str, seconds: float, status: int | str, tier: str = "http") -> None:
+        domain = domain_of(url)
+        with self._lock:
+            self.requests[(domain, tier)].observe(seconds)
+            self.statuses[domain][str(status)] += 1
+
+    def record_retry(self, url: str) -> None:
+        with self._lock:
+            self.retries[domain_of(url)] += 1
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.timers[name].observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def incr(self, name: str, n: int = 1) -> None:
+        with self._lock:
+            self.counters[name] += n
+
+    def song_done(self, n: int = 1) -> None:
+        with self._lock:
+            self.songs += n
+
+    # ---- export ----
+    def snapshot(self, advance_window: bool = False) -> dict:
+        """
+        Current metrics. The `songs_per_min_recent` window runs from the last
+        snapshot taken with `advance_window` (write_snapshot), so HTTP polls
+        read it without shortening it.
+        """
+        now = time.monotonic()
+        with self._lock:
+            elapsed_min = max(time.time() - self.started, 1e-9) / 60
+            window_min = max(now - self._last_snapshot, 1e-9) / 60
+            snap = {
+                "timestamp": time.time(),
+                "uptime_sec": round(elapsed_min * 60, 1),
+                "songs": self.songs,
+                "songs_per_min": round(self.songs / elapsed_min, 2),
+                "songs_per_min_recent": round((self.songs - self._last_songs) / window_min, 2),
+                "requests": {
+                    f"{domain}|{tier}": hist.to_dict() for (domain, tier), hist in sorted(self.requests.items())
+                },
+                "statuses": {domain: dict(c) for domain, c in sorted(self.statuses.items())},
+                "retries": dict(self.retries),
+                "timers": {name: hist.to_dict() for name, hist in sorted(self.timers.items())},
+                "counters": dict(self.counters),
+            }
+            if advance_window:
+                self._last_songs = self.songs
+                self._last_snapshot = now
+        return snap
+
+    def write_snapshot(self, path: str | Path = METRICS_SNAPSHOT_FILE) -> dict:
+        """Atomically replace `path` with the current snapshot."""
+        path = Path(path)
+        snap = self.snapshot(advance_window=True)
+        tmp = path.with_suffix(path.suffix + ".tmp")
+        tmp.write_text(json.dumps(snap, ensure_ascii=False, indent=2), encoding="utf-8")
+        os.replace(tmp, path)
+        return snap
+
+    def start_snapshots(self, path: str | Path = METRICS_SNAPSHOT_FILE, interval: float = METRICS_SNAPSHOT_SEC) -> None:
+        """Write a JSON snapshot every `interval` seconds from a daemon thread."""
+
+        def loop() -> None:
+            while not self._stop.wait(interval):
+                self.write_snapshot(path)
+            self.write_snapshot(path)  # final state on stop()
+
+        self._stop.clear()  # allow restarting after stop()
+        thread = threading.Thread(target=loop, name="scraper-metrics-snapshots", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+
+    def serve(self, port: int, host: str = "127.0.0.1") -> None:
+        """Expose the live snapshot as JSON on http://host:port/metrics."""
+        metrics = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path.rstrip("/") != "/metrics":
+                    self.send_error(404)
+                    return
+                body = json.dumps(metrics.snapshot(), ensure_ascii=False).encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json; charset=utf-8")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        thread = threading.Thread(target=self._server.serve_forever, name="scraper-metrics-http", daemon=True)
+        thread.start()
+        self._threads.append(thread)
+        print(f"📈 Metrics endpoint: http://{host}:{port}/metrics")
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._server is not None:
+            self._server.shutdown()
+            self._server = None
+        for thread in self._threads:
+            thread.join(timeout=5)
+        self._threads.clear()
+
+
+METRICS = ScraperMetrics()
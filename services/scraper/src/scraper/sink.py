@@ -0,0 +1,324 @@
+import csv
+import json
+import os
+import re
+from pathlib import Path
+from typing import Iterable, Iterator, Literal, TypeAlias
+
+from .dataclass import ThaiMusicRecord
+
+SinkFormat: TypeAlias = Literal["csv", "jsonl", "parquet"]
+
+SEGMENT_EXT: dict[str, str] = {"csv": ".csv", "jsonl": ".jsonl", "parquet": ".parquet"}
+
+
+def _fsync_dir(path: Path) -> None:
+    # Directory fsync makes new segment names durable (no-op where unsupported).
+    try:
+        fd = os.open(path, os.O_RDONLY)
+    except OSError:
+        return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+class RecordSink:
+    """
+    Append-only writer for ThaiMusicRecord.
+    Records are buffered and appended in batches to rotating segment files
+    (`<prefix>-00000.csv`, ...), so each flush costs O(batch) instead of
+    rewriting the whole dataset. `checkpoint()` fsyncs what has been written;
+    `compact()` merges all segments into a single file at the end of a run.
+
+    Rows are only durable after `checkpoint()`/`close()`. With `durable_key`
+    (e.g. "url") both return that column of the rows they made durable, so a
+    caller can commit its own progress (the crawl frontier) no earlier.
+    """
+
+    def __init__(
+        self,
+        directory: str | Path,
+        fmt: SinkFormat = "csv",
+        *,
+        batch_size: int = 500,
+        segment_rows: int = 50_000,
+        prefix: str = "part",
+        durable_key: str | None = None,
+    ) -> None:
+        if fmt not in SEGMENT_EXT:
+            raise ValueError(f"Unsupported sink format: {fmt}")
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.fmt = fmt
+        self.batch_size = batch_size
+        self.segment_rows = segment_rows
+        self.prefix = prefix
+        self.durable_key = durable_key
+        self.fields = ThaiMusicRecord.get_fields()
+
+        self._buffer: list[dict] = []
+        self._file = None
+        self._writer = None
+        self._segment_index = self._next_segment_index()  # never reopen a previous run's segment
+        self._segment_rows = 0
+        self._unsynced: list = []  # durable_key values written since the last checkpoint
+        self.rows_written = 0
+
+    # ---- segments ----
+    def segments(self) -> list[Path]:
+        return sorted(self.directory.glob(f"{self.prefix}-*{SEGMENT_EXT[self.fmt]}"))
+
+    def _next_segment_index(self) -> int:
+        pattern = re.compile(rf"{re.escape(self.prefix)}-(\d+){re.escape(SEGMENT_EXT[self.fmt])}")
+        numbers = [int(m.group(1)) for seg in self.segments() if (m := pattern.fullmatch(seg.name))]
+        return max(numbers, default=-1) + 1
+
+    def _open_segment(self) -> None:
+        path = self.directory / f"{self.prefix}-{self._segment_index:05d}{SEGMENT_EXT[self.fmt]}"
+        self._segment_index += 1
+        self._segment_rows = 0
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            schema = pa.schema([(name, pa.string()) for name in self.fields])
+            self._writer = pq.ParquetWriter(path, schema)
+            self._file = None
+        else:
+            self._file = open(path, "a", newline="", encoding="utf-8")
+            if self.fmt == "csv":
+                self._writer = csv.DictWriter(self._file, fieldnames=self.fields)
+                self._writer.writeheader()
+        _fsync_dir(self.directory)
+
+    def _close_segment(self, sync: bool = True) -> None:
+        if self.fmt == "parquet":
+            if self._writer is not None:
+                self._writer.close()
+        elif self._file is not None:
+            self._file.flush()
+            if sync:
+                os.fsync(self._file.fileno())
+            self._file.close()
+        self._file = None
+        self._writer = None
+
+    # ---- writing ----
+    def write(self, record: ThaiMusicRecord | dict) -> None:
+        row = record.to_dict() if isinstance(record, ThaiMusicRecord) else record
+        self._buffer.append(row)
+        if self.durable_key is not None:
+            self._unsynced.append(row.get(self.durable_key))
+        if len(self._buffer) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records: Iterable[ThaiMusicRecord | dict]) -> None:
+        for record in records:
+            self.write(record)
+
+    def flush(self) -> None:
+        """Append the buffered batch to the current segment, rotating when it is full."""
+        while self._buffer:
+            if self._writer is None and self._file is None:
+                self._open_segment()
+            room = self.segment_rows - self._segment_rows
+            batch, self._buffer = self._buffer[:room], self._buffer[room:]
+            self._append(batch)
+            self._segment_rows += len(batch)
+            self.rows_written += len(batch)
+            if self._segment_rows >= self.segment_rows:
+                self._close_segment()
+
+    def _append(self, batch: list[dict]) -> None:
+        if self.fmt == "csv":
+            self._writer.writerows({k: row.get(k, "") for k in self.fields} for row in batch)
+        elif self.fmt == "jsonl":
+            self._file.writelines(
+                json.dumps({k: row.get(k) for k in self.fields}, ensure_ascii=False) + "\n" for row in batch
+            )
+        else:
+            import pyarrow as pa
+
+            columns = {
+                k: [None if row.get(k) is None else str(row.get(k)) for row in batch] for k in self.fields
+            }
+            self._writer.write_table(pa.table(columns, schema=self._writer.schema))
+
+    def _take_durable(self) -> list:
+        durable, self._unsynced = self._unsynced, []
+        return durable
+
+    def checkpoint(self) -> list:
+        """Flush and make everything written so far durable. Returns the `durable_key` values of those rows."""
+        self.flush()
+        if self.fmt == "parquet":
+            # A Parquet file is only readable once its footer is written.
+            self._close_segment()
+        elif self._file is not None:
+            self._file.flush()
+            os.fsync(self._file.fileno())
+        return self._take_durable()
+
+    def close(self) -> list:
+        """Flush, fsync and close the current segment; returns like `checkpoint()`."""
+        self.flush()
+        self._close_segment()
+        return self._take_durable()
+
+    def __enter__(self) -> "RecordSink":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    # ---- compaction ----
+    def _iter_segment_rows(self, seg: Path, key: str | None) -> Iterator[tuple[str | None, object]]:
+        """Yield (key value, raw row) for a CSV/JSONL segment, skipping a torn last line."""
+        if self.fmt == "csv":
+            with open(seg, "rb") as f:
+                torn = False
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    torn = f.read(1) != b"\n"
+            with open(seg, newline="", encoding="utf-8") as f:
+                reader = csv.reader(f)
+                header = next(reader, None) or self.fields
+                idx = header.index(key) if key in header else None
+                # Hold each row back one step: the last one is torn when the file does not end
+                # in a newline, even if a cut inside a quoted field left it the right width.
+                pending = None
+                for row in reader:
+                    if pending is not None and len(pending) == len(header):
+                        yield (pending[idx] if idx is not None else None), pending
+                    pending = row
+                if pending is not None and len(pending) == len(header) and not torn:
+                    yield (pending[idx] if idx is not None else None), pending
+        else:
+            with open(seg, encoding="utf-8") as f:
+                for line in f:
+                    if not line.endswith("\n"):
+                        continue
+                    yield (json.loads(line).get(key) if key else None), line
+
+    def compact(
+        self,
+        dest: str | Path,
+        *,
+        remove_segments: bool = False,
+        encoding: str = "utf-8",
+        dedupe_key: str | None = None,
+    ) -> int:
+        """
+        Stream every segment into one `dest` file (same format as the sink).
+        With `dedupe_key` (e.g. "url") only the last row per key is kept, so
+        refreshed records written by a later crawl replace the earlier ones.
+        Returns the number of rows written.
+        """
+        self.close()
+        dest = Path(dest)
+        dest.parent.mkdir(parents=True, exist_ok=True)
+        segments = self.segments()
+        rows = 0
+
+        if self.fmt == "parquet":
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+
+            keep_masks: list = [None] * len(segments)
+            if dedupe_key:
+                keys = [pq.read_table(seg, columns=[dedupe_key]).column(dedupe_key).to_pylist() for seg in segments]
+                last = {k: (i, j) for i, seg_keys in enumerate(keys) for j, k in enumerate(seg_keys) if k}
+                keep_masks = [
+                    pa.array([not k or last[k] == (i, j) for j, k in enumerate(seg_keys)])
+                    for i, seg_keys in enumerate(keys)
+                ]
+            writer = None
+            for seg, mask in zip(segments, keep_masks):
+                table = pq.read_table(seg)
+                if mask is not None:
+                    table = table.filter(mask)
+                writer = writer or pq.ParquetWriter(dest, table.schema)
+                writer.write_table(table)
+                rows += table.num_rows
+            if writer is not None:
+                writer.close()
+        else:
+            last: dict[str, int] = {}
+            if dedupe_key:
+                position = 0
+                for seg in segments:
+                    for key, _ in self._iter_segment_rows(seg, dedupe_key):
+                        if key:
+                            last[key] = position
+                        position += 1
+
+            with open(dest, "w", newline="", encoding=encoding) as out:
+                writer = csv.writer(out) if self.fmt == "csv" else None
+                if writer is not None:
+                    writer.writerow(self.fields)
+                position = 0
+                for seg in segments:
+                    for key, row in self._iter_segment_rows(seg, dedupe_key):
+                        if not dedupe_key or not key or last[key] == position:
+                            if writer is not None:
+                                writer.writerow(row)
+                            else:
+                                out.write(row)
+                            rows += 1
+                        position += 1
+                out.flush()
+                os.fsync(out.fileno())
+
+        if remove_segments:
+            for seg in segments:
+                seg.unlink()
+        return rows
+
+
+def _segment_format(path: Path) -> SinkFormat:
+    for fmt, ext in SEGMENT_EXT.items():
+        if path.suffix == ext:
+            return fmt
+    raise ValueError(f"Cannot infer sink format from {path}")
+
+
+def iter_column(path: str | Path, column: str = "url") -> Iterator[str]:
+    """
+    Yield a single column from a segment directory or file without building
+    full records (used to rebuild `seen_urls` on resume).
+    """
+    path = Path(path)
+    files = sorted(p for p in path.iterdir() if p.suffix in SEGMENT_EXT.values()) if path.is_dir() else [path]
+
+    for file in files:
+        fmt = _segment_format(file)
+        if fmt == "parquet":
+            import pyarrow.parquet as pq
+
+            yield from (v for v in pq.read_table(file, columns=[column]).column(column).to_pylist() if v)
+        elif fmt == "csv":
+            with open(file, newline="", encoding="utf-8-sig") as f:
+                reader = csv.reader(f)
+                header = next(reader, None)
+                if not header or column not in header:
+                    continue
+                idx = header.index(column)
+                yield from (row[idx] for row in reader if len(row) > idx and row[idx])
+        else:
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        value = json.loads(line).get(column)
+                    except json.JSONDecodeError:
+                        continue  # torn last line
+                    if value:
+                        yield value
+
+
+def load_seen_urls(path: str | Path) -> set[str]:
+    path = Path(path)
+    return set(iter_column(path, "url")) if path.exists() else set()
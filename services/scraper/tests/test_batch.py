@@ -0,0 +1,94 @@
+"""ThaiMusicRecordBatch must produce exactly what ThaiMusicRecord.__post_init__ produces."""
+
+import csv
+import random
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from scraper import batch
+from scraper.batch import ThaiMusicRecordBatch
+from scraper.dataclass import ThaiMusicRecord
+
+FIELDS = ThaiMusicRecord.CSV_FIELDS
+STRINGS = ["", " ", "  ab ", "เพลง ไทย ", "x", "\tq\n", "　y\x1c", "๒๕๖๗"]
+TIMESTAMPS = [None, "", "2020-01-01 00:00:00", 0, 1_700_000_000, True, False, datetime(2020, 5, 1, 3, 4, 5), 3.5]
+YEARS = [None, "", "1999", " 2001 ", "99", "๒๕๖๗", "abcd", 1999, 99, True, 1999.0]
+ODD = [0, 7, False, True, 1.5]
+
+
+def fuzz_rows(n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+
+    def value(name: str):
+        if name == "timestamp":
+            return rng.choice(TIMESTAMPS)
+        if name == "release_year":
+            return rng.choice(YEARS)
+        r = rng.random()
+        return None if r < 0.1 else rng.choice(ODD) if r < 0.13 else rng.choice(STRINGS)
+
+    return [{name: value(name) for name in FIELDS} for _ in range(n)]
+
+
+def assert_same(batch_rows: list[tuple], records: list[ThaiMusicRecord]) -> None:
+    for got, record in zip(batch_rows, records, strict=True):
+        want = tuple(record.to_dict().values())
+        assert got == want
+        assert [type(v) for v in got] == [type(v) for v in want]
+
+
+def test_from_rows_matches_records():
+    rows = fuzz_rows(5000)
+    records = [ThaiMusicRecord(**row) for row in rows]
+    b = ThaiMusicRecordBatch.from_rows(rows)
+
+    assert_same(list(b.iter_rows()), records)
+    expected_invalid = [row["release_year"] is not None and r.release_year is None for row, r in zip(rows, records)]
+    np.testing.assert_array_equal(b.invalid_year, expected_invalid)
+
+
+def test_from_records_round_trips():
+    records = [ThaiMusicRecord(**row) for row in fuzz_rows(500, seed=1)]
+    assert_same(list(ThaiMusicRecordBatch.from_records(records).iter_rows()), records)
+
+
+@pytest.mark.parametrize("use_arrow", [True, False])
+def test_from_csv_matches_records(tmp_path, monkeypatch, use_arrow):
+    if use_arrow:
+        pytest.importorskip("pyarrow")
+    else:
+        monkeypatch.setattr(batch, "_read_csv_arrow", lambda path, names: None)
+    rows = [
+        {name: value for name, value in row.items() if isinstance(value, str) or value is None}
+        for row in fuzz_rows(2000, seed=2)
+    ]
+    rows[0]["text"] = 'two\nlines, "quoted"'
+    path = tmp_path / "songs.csv"
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.DictWriter(f, FIELDS + ("extra",))
+        writer.writeheader()
+        writer.writerows(rows)
+
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        records = [
+            ThaiMusicRecord(**{
+                k: None if v == "" and k in ("album", "release_year", "genre", "scraper_module") else v
+                for k, v in row.items() if k in FIELDS
+            })
+            for row in csv.DictReader(f)
+        ]
+    assert_same(list(ThaiMusicRecordBatch.from_csv(path).iter_rows()), records)
+
+
+def test_validate_counts():
+    b = ThaiMusicRecordBatch.from_rows([
+        {"url": "a", "release_year": "1999", "text": "x"},
+        {"url": " a ", "release_year": "99", "text": ""},
+        {"url": None, "release_year": None, "text": "y"},
+    ])
+    assert b.validate() == {
+        "rows": 3, "invalid_release_year": 1, "missing_release_year": 2,
+        "missing_url": 1, "duplicate_url": 1, "empty_text": 1,
+    }
@@ -0,0 +1,29 @@
+import asyncio
+
+import httpx
+
+from scraper.crawler import AsyncCrawler, Frontier, HostRateLimiter
+
+
+def test_final_status_is_not_requeued(tmp_path):
+    frontier = Frontier(tmp_path / "frontier.db", max_attempts=3)
+    frontier.add("https://example.com/gone", "song")
+    frontier.add("https://example.com/busy", "song")
+    frontier.add("https://example.com/flaky", "song")
+    calls: dict[str, int] = {}
+
+    async def fetch(url, **kwargs):
+        calls[url] = calls.get(url, 0) + 1
+        if url.endswith("flaky"):
+            raise httpx.ConnectError("connection reset")
+        status = 404 if url.endswith("gone") else 503
+        request = httpx.Request("GET", url)
+        raise httpx.HTTPStatusError(str(status), request=request, response=httpx.Response(status, request=request))
+
+    async def handler(crawler, item, response):
+        raise AssertionError("no page was fetched")
+
+    crawler = AsyncCrawler(frontier, {"song": handler}, concurrency=1, limiter=HostRateLimiter(rate=1000, burst=1000))
+    crawler.fetch = fetch
+    assert asyncio.run(crawler.run()) == {"failed": 3}
+    assert calls == {"https://example.com/gone": 1, "https://example.com/busy": 3, "https://example.com/flaky": 3}
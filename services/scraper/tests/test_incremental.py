@@ -0,0 +1,28 @@
+import httpx
+
+from scraper.incremental import CrawlStateStore
+
+URL = "https://example.com/song"
+
+
+def test_year_is_only_stored_with_the_record(tmp_path):
+    state = CrawlStateStore(tmp_path / "state.db")
+    state.remember_year(URL, 1999)
+    assert state.known_year(URL) == "1999"
+    state.close()
+
+    # Interrupted before record(): the page is still new, not "modified" against an empty hash.
+    state = CrawlStateStore(tmp_path / "state.db")
+    response = httpx.Response(200, headers={"ETag": '"v1"'}, content=b"page")
+    assert state.get(URL) is None
+    assert state.classify(URL, response, "hash") == "new"
+
+    state.remember_year(URL, "2001")
+    state.record(URL, response, "hash")
+    assert state.classify(URL, response, "hash") == "unchanged"
+
+    # A later reprocess without a new lookup keeps the cached year.
+    state.record(URL, httpx.Response(200, content=b"edited"), "hash2")
+    assert state.known_year(URL) == "2001"
+    assert state.get(URL).content_hash == "hash2"
+    state.close()
@@ -0,0 +1,52 @@
+import random
+
+from scraper.dataclass import ThaiMusicRecord
+from scraper.linkage import link_records
+
+PLATFORMS = [("musicatm", ""), ("sanookmusic", " (Official MV)"), ("youtube", " [Lyrics Video]")]
+SYLLABLES = ["รัก", "ใจ", "เธอ", "ฉัน", "คิด", "ถึง", "ลา", "ก่อน", "ฝน", "ดาว", "love", "you", "night", "baby"]
+
+
+def catalogue(n_songs: int, seed: int = 0) -> list[ThaiMusicRecord]:
+    """The same `n_songs` listed once per platform, from a deliberately tiny title vocabulary."""
+    rng = random.Random(seed)
+    songs = [
+        (" ".join(rng.choice(SYLLABLES) for _ in range(rng.randint(1, 4))), f"ศิลปิน{rng.randint(0, 20000)}")
+        for _ in range(n_songs)
+    ]
+    return [
+        ThaiMusicRecord(id=f"{platform}-{i}", platform=platform, song_title=title + suffix, artist=artist)
+        for platform, suffix in PLATFORMS
+        for i, (title, artist) in enumerate(songs)
+    ]
+
+
+def test_links_across_platforms():
+    records = [
+        ThaiMusicRecord(id="a", platform="musicatm", song_title="คิดถึงเธอทุกคืน", artist="Bodyslam",
+                        release_year="2010"),
+        ThaiMusicRecord(id="b", platform="sanookmusic", song_title="คิดถึงเธอทุกคืน (Official MV)",
+                        artist="Bodyslam feat. Palmy", release_year="2010"),
+        ThaiMusicRecord(id="c", platform="youtube", song_title="คิดถึงเธอทุกคืนนะ", artist="bodyslam",
+                        release_year="2012"),
+        ThaiMusicRecord(id="d", platform="youtube", song_title="ฝนตกที่หน้าต่าง", artist="Bodyslam"),
+    ]
+    result = link_records(records)
+
+    assert len(result.songs) == 2
+    song = result.songs[result.assignment[0]]
+    assert song.record_ids == ("a", "b", "c")
+    assert song.platforms == ("musicatm", "sanookmusic", "youtube")
+    assert song.release_year == "2010"
+
+
+def test_oversized_blocks_keep_candidates_bounded():
+    for n_songs in (2000, 8000):
+        result = link_records(catalogue(n_songs), max_block=50)
+        assert result.skipped_ngrams > 0
+        assert result.candidate_pairs <= 5 * n_songs
+        # Every song still collapses its three platform listings.
+        assert all(len(song.platforms) == 3 for song in result.songs)
+
+    # Without the cap the shared n-grams make candidates grow with the square of the catalogue.
+    assert link_records(catalogue(8000), max_block=10 ** 9).candidate_pairs > 20 * 8000
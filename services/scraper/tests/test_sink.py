@@ -0,0 +1,42 @@
+import csv
+
+import pytest
+
+from scraper.dataclass import ThaiMusicRecord
+from scraper.sink import RecordSink
+
+
+def write_songs(directory, fmt: str, n: int) -> RecordSink:
+    sink = RecordSink(directory, fmt, batch_size=2)
+    sink.write_many(
+        ThaiMusicRecord(id=str(i), url=f"https://example.com/{i}", song_title=f"เพลง {i}", text="a,\n\"b\"")
+        for i in range(n)
+    )
+    sink.close()
+    return sink
+
+
+@pytest.mark.parametrize("torn", [
+    '9,"https://example.com/9","cut inside a quoted field',  # right width once the reader hits EOF
+    "9,https://example.com/9",  # short row
+])
+def test_compact_skips_torn_last_csv_row(tmp_path, torn):
+    sink = write_songs(tmp_path / "parts", "csv", 3)
+    (segment,) = sink.segments()
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write(torn)
+
+    assert sink.compact(tmp_path / "songs.csv", dedupe_key="url") == 3
+    with open(tmp_path / "songs.csv", newline="", encoding="utf-8") as f:
+        rows = list(csv.DictReader(f))
+    assert [row["id"] for row in rows] == ["0", "1", "2"]
+    assert all(row["text"] == "a,\n\"b\"" for row in rows)
+
+
+def test_compact_skips_torn_last_jsonl_line(tmp_path):
+    sink = write_songs(tmp_path / "parts", "jsonl", 3)
+    (segment,) = sink.segments()
+    with open(segment, "a", encoding="utf-8") as f:
+        f.write('{"id": "9", "url": "https://exa')
+
+    assert sink.compact(tmp_path / "songs.jsonl") == 3